@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,7 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'todos.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'todos.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -54,7 +57,8 @@ ROOT_URLCONF = 'todo_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's backend, with render times recorded for instrumentation.
+        'BACKEND': 'todos.instrumentation.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,8 +81,43 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Keep connections open across requests and check them before reuse.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock up front, so a transaction that reads and
+            # then writes waits on busy_timeout instead of failing with
+            # "database is locked".
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Local stand-in for a read replica: a copy of db.sqlite3 refreshed by
+    # `manage.py sync_replica`. Only read from when listed in
+    # TODOS_READ_REPLICAS; tests read it as a mirror of the primary.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['todos.routers.PrimaryReplicaRouter']
+
+# Pragmas applied to every new SQLite connection by todos.sqlite. A
+# database can override them with a 'PRAGMAS' key; {} keeps SQLite defaults.
+TODOS_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'memory',
 }
+DATABASES['replica']['PRAGMAS'] = {**TODOS_SQLITE_PRAGMAS, 'query_only': 1}
 
 
 # Password validation
@@ -116,8 +155,163 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic stores files under content-hashed names with gzip/brotli
+# copies (todos.assets).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'todos.assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Serve STATIC_URL from the app (todos.assets.serve), honouring
+# Accept-Encoding. Under runserver with DEBUG, pass --nostatic to use it
+# instead of the uncompressed development handler.
+TODOS_SERVE_STATIC = True
+
+# Per-view request metrics (todos.middleware.InstrumentationMiddleware),
+# served in the Prometheus text format at /metrics, and a Server-Timing
+# header with database, template and total times on every response. The
+# header is visible to clients; turn it off to keep timings private.
+TODOS_METRICS = True
+TODOS_SERVER_TIMING = True
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Runs the tests with their cached sessions in a temporary directory.
+TEST_RUNNER = 'todo_project.test_runner.TestRunner'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'todos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todos-fragments',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    # Shared by every process on the host, so a logout in one process ends
+    # the session in all of them. Entries are pickles: keep the directory
+    # writable by this app's user only. Deployments spread over several
+    # hosts need a networked cache here (Redis, Memcached).
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('TODOS_SESSION_CACHE_DIR', BASE_DIR / 'session_cache'),
+    },
+}
+
+
+# Todos
+
+# Number of todos shown per page of the keyset-paginated list.
+TODOS_PAGE_SIZE = 50
+
+# The admin changelist stops counting filtered todos past this many and
+# shows "more than" instead.
+TODOS_ADMIN_COUNT_LIMIT = 10000
+
+# Maximum number of items accepted by one bulk API request.
+TODOS_API_MAX_BATCH = 5000
+
+# Maximum number of changes returned by one /api/todos/changes/ request.
+TODOS_CHANGES_BATCH = 500
+
+# archive_todos moves todos resolved more than TODOS_ARCHIVE_AFTER_DAYS ago
+# into the archive, and purges them TODOS_ARCHIVE_RETENTION_DAYS after that.
+TODOS_ARCHIVE_AFTER_DAYS = 30
+TODOS_ARCHIVE_RETENTION_DAYS = 365
+
+# Live list updates (todos.events): how often each ASGI process polls the
+# change feed, how many events it keeps for reconnecting browsers (a poll
+# that finds more sends a reload instead), and the interval of keepalive
+# comments on idle streams, in seconds.
+TODOS_EVENTS_POLL_SECONDS = 1
+TODOS_EVENTS_BACKLOG = 1000
+TODOS_EVENTS_KEEPALIVE_SECONDS = 15
+
+# Serve the HTML pages with the async views (todos.async_views). Only useful
+# under an ASGI server; WSGI runs async views through async_to_sync.
+TODOS_ASYNC_VIEWS = os.environ.get('TODOS_ASYNC_VIEWS', '') == '1'
+
+# Where sessions and flash messages are kept. 'cookie' keeps messages in a
+# signed cookie only and reads sessions through the 'sessions' cache, so a
+# todo mutation never reads or writes the session table in the todos
+# database. 'database' is Django's default: database sessions, and messages
+# that spill into the session when they outgrow the cookie.
+TODOS_SESSION_PROFILE = os.environ.get('TODOS_SESSION_PROFILE', 'cookie')
+if TODOS_SESSION_PROFILE == 'cookie':
+    MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+    # Written through to the database only when the session changes (login, logout).
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    SESSION_CACHE_ALIAS = 'sessions'
+
+# Hand the HTML views' todo writes to one writer thread that commits them in
+# batches of up to TODOS_WRITE_BATCH_SIZE, one transaction each
+# (todos.writer). Set TODOS_WRITE_PIPELINE=1 to enable. A request gives up
+# on its write after TODOS_WRITE_TIMEOUT_SECONDS.
+TODOS_WRITE_PIPELINE = os.environ.get('TODOS_WRITE_PIPELINE', '') == '1'
+TODOS_WRITE_BATCH_SIZE = 100
+TODOS_WRITE_TIMEOUT_SECONDS = 30
+
+# Database aliases that todos reads are spread over (todos.routers). Set
+# TODOS_REPLICA=1 to read from the local replica.
+TODOS_READ_REPLICAS = ['replica'] if os.environ.get('TODOS_REPLICA', '') == '1' else []
+
+# How long a client's reads stay on the primary after it wrote a todo.
+TODOS_REPLICA_PIN_SECONDS = 5
+
+# Cache holding rendered list fragments, and how long (in seconds) an entry
+# may be served. Writes invalidate entries immediately; the timeout only bounds
+# how late an "Overdue" badge can appear on an unchanged list.
+TODOS_CACHE_ALIAS = 'todos'
+TODOS_CACHE_TIMEOUT = 60
+
+# Statements taking at least TODOS_SLOW_QUERY_MS are logged with their query
+# plan, view and call stack (todos.slowlog) to TODOS_SLOW_QUERY_LOG; None
+# turns the log off. Summarise it with manage.py slow_queries.
+TODOS_SLOW_QUERY_MS = 200
+TODOS_SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.log'
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': TODOS_SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'message',
+            # Only create the file once a slow query is logged.
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'todos.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,23 @@
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Keeps the cached sessions of a test run in a temporary directory of its own."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.session_cache_dir = tempfile.TemporaryDirectory()
+        self.session_cache = override_settings(CACHES={
+            **settings.CACHES,
+            'sessions': {**settings.CACHES['sessions'], 'LOCATION': self.session_cache_dir.name},
+        })
+        self.session_cache.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.session_cache.disable()
+        self.session_cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -14,10 +14,21 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from todos import assets, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include('todos.urls')),
+    path('', include('todos.async_urls' if settings.TODOS_ASYNC_VIEWS else 'todos.urls')),
 ]
+
+if settings.TODOS_METRICS:
+    urlpatterns.insert(0, path('metrics', metrics.metrics_view, name='metrics'))
+
+if settings.TODOS_SERVE_STATIC:
+    urlpatterns.insert(0, re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.*)$', assets.serve))
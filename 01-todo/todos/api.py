@@ -0,0 +1,310 @@
+"""
+JSON API for todos.
+
+The bulk endpoints accept a JSON array (``Content-Type: application/json``,
+with Django's CSRF token in an ``X-CSRFToken`` header) of up to
+``TODOS_API_MAX_BATCH`` items, validate every item, apply all valid ones in a single transaction
+using set-based statements, and answer with one result per input item, in
+input order. Invalid items are reported and skipped; they never abort the
+rest of the batch.
+"""
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET, require_POST
+
+from . import stats
+from .changes import CursorError, changes_since
+from .filters import TodoListParams
+from .models import Todo, resolved_at
+
+EDITABLE_FIELDS = ('title', 'description', 'due_date', 'resolved')
+TITLE_MAX_LENGTH = Todo._meta.get_field('title').max_length
+# Largest id SQLite can store (a signed 64-bit integer).
+MAX_ID = 2 ** 63 - 1
+
+
+class BatchError(Exception):
+    """The request body as a whole is unusable."""
+
+
+def max_batch_size():
+    return getattr(settings, 'TODOS_API_MAX_BATCH', 5000)
+
+
+def changes_batch_size():
+    return getattr(settings, 'TODOS_CHANGES_BATCH', 500)
+
+
+def todo_to_dict(todo):
+    return {
+        'id': todo.pk,
+        'title': todo.title,
+        'description': todo.description,
+        'due_date': todo.due_date.isoformat() if todo.due_date else None,
+        'resolved': todo.resolved,
+        'overdue': todo.is_overdue(),
+        'created_at': todo.created_at.isoformat(),
+        'updated_at': todo.updated_at.isoformat(),
+        'version': todo.version,
+    }
+
+
+def _load_batch(request):
+    try:
+        items = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        raise BatchError('Request body must be valid JSON.')
+    if not isinstance(items, list):
+        raise BatchError('Request body must be a JSON array.')
+    if not items:
+        raise BatchError('Request body must contain at least one item.')
+    if len(items) > max_batch_size():
+        raise BatchError(f'At most {max_batch_size()} items are accepted per request.')
+    return items
+
+
+def clean_fields(item, partial):
+    """Validate the editable fields of one item; return (values, errors)."""
+    values, errors = {}, {}
+    if not isinstance(item, dict):
+        return values, {'__all__': 'Item must be a JSON object.'}
+
+    if 'title' in item or not partial:
+        title = item.get('title')
+        if not isinstance(title, str) or not title.strip():
+            errors['title'] = 'Title is required.'
+        elif len(title) > TITLE_MAX_LENGTH:
+            errors['title'] = f'Title must be at most {TITLE_MAX_LENGTH} characters.'
+        else:
+            values['title'] = title
+
+    if 'description' in item:
+        description = item['description']
+        if description is not None and not isinstance(description, str):
+            errors['description'] = 'Description must be a string or null.'
+        else:
+            values['description'] = description
+
+    if 'due_date' in item:
+        due_date = item['due_date']
+        if due_date in (None, ''):
+            values['due_date'] = None
+        else:
+            try:
+                parsed = parse_datetime(due_date) if isinstance(due_date, str) else None
+            except ValueError:
+                # Well formed, but not a real date, e.g. month 13.
+                parsed = None
+            if parsed is None:
+                errors['due_date'] = 'Due date must be an ISO 8601 datetime or null.'
+            else:
+                if timezone.is_naive(parsed):
+                    parsed = timezone.make_aware(parsed)
+                values['due_date'] = parsed
+
+    if 'resolved' in item:
+        if not isinstance(item['resolved'], bool):
+            errors['resolved'] = 'Resolved must be true or false.'
+        else:
+            values['resolved'] = item['resolved']
+
+    return values, errors
+
+
+def _clean_id(item):
+    pk = item.get('id') if isinstance(item, dict) else item
+    if isinstance(pk, bool) or not isinstance(pk, int) or not 1 <= pk <= MAX_ID:
+        return None
+    return pk
+
+
+def _error(index, errors, pk=None):
+    result = {'index': index, 'status': 'error', 'errors': errors}
+    if pk is not None:
+        result['id'] = pk
+    return result
+
+
+def _batch_view(handler):
+    """Wrap a bulk handler with method, content type and body validation."""
+    @require_POST
+    def view(request):
+        # A cross-site form can only send form or text/plain bodies.
+        if request.content_type != 'application/json':
+            return JsonResponse({'error': 'Content-Type must be application/json.'}, status=415)
+        try:
+            items = _load_batch(request)
+        except BatchError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        results = handler(items)
+        return JsonResponse({'results': results})
+    view.__name__ = handler.__name__
+    view.__doc__ = handler.__doc__
+    return view
+
+
+@require_GET
+def todo_list(request):
+    """Keyset-paginated JSON listing, with the same filters as the HTML list."""
+    now = timezone.now()
+    params = TodoListParams(request.GET)
+    page = params.paginate(
+        Todo.objects.with_overdue(now),
+        cursor=request.GET.get('cursor'),
+        per_page=getattr(settings, 'TODOS_PAGE_SIZE', 50),
+        now=now,
+    )
+    return JsonResponse({
+        'results': [todo_to_dict(todo) for todo in page],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+
+def _query_int(request, name, default=None):
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        return None
+    return value if 0 <= value <= MAX_ID else None
+
+
+@require_GET
+def todo_changes(request):
+    """
+    Todos changed and ids deleted after ``since``, oldest first, in batches
+    of at most ``limit``. Request again with the returned ``cursor`` while
+    ``more`` is true.
+    """
+    since = _query_int(request, 'since', 0)
+    limit = _query_int(request, 'limit', changes_batch_size())
+    if since is None:
+        return JsonResponse({'error': 'since must be a cursor from a previous response, or 0.'}, status=400)
+    if not limit or limit > changes_batch_size():
+        return JsonResponse({'error': f'limit must be between 1 and {changes_batch_size()}.'}, status=400)
+    try:
+        todos, tombstones, cursor, more = changes_since(since, limit)
+    except CursorError as exc:
+        return JsonResponse({'error': str(exc)}, status=410)
+    return JsonResponse({
+        'results': [todo_to_dict(todo) for todo in todos],
+        'deleted': [tombstone.todo_id for tombstone in tombstones],
+        'cursor': cursor,
+        'more': more,
+    })
+
+
+@require_GET
+def todo_stats(request):
+    """Counts by status: total, open, resolved and overdue."""
+    return JsonResponse(stats.todo_stats())
+
+
+@_batch_view
+def bulk_create(items):
+    """Create todos with batched multi-row INSERTs."""
+    results = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        values, errors = clean_fields(item, partial=False)
+        if errors:
+            results[index] = _error(index, errors)
+        else:
+            pending.append((index, Todo(**values)))
+
+    with transaction.atomic():
+        Todo.objects.bulk_create([todo for _, todo in pending])
+
+    for index, todo in pending:
+        results[index] = {'index': index, 'status': 'created', 'id': todo.pk}
+    return results
+
+
+@_batch_view
+def bulk_update(items):
+    """
+    Partially update todos; items sharing a field set share a bulk UPDATE.
+    Items naming the same todo are merged in order, later values winning.
+    """
+    results = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        pk = _clean_id(item)
+        if pk is None:
+            results[index] = _error(index, {'id': 'A positive integer id is required.'})
+            continue
+        values, errors = clean_fields(item, partial=True)
+        if not errors and not values:
+            errors = {'__all__': f'Nothing to update; expected one of {", ".join(EDITABLE_FIELDS)}.'}
+        if errors:
+            results[index] = _error(index, errors, pk)
+        else:
+            pending.append((index, pk, values))
+
+    # bulk_update would apply only the first of several objects with one pk.
+    merged = {}
+    for _, pk, values in pending:
+        merged.setdefault(pk, {}).update(values)
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = set(Todo.objects.filter(pk__in=merged).values_list('pk', flat=True))
+        groups = defaultdict(list)
+        for pk, values in merged.items():
+            if 'resolved' in values:
+                values['resolved_at'] = resolved_at(values['resolved'], now)
+            if pk in existing:
+                groups[tuple(sorted(values))].append(Todo(pk=pk, updated_at=now, version=F('version') + 1, **values))
+        for index, pk, _ in pending:
+            if pk in existing:
+                results[index] = {'index': index, 'status': 'updated', 'id': pk}
+            else:
+                results[index] = _error(index, {'id': 'Todo not found.'}, pk)
+        for fields, todos in groups.items():
+            Todo.objects.bulk_update(todos, [*fields, 'updated_at', 'version'])
+    return results
+
+
+def _ids_batch(items, status, action):
+    """Validate a batch of ids, then run ``action`` on the ones that exist."""
+    results = [None] * len(items)
+    pending = {}
+    for index, item in enumerate(items):
+        pk = _clean_id(item)
+        if pk is None:
+            results[index] = _error(index, {'id': 'A positive integer id is required.'})
+        else:
+            pending[index] = pk
+
+    with transaction.atomic():
+        existing = set(Todo.objects.filter(pk__in=set(pending.values())).values_list('pk', flat=True))
+        action(Todo.objects.filter(pk__in=existing))
+
+    for index, pk in pending.items():
+        if pk in existing:
+            results[index] = {'index': index, 'status': status, 'id': pk}
+        else:
+            results[index] = _error(index, {'id': 'Todo not found.'}, pk)
+    return results
+
+
+@_batch_view
+def bulk_resolve(items):
+    """Mark todos resolved with a single UPDATE ... WHERE id IN (...)."""
+    return _ids_batch(items, 'resolved', lambda queryset: queryset.set_resolved(True))
+
+
+@_batch_view
+def bulk_delete(items):
+    """Delete todos with a single DELETE ... WHERE id IN (...)."""
+    return _ids_batch(items, 'deleted', lambda queryset: queryset.bulk_delete())
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TodosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'todos'
+
+    def ready(self):
+        # Connect the cache invalidation, live event, SQLite pragma and query
+        # timing receivers.
+        from . import cache, events, instrumentation, sqlite  # noqa: F401
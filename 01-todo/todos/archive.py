@@ -0,0 +1,47 @@
+"""
+Archival of resolved todos into ``ArchivedTodo``, run by ``archive_todos``.
+
+Each batch is copied and deleted in its own transaction, so the hot table
+is never locked for long and an interrupted run loses nothing. Deleting a
+todo goes through the usual triggers: the counters drop, the FTS index
+forgets it and the change feed records a tombstone.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedTodo, Todo
+
+
+def archive_after():
+    return timezone.timedelta(days=getattr(settings, 'TODOS_ARCHIVE_AFTER_DAYS', 30))
+
+
+def retention():
+    return timezone.timedelta(days=getattr(settings, 'TODOS_ARCHIVE_RETENTION_DAYS', 365))
+
+
+def archive_batch(cutoff, batch_size, now=None):
+    """Move up to ``batch_size`` todos resolved before ``cutoff``; return how many."""
+    with transaction.atomic():
+        # A range scan of the (resolved, resolved_at) index, oldest first.
+        todos = list(
+            Todo.objects.resolved().filter(resolved_at__lt=cutoff)
+            .select_for_update().order_by('resolved_at', 'id')[:batch_size]
+        )
+        if todos:
+            ArchivedTodo.objects.bulk_create([ArchivedTodo.from_todo(todo, now or timezone.now()) for todo in todos])
+            Todo.objects.filter(pk__in=[todo.pk for todo in todos]).bulk_delete()
+    return len(todos)
+
+
+def purge_batch(cutoff, batch_size):
+    """Delete up to ``batch_size`` todos archived before ``cutoff``; return how many."""
+    with transaction.atomic():
+        ids = list(
+            ArchivedTodo.objects.filter(archived_at__lt=cutoff)
+            .order_by('archived_at', 'id').values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            ArchivedTodo.objects.filter(id__in=ids).delete()
+    return len(ids)
@@ -0,0 +1,158 @@
+"""
+Static asset storage and serving.
+
+``CompressedManifestStaticFilesStorage`` names every collected file after
+its content hash and, at ``collectstatic`` time, writes gzip (and, when the
+optional ``brotli`` package is installed, brotli) siblings of the
+compressible ones. ``serve`` hands those out from ``STATIC_ROOT``, picking
+the best encoding the client accepts; hashed names never change content, so
+they are cached for a year.
+"""
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, StaticFilesStorage, staticfiles_storage,
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.html', '.xml')
+# Smaller files gain nothing once HTTP framing is counted.
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _compressors():
+    yield 'gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br', lambda data: brotli.compress(data, quality=11)
+
+
+# Preferred first, with the file suffix each is stored under.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            for compressed_name in self.compress(hashed_name):
+                yield compressed_name, compressed_name, True
+
+    def compress(self, name):
+        """Write the compressed siblings of ``name`` that are worth keeping."""
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            data = file.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compress in _compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data) * 0.9:
+                continue
+            compressed_name = f'{name}.{suffix}'
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
+
+    def url(self, name, force=False):
+        # Until collectstatic has written a manifest (development, tests),
+        # refer to the source files by their plain names.
+        if not self.hashed_files and not force:
+            return StaticFilesStorage.url(self, name)
+        return super().url(name, force)
+
+
+def accepted_encodings(header):
+    """
+    Content codings an Accept-Encoding header accepts, minus any with q=0.
+    ``*`` accepts every coding of ENCODINGS the header does not name.
+    """
+    qualities = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        try:
+            qualities[coding.strip().lower()] = float(quality) if params else 1.0
+        except ValueError:
+            continue
+    wildcard = qualities.pop('*', 0)
+    if wildcard:
+        for coding, _ in ENCODINGS:
+            qualities.setdefault(coding, wildcard)
+    return {coding for coding, quality in qualities.items() if quality}
+
+
+def _find(path):
+    """Absolute path of a static file: collected first, then app sources."""
+    if settings.STATIC_ROOT:
+        try:
+            collected = safe_join(settings.STATIC_ROOT, path)
+        except SuspiciousFileOperation:
+            raise Http404('Static file not found.')
+        if os.path.isfile(collected):
+            return collected, True
+    found = finders.find(path)
+    if not found:
+        raise Http404('Static file not found.')
+    return found, False
+
+
+@require_safe
+def serve(request, path):
+    """
+    Serve a static file, precompressed when the client accepts it.
+
+    Files under their hashed names get a year-long immutable lifetime; any
+    other file must be revalidated. The compressed siblings themselves are
+    not served under their own names, which carry no content type for them.
+    """
+    if path.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+        raise Http404('Static file not found.')
+    fullpath, collected = _find(path)
+    stat = os.stat(fullpath)
+    hashed = collected and path in staticfiles_storage.hashed_files.values()
+    if not hashed and not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(path)
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', '')) if collected else set()
+    encoding = None
+    for coding, suffix in ENCODINGS:
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            encoding, fullpath = coding, fullpath + suffix
+            break
+
+    response = FileResponse(open(fullpath, 'rb'), content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if hashed:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,16 @@
+"""Same routes as todos.urls, with the HTML pages served by todos.async_views."""
+from django.urls import path
+
+from . import async_views, urls
+
+async_urlpatterns = [
+    path('', async_views.todo_list, name='todo_list'),
+    path('create/', async_views.todo_create, name='todo_create'),
+    path('edit/<int:pk>/', async_views.todo_edit, name='todo_edit'),
+    path('delete/<int:pk>/', async_views.todo_delete, name='todo_delete'),
+    path('toggle/<int:pk>/', async_views.todo_toggle_resolved, name='todo_toggle_resolved'),
+]
+
+_async_names = {pattern.name for pattern in async_urlpatterns}
+
+urlpatterns = async_urlpatterns + [pattern for pattern in urls.urlpatterns if pattern.name not in _async_names]
@@ -0,0 +1,147 @@
+"""
+Async versions of the HTML views, served by ``todos.async_urls``.
+
+Under ASGI, Django runs every sync view in a worker thread; these views run
+on the event loop and only reach the database through the async ORM and
+``todos.writer.awrite()``. Flash messages are loaded with
+``aload_messages()`` before rendering, since the fallback storage may read
+the session table.
+"""
+from django.conf import settings
+from django.contrib import messages
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import acached_list
+from .conditional import aconditional, alist_etag, aload_messages, atodo_etag, atodo_last_modified
+from .events import get_broadcaster
+from .filters import TodoListParams
+from .models import Todo
+from .stats import atodo_stats
+from .views import expected_version, list_context, render_items
+from .writer import awrite
+
+
+async def _render(request, template_name, context=None, status=None):
+    await aload_messages(request)
+    return render(request, template_name, context, status=status)
+
+
+@aconditional(etag_func=alist_etag)
+async def todo_list(request):
+    now = timezone.now()
+    params = TodoListParams(request.GET)
+
+    async def build():
+        page = await params.apaginate(
+            Todo.objects.with_overdue(now),
+            cursor=request.GET.get('cursor'),
+            per_page=getattr(settings, 'TODOS_PAGE_SIZE', 50),
+            now=now,
+        )
+        return page, render_items(request, page, params)
+
+    page, items_html = await acached_list(request, build)
+    context = list_context(page, params, items_html, await atodo_stats(now))
+    return await _render(request, 'todos/todo_list.html', context)
+
+
+async def todo_create(request):
+    if request.method == 'POST':
+        title = request.POST.get('title')
+        due_date_str = request.POST.get('due_date')
+
+        if title:
+            await awrite(
+                Todo.objects.create,
+                title=title,
+                description=request.POST.get('description'),
+                due_date=parse_datetime(due_date_str) if due_date_str else None,
+            )
+            messages.success(request, 'Todo created successfully!')
+            return redirect('todo_list')
+        else:
+            messages.error(request, 'Title is required!')
+
+    return await _render(request, 'todos/todo_form.html')
+
+
+@aconditional(etag_func=atodo_etag, last_modified_func=atodo_last_modified)
+async def todo_edit(request, pk):
+    if request.method == 'POST':
+        title = request.POST.get('title')
+        due_date_str = request.POST.get('due_date')
+
+        if title:
+            values = {
+                'title': title,
+                'description': request.POST.get('description'),
+                'due_date': parse_datetime(due_date_str) if due_date_str else None,
+            }
+            expected = expected_version(request)
+            if expected is None:
+                todo = await aget_object_or_404(Todo, pk=pk)
+                messages.error(request, 'The form was not sent correctly. Review the todo and try again.')
+                return await _render(request, 'todos/todo_form.html', {'todo': todo}, status=400)
+
+            if await awrite(Todo.objects.filter(pk=pk).update_versioned, expected, **values):
+                messages.success(request, 'Todo updated successfully!')
+                return redirect('todo_list')
+            todo = await aget_object_or_404(Todo, pk=pk)
+            messages.error(request, 'This todo was changed by someone else. Review the current version and try again.')
+            return await _render(request, 'todos/todo_form.html', {'todo': todo}, status=409)
+        else:
+            messages.error(request, 'Title is required!')
+
+    todo = await aget_object_or_404(Todo, pk=pk)
+    return await _render(request, 'todos/todo_form.html', {'todo': todo})
+
+
+@aconditional(etag_func=atodo_etag, last_modified_func=atodo_last_modified)
+async def todo_delete(request, pk):
+    todo = await aget_object_or_404(Todo, pk=pk)
+
+    if request.method == 'POST':
+        await awrite(todo.delete)
+        messages.success(request, 'Todo deleted successfully!')
+        return redirect('todo_list')
+
+    return await _render(request, 'todos/todo_confirm_delete.html', {'todo': todo})
+
+
+async def todo_toggle_resolved(request, pk):
+    todos = Todo.objects.filter(pk=pk)
+    target = request.POST.get('resolved')
+    if target in ('0', '1'):
+        resolved = target == '1'
+        updated = await awrite(todos.set_resolved, resolved)
+    else:
+        updated = await awrite(todos.toggle_resolved)
+        resolved = updated and await todos.values_list('resolved', flat=True).afirst()
+    if not updated:
+        raise Http404('No Todo matches the given query.')
+
+    status = 'resolved' if resolved else 'unresolved'
+    messages.success(request, f'Todo marked as {status}!')
+    return redirect('todo_list')
+
+
+async def todo_events(request):
+    """Server-Sent Events stream of todo changes, for the list page."""
+    if not isinstance(request, ASGIRequest):
+        # The stream would hold a WSGI worker for as long as the page is
+        # open; 204 tells the browser's EventSource not to reconnect.
+        return HttpResponse(status=204)
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        # Missing or not a number we sent: start from the current end.
+        last_event_id = None
+    stream = get_broadcaster().stream(last_event_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
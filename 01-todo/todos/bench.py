@@ -0,0 +1,145 @@
+"""
+Load generation for the benchmark commands.
+
+Requests are driven straight into an ASGI application from one event loop,
+so no server or HTTP client library is needed. Latencies therefore cover the
+whole Django stack (middleware, view, ORM, template) but not sockets or
+HTTP parsing.
+"""
+import asyncio
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of ``values`` (0 < p <= 100); None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+class BenchResult:
+    """Latencies (in seconds) and failures of one benchmark run."""
+
+    def __init__(self, label):
+        self.label = label
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    @property
+    def requests(self):
+        return len(self.latencies) + self.errors
+
+    @property
+    def rps(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def latency_ms(self, p):
+        value = percentile(self.latencies, p)
+        return value * 1000 if value is not None else None
+
+    def as_row(self, width=12):
+        p50, p95, p99 = (self.latency_ms(p) or 0 for p in (50, 95, 99))
+        return (
+            f'{self.label:<{width}} {self.requests:>9} {self.errors:>7} {self.rps:>10.1f} '
+            f'{p50:>9.2f} {p95:>9.2f} {p99:>9.2f}'
+        )
+
+    def as_dict(self):
+        latencies = {f'p{p}': self.latency_ms(p) for p in (50, 95, 99)}
+        if self.latencies:
+            latencies['mean'] = sum(self.latencies) / len(self.latencies) * 1000
+            latencies['max'] = max(self.latencies) * 1000
+        return {
+            'label': self.label,
+            'requests': self.requests,
+            'errors': self.errors,
+            'elapsed_s': self.elapsed,
+            'rps': self.rps,
+            'latency_ms': latencies,
+        }
+
+    @staticmethod
+    def header(width=12):
+        return (
+            f'{"run":<{width}} {"requests":>9} {"errors":>7} {"req/s":>10} '
+            f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9}'
+        )
+
+
+async def asgi_request(app, method, url, body=b'', headers=(), host='localhost'):
+    """Send one HTTP request to ``app``; return ``(status, body)``."""
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', host.encode()), *headers],
+        'client': ('127.0.0.1', 0),
+        'server': (host, 80),
+    }
+    received = False
+    disconnect = asyncio.Event()
+    status, chunks = None, []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnect.set()
+    return status, b''.join(chunks)
+
+
+def form_body(data):
+    """Encode ``data`` (list values repeat the key) for a POST; returns ``(body, headers)``."""
+    return urlencode(data, doseq=True).encode(), [(b'content-type', b'application/x-www-form-urlencoded')]
+
+
+async def run(label, requests, concurrency, make_request):
+    """
+    Issue ``requests`` calls of ``make_request(i)`` with at most
+    ``concurrency`` in flight. ``make_request`` returns an awaitable that
+    resolves to ``(status, body)``; any status >= 400 counts as an error.
+    """
+    result = BenchResult(label)
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            began = time.perf_counter()
+            try:
+                status, _ = await make_request(i)
+            except Exception:
+                status = None
+            if status is None or status >= 400:
+                result.errors += 1
+            else:
+                result.latencies.append(time.perf_counter() - began)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, requests)))))
+    result.elapsed = time.perf_counter() - began
+    return result
@@ -0,0 +1,131 @@
+"""
+Versioned cache for the rendered todo list.
+
+Rendered list fragments are stored under ``<version>:<query string>``. The
+version is a ``CacheVersion`` token that is replaced whenever a todo is
+saved or deleted (``post_save``/``post_delete``) or touched by a bulk
+operation (``todos_changed``), so stale entries are never read again and
+simply age out of the size-bounded cache backend named by
+``TODOS_CACHE_ALIAS``.
+
+Cached fragments never contain a CSRF token: a placeholder is stored and
+replaced with the requesting user's token on the way out.
+"""
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.backends.utils import csrf_input
+from django.utils.safestring import mark_safe
+
+from .models import CacheVersion, Todo
+from .signals import todos_changed
+
+LIST_VERSION = 'todo_list'
+CSRF_PLACEHOLDER = mark_safe('<!--todos:csrf-->')
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def get_cache():
+    return caches[getattr(settings, 'TODOS_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    return getattr(settings, 'TODOS_CACHE_TIMEOUT', 60)
+
+
+def current_version(name=LIST_VERSION):
+    # Read through the router, from the same database as the cached rows. A
+    # missing row (fresh or rolled-back database) gets a new random token,
+    # so entries cached for data that no longer exists are never matched.
+    token = CacheVersion.objects.filter(name=name).values_list('token', flat=True).first()
+    if token is None:
+        token = CacheVersion.objects.get_or_create(name=name, defaults={'token': uuid.uuid4().hex})[0].token
+    return token
+
+
+async def acurrent_version(name=LIST_VERSION):
+    token = await CacheVersion.objects.filter(name=name).values_list('token', flat=True).afirst()
+    if token is None:
+        token = (await CacheVersion.objects.aget_or_create(name=name, defaults={'token': uuid.uuid4().hex}))[0].token
+    return token
+
+
+def bump_version(name=LIST_VERSION):
+    token = uuid.uuid4().hex
+    if not CacheVersion.objects.filter(name=name).update(token=token):
+        CacheVersion.objects.update_or_create(name=name, defaults={'token': token})
+    return token
+
+
+def cache_stats():
+    """Hit/miss counters of this process since start (or the last reset)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.update(hits=0, misses=0)
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def list_cache_key(request, version):
+    query = '&'.join(f'{k}={v}' for k, values in sorted(request.GET.lists()) for v in values)
+    digest = hashlib.sha256(query.encode()).hexdigest()[:32]
+    return f'todos:list:{version}:{digest}'
+
+
+def cached_list(request, build):
+    """
+    Return ``(page, html)`` for the list described by ``request.GET``.
+
+    ``build()`` queries and renders on a miss; it must render
+    ``CSRF_PLACEHOLDER`` wherever a form needs the CSRF token.
+    """
+    cache = get_cache()
+    key = list_cache_key(request, current_version())
+    entry = cache.get(key)
+    if entry is None:
+        _count('misses')
+        entry = build()
+        cache.set(key, entry, cache_timeout())
+    else:
+        _count('hits')
+    return _with_csrf(request, entry)
+
+
+async def acached_list(request, build):
+    """Async version of ``cached_list()``; ``build`` is a coroutine function."""
+    cache = get_cache()
+    key = list_cache_key(request, await acurrent_version())
+    entry = await cache.aget(key)
+    if entry is None:
+        _count('misses')
+        entry = await build()
+        await cache.aset(key, entry, cache_timeout())
+    else:
+        _count('hits')
+    return _with_csrf(request, entry)
+
+
+def _with_csrf(request, entry):
+    page, html = entry
+    return page, mark_safe(html.replace(CSRF_PLACEHOLDER, csrf_input(request)))
+
+
+@receiver(post_save, sender=Todo, dispatch_uid='todos.cache.post_save')
+@receiver(post_delete, sender=Todo, dispatch_uid='todos.cache.post_delete')
+@receiver(todos_changed, sender=Todo, dispatch_uid='todos.cache.todos_changed')
+def invalidate_list(sender, **kwargs):
+    bump_version()
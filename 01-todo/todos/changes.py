@@ -0,0 +1,52 @@
+"""
+Change feed for delta sync, served by ``/api/todos/changes/``.
+
+Every insert and update of a todo gives it the next ``change_seq``, and
+every delete leaves a ``TodoTombstone`` with its own number (see
+``ChangeSequence``). A client passes the cursor of its last response as
+``since`` and gets the todos and deletions numbered after it, oldest first,
+at most ``limit`` at a time.
+"""
+from django.db.models import Q
+
+from .models import ChangeSequence, Todo, TodoTombstone
+
+SEQUENCE_ID = 1
+
+
+class CursorError(Exception):
+    """The cursor is ahead of the feed, which was reset; sync again from 0."""
+
+
+def last_change():
+    return ChangeSequence.objects.filter(pk=SEQUENCE_ID).values_list('value', flat=True).first() or 0
+
+
+def changes_since(since, limit, now=None):
+    """
+    Return ``(todos, tombstones, cursor, more)`` for the changes after
+    ``since``, where ``cursor`` is the ``since`` of the next request.
+    """
+    # Only numbers up to the last one handed out before the queries are
+    # read. Writes are serialized, so all of them are committed and neither
+    # query can miss one; a todo changed again meanwhile moves past the mark
+    # and comes in a later batch.
+    high = last_change()
+    if since > high:
+        raise CursorError(f'Cursor {since} is ahead of the change feed ({high}).')
+    window = Q(change_seq__gt=since, change_seq__lte=high)
+    # Each source's first limit + 1 rows hold all of its rows among the
+    # first limit + 1 changes overall.
+    todos = Todo.objects.with_overdue(now).filter(window).order_by('change_seq')[:limit + 1]
+    tombstones = TodoTombstone.objects.filter(window).order_by('change_seq')[:limit + 1]
+    changes = sorted([*todos, *tombstones], key=lambda change: change.change_seq)
+
+    more = len(changes) > limit
+    changes = changes[:limit]
+    cursor = changes[-1].change_seq if more else high
+    return (
+        [change for change in changes if isinstance(change, Todo)],
+        [change for change in changes if isinstance(change, TodoTombstone)],
+        cursor,
+        more,
+    )
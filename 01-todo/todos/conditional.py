@@ -0,0 +1,123 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the HTML pages.
+
+``conditional`` wraps sync views with Django's ``condition`` decorator;
+``aconditional`` does the same for async views, computing the validators
+with the async ORM.
+"""
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from .models import Todo
+from .stats import atodo_stats, todo_stats
+
+
+def conditional(etag_func=None, last_modified_func=None):
+    """
+    Answer conditional GETs with 304 Not Modified before the view runs.
+
+    Only GET and HEAD are conditional, and responses that will show flash
+    messages are always rendered, since the validators only describe the
+    todos. Every response must be revalidated.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func, last_modified_func)(view)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                response = view(request, *args, **kwargs)
+            else:
+                response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+def aconditional(etag_func=None, last_modified_func=None):
+    """Async version of ``conditional``; the validator functions are async too."""
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or await aload_messages(request):
+                response = await view(request, *args, **kwargs)
+            else:
+                etag = await etag_func(request, *args, **kwargs) if etag_func else None
+                etag = quote_etag(etag) if etag else None
+                last_modified = await last_modified_func(request, *args, **kwargs) if last_modified_func else None
+                last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return inner
+    return decorator
+
+
+async def aload_messages(request):
+    """
+    Load the pending flash messages and return how many there are.
+
+    The default fallback storage may read the session table, so it is loaded
+    in a worker thread; templates then iterate the already-loaded messages.
+    """
+    storage = messages.get_messages(request)
+    if isinstance(storage, CookieStorage):
+        return len(storage)
+    return await sync_to_async(len)(storage)
+
+
+def _weak_etag(*parts):
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _list_etag(request, latest, stats):
+    # Max(updated_at) changes on every insert and edit and the total on every
+    # delete; the overdue count changes as badges appear with the clock. The
+    # list has no Last-Modified, which could not express deletions.
+    return _weak_etag(latest, stats['total'], stats['resolved'], stats['overdue'], request.GET.urlencode())
+
+
+def list_etag(request):
+    latest = Todo.objects.aggregate(latest=Max('updated_at'))['latest']
+    return _list_etag(request, latest, todo_stats())
+
+
+async def alist_etag(request):
+    latest = (await Todo.objects.aaggregate(latest=Max('updated_at')))['latest']
+    return _list_etag(request, latest, await atodo_stats())
+
+
+def todo_last_modified(request, pk):
+    return Todo.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+
+
+async def atodo_last_modified(request, pk):
+    return await Todo.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+
+
+def todo_etag(request, pk):
+    version = Todo.objects.filter(pk=pk).values_list('version', flat=True).first()
+    return _weak_etag(pk, version) if version else None
+
+
+async def atodo_etag(request, pk):
+    version = await Todo.objects.filter(pk=pk).values_list('version', flat=True).afirst()
+    return _weak_etag(pk, version) if version else None
@@ -0,0 +1,185 @@
+"""
+Live todo events for the list page, streamed as Server-Sent Events.
+
+One ``Broadcaster`` per event loop follows the change feed (todos.changes)
+and publishes every change once: the item is rendered and encoded as an SSE
+message a single time, appended to a bounded log shared by all subscribers,
+and every subscriber is woken through one shared future. An idle
+subscriber is a coroutine waiting on that future, so one ASGI process holds
+thousands of them cheaply, and the database is polled once per process
+however many browsers are connected.
+
+Following the feed instead of in-process signals also picks up writes made
+by other processes; writes committed in this process wake the poller at
+once. Message ids are change numbers, so a reconnecting ``EventSource``
+resumes from ``Last-Event-ID``, or is told to reload when the log no longer
+reaches back that far.
+"""
+import asyncio
+import contextvars
+import json
+import weakref
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .cache import CSRF_PLACEHOLDER
+from .changes import changes_since, last_change
+from .models import Todo
+from .signals import todos_changed
+
+_broadcasters = weakref.WeakKeyDictionary()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def encode(event, seq, data):
+    return f'id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+def read_events(since):
+    """
+    Encoded messages for every change after ``since``, and the new cursor.
+
+    More changes than the log holds (a bulk import, say) are not rendered:
+    subscribers get a single reload instead.
+    """
+    backlog = _setting('TODOS_EVENTS_BACKLOG', 1000)
+    now = timezone.now()
+    changes = []
+    more = True
+    while more:
+        todos, tombstones, since, more = changes_since(since, _setting('TODOS_CHANGES_BATCH', 500), now)
+        if len(changes) + len(todos) + len(tombstones) > backlog:
+            cursor = last_change()
+            return [(cursor, encode('reload', cursor, {}))], cursor
+        for todo in todos:
+            html = render_to_string('todos/todo_item.html', {'todo': todo, 'csrf_placeholder': CSRF_PLACEHOLDER})
+            # Every write bumps the version, so version 1 is the insert. A todo
+            # created and edited since the last poll is sent as an update; the
+            # list page inserts an update for an id newer than its top item.
+            event = 'create' if todo.version == 1 else 'update'
+            changes.append((todo.change_seq, encode(event, todo.change_seq, {'id': todo.pk, 'html': html})))
+        changes += [
+            (tombstone.change_seq, encode('delete', tombstone.change_seq, {'id': tombstone.todo_id}))
+            for tombstone in tombstones
+        ]
+    changes.sort(key=lambda change: change[0])
+    return changes, since
+
+
+class Broadcaster:
+    """Fan-out of change events to the SSE streams of one event loop."""
+
+    def __init__(self):
+        self.log = deque(maxlen=_setting('TODOS_EVENTS_BACKLOG', 1000))
+        # The log holds every change numbered after ``horizon``, up to
+        # ``cursor``.
+        self.horizon = self.cursor = 0
+        self.subscribers = 0
+        self.wake = asyncio.Event()
+        self._changed = asyncio.get_running_loop().create_future()
+        self._start_lock = asyncio.Lock()
+        self._task = None
+
+    def publish(self, changes, cursor):
+        for seq, message in changes:
+            if len(self.log) == self.log.maxlen:
+                self.horizon = self.log[0][0]
+            self.log.append((seq, message))
+        self.cursor = cursor
+        if changes:
+            self._changed.set_result(None)
+            self._changed = asyncio.get_running_loop().create_future()
+
+    def since(self, position):
+        """``(seq, message)`` pairs after ``position``, read from the newest end."""
+        newer = []
+        for change in reversed(self.log):
+            if change[0] <= position:
+                break
+            newer.append(change)
+        return newer[::-1]
+
+    async def _start(self):
+        async with self._start_lock:
+            if self._task is None:
+                # Changes made while no one listened were not kept, so the
+                # log restarts at the current end of the feed.
+                self.log.clear()
+                self.horizon = self.cursor = await sync_to_async(last_change)()
+                # Started outside the request's context: the poller outlives
+                # the request, so its reads are routed like background work.
+                self._task = contextvars.Context().run(asyncio.create_task, self._poll())
+
+    async def _poll(self):
+        interval = _setting('TODOS_EVENTS_POLL_SECONDS', 1)
+        try:
+            while self.subscribers:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.wake.clear()
+                if await sync_to_async(last_change)() > self.cursor:
+                    self.publish(*await sync_to_async(read_events)(self.cursor))
+        finally:
+            self._task = None
+
+    async def stream(self, last_event_id=None):
+        """Async iterator of SSE messages for one client, until it disconnects."""
+        self.subscribers += 1
+        try:
+            await self._start()
+            position = self.cursor if last_event_id is None else last_event_id
+            yield f'retry: {_setting("TODOS_EVENTS_RETRY_MS", 3000)}\n\n'.encode()
+            if not self.horizon <= position <= self.cursor:
+                yield encode('reload', self.cursor, {})
+                position = self.cursor
+
+            keepalive = _setting('TODOS_EVENTS_KEEPALIVE_SECONDS', 15)
+            while True:
+                # Taken before yielding, so a publish during a yield is seen.
+                changed = self._changed
+                if position < self.horizon:
+                    # The log moved past this subscriber while it was
+                    # writing out a backlog; its changes are gone.
+                    yield encode('reload', self.cursor, {})
+                    position = self.cursor
+                for position, message in self.since(position):
+                    yield message
+                done, _ = await asyncio.wait({changed}, timeout=keepalive)
+                if not done:
+                    yield b': keepalive\n\n'
+        finally:
+            self.subscribers -= 1
+
+
+def get_broadcaster():
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = Broadcaster()
+    return broadcaster
+
+
+def _wake_all():
+    for loop, broadcaster in list(_broadcasters.items()):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(broadcaster.wake.set)
+
+
+@receiver(post_save, sender=Todo, dispatch_uid='todos.events.post_save')
+@receiver(post_delete, sender=Todo, dispatch_uid='todos.events.post_delete')
+@receiver(todos_changed, sender=Todo, dispatch_uid='todos.events.todos_changed')
+def wake_broadcasters(sender, **kwargs):
+    if _broadcasters:
+        transaction.on_commit(_wake_all)
@@ -0,0 +1,148 @@
+"""
+Query-string filtering and sorting for the todo list.
+
+Every status/sort combination maps onto one of the composite indexes declared
+on ``Todo.Meta.indexes``, so the list never needs a full table scan or a
+temporary sort, however large the table grows.
+"""
+from datetime import datetime, time, timedelta
+
+from django.db.models import DateTimeField, Func
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .pagination import apaginate, paginate
+from .search import apaginate_ranked, paginate_ranked
+
+STATUS_CHOICES = ('all', 'open', 'resolved', 'overdue')
+
+# Each ordering ends in the primary key so keyset cursors are unique.
+SORT_ORDERINGS = {
+    'created': ('-created_at', '-id'),
+    'due': ('due_date', 'id'),
+    'updated': ('-updated_at', '-id'),
+}
+
+DEFAULT_STATUS = 'all'
+DEFAULT_SORT = 'created'
+
+# Only offered while searching; ordered by FTS rank rather than a column.
+RELEVANCE_SORT = 'relevance'
+
+
+class Unindexed(Func):
+    """
+    A column reference that SQLite's planner will not use to pick an index.
+
+    Range filters on ``due_date`` are applied as plain row filters while the
+    list is sorted by another column; otherwise SQLite may seek on the
+    due-date index and fall back to a temporary B-tree for the ORDER BY.
+    """
+    template = '%(expressions)s'
+    output_field = DateTimeField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='+%(expressions)s', **extra_context)
+
+
+def _parse_bound(value, end_of_day=False):
+    """
+    Parse a due-date bound given as an ISO datetime or a plain date.
+
+    A plain date covers the whole day, so ``due_before=2025-01-31`` includes
+    todos due at any time on the 31st.
+    """
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        return None
+    if day is not None:
+        if end_of_day:
+            day += timedelta(days=1)
+        parsed = datetime.combine(day, time.min)
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class TodoListParams:
+    """Cleaned list parameters taken from a request's query string."""
+
+    def __init__(self, data):
+        status = data.get('status', DEFAULT_STATUS)
+        self.status = status if status in STATUS_CHOICES else DEFAULT_STATUS
+        self.q = (data.get('q') or '').strip()
+        sort = data.get('sort') or (RELEVANCE_SORT if self.q else DEFAULT_SORT)
+        if sort in SORT_ORDERINGS or (sort == RELEVANCE_SORT and self.q):
+            self.sort = sort
+        else:
+            self.sort = DEFAULT_SORT
+        self.due_after = _parse_bound(data.get('due_after'))
+        self.due_before = _parse_bound(data.get('due_before'), end_of_day=True)
+
+    @property
+    def is_filtered(self):
+        return bool(
+            self.status != DEFAULT_STATUS or self.q
+            or self.due_after is not None or self.due_before is not None
+        )
+
+    @property
+    def ranked(self):
+        """Whether results are ordered by search relevance."""
+        return self.sort == RELEVANCE_SORT
+
+    @property
+    def sort_choices(self):
+        return [RELEVANCE_SORT, *SORT_ORDERINGS] if self.q else list(SORT_ORDERINGS)
+
+    @property
+    def ordering(self):
+        return SORT_ORDERINGS.get(self.sort, SORT_ORDERINGS[DEFAULT_SORT])
+
+    def apply(self, queryset, now=None, search=True):
+        """
+        Filter ``queryset`` by search text, status and due-date range.
+
+        ``now`` should be the same instant used to annotate ``overdue`` on
+        the queryset. Pass ``search=False`` when the caller runs a ranked
+        search itself.
+        """
+        now = now or timezone.now()
+        if self.q and search:
+            queryset = queryset.search(self.q)
+        if self.status in ('open', 'overdue'):
+            queryset = queryset.unresolved()
+        elif self.status == 'resolved':
+            queryset = queryset.resolved()
+
+        # Only the due-date sort walks an index that leads with due_date.
+        due = 'due_date'
+        if self.sort != 'due':
+            queryset = queryset.alias(due_filter=Unindexed('due_date'))
+            due = 'due_filter'
+
+        if self.status == 'overdue':
+            queryset = queryset.filter(**{f'{due}__lt': now})
+        if self.due_after is not None:
+            queryset = queryset.filter(**{f'{due}__gte': self.due_after})
+        if self.due_before is not None:
+            queryset = queryset.filter(**{f'{due}__lt': self.due_before})
+        return queryset
+
+    def paginate(self, queryset, cursor=None, per_page=50, now=None):
+        """Filter, sort and keyset-paginate ``queryset`` into a ``KeysetPage``."""
+        if self.ranked:
+            return paginate_ranked(self.apply(queryset, now, search=False), self.q, cursor, per_page)
+        return paginate(self.apply(queryset, now), self.ordering, cursor, per_page)
+
+    async def apaginate(self, queryset, cursor=None, per_page=50, now=None):
+        """Async version of ``paginate()``."""
+        if self.ranked:
+            return await apaginate_ranked(self.apply(queryset, now, search=False), self.q, cursor, per_page)
+        return await apaginate(self.apply(queryset, now), self.ordering, cursor, per_page)
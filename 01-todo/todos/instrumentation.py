@@ -0,0 +1,96 @@
+"""
+Per-request timers behind ``InstrumentationMiddleware``.
+
+The middleware opens a ``RequestTimings`` in a context variable for each
+request. A wrapper on every database connection (appended to
+``connection.execute_wrappers``, the list ``connection.execute_wrapper()``
+manages) counts and times queries, and the ``DjangoTemplates`` backend
+below times renders. Context variables follow the request into
+``sync_to_async`` threads, so async views and the async ORM are measured as
+well. Outside a request both cost one context variable lookup, plus two
+clock reads per query while the slow query log (todos.slowlog) is on.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends import django as django_backend
+
+from . import slowlog
+
+_current = contextvars.ContextVar('todos_request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('request', 'started', 'queries', 'db', 'template')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timing(request=None):
+    """Measure the code run inside the block; yields its ``RequestTimings``."""
+    timings = RequestTimings(request)
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    slow = slowlog.threshold()
+    if timings is None and slow is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        if timings is not None:
+            timings.queries += 1
+            timings.db += duration
+        if slow is not None and duration >= slow:
+            request = timings.request if timings else None
+            slowlog.record(context['connection'], sql, params, many, duration, request)
+
+
+@receiver(connection_created, dispatch_uid='todos.instrumentation.install_query_timer')
+def install_query_timer(sender, connection, **kwargs):
+    # A connection object is reused after reconnecting; wrap it once.
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        started, db = time.perf_counter(), timings.db
+        try:
+            return super().render(context, request)
+        finally:
+            # Querysets evaluated while rendering count as database time.
+            timings.template += time.perf_counter() - started - (timings.db - db)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The Django template backend, with renders timed per request."""
+
+    def from_string(self, template_code):
+        return Template(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
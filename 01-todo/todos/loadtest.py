@@ -0,0 +1,200 @@
+"""
+Data set and request mix for the bench_todos command.
+
+``seed`` tops the todo table up with generated rows: short titles, optional
+descriptions, due dates spread around now (so a share of the open todos is
+overdue) and a configurable share resolved. ``SCENARIOS`` describes the
+requests sent to each view and method of ``todos.urls``. Writes only touch
+scratch todos created for the run and removed by ``cleanup``, so the seeded
+rows are the same on every run and results stay comparable between commits.
+"""
+import random
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.urls import reverse
+from django.utils import timezone
+
+from .changes import last_change
+from .models import Todo
+
+SCRATCH_TITLE = '[bench] '
+SEED_BATCH = 5000
+# Items per request to the bulk API endpoints.
+BULK_ITEMS = 20
+
+VERBS = ('Call', 'Email', 'Review', 'Fix', 'Write', 'Plan', 'Book', 'Pay', 'Renew', 'Clean', 'Order', 'Update')
+OBJECTS = (
+    'the dentist', 'quarterly report', 'car insurance', 'pull request', 'team offsite', 'electricity bill',
+    'passport', 'kitchen', 'groceries', 'project roadmap', 'landlord', 'release notes',
+)
+WORDS = (
+    'before', 'after', 'friday', 'monday', 'call', 'check', 'budget', 'notes', 'with', 'team', 'send',
+    'draft', 'final', 'invoice', 'meeting', 'follow', 'up', 'ask', 'about', 'the', 'new', 'plan',
+)
+
+
+def generate_todo(rng, now, resolved_ratio):
+    resolved = rng.random() < resolved_ratio
+    due_date = None
+    if rng.random() < 0.75:
+        # Open todos cluster around now, so about a third of those with a
+        # due date are overdue; resolved ones were mostly due in the past.
+        days = rng.uniform(-180, 30) if resolved else rng.uniform(-30, 60)
+        due_date = now + timezone.timedelta(days=days)
+    description = None
+    if rng.random() < 0.5:
+        description = ' '.join(rng.choices(WORDS, k=rng.randint(3, 40))).capitalize() + '.'
+    return Todo(
+        title=f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}',
+        description=description,
+        due_date=due_date,
+        resolved=resolved,
+    )
+
+
+def seed(count, resolved_ratio=0.6, rng=None, now=None, progress=None):
+    """
+    Insert ``count`` generated todos, one transaction per ``SEED_BATCH``;
+    ``progress(created)`` is called after each batch.
+    """
+    rng = rng or random.Random(0)
+    now = now or timezone.now()
+    created = 0
+    while created < count:
+        size = min(SEED_BATCH, count - created)
+        with transaction.atomic():
+            Todo.objects.bulk_create([generate_todo(rng, now, resolved_ratio) for _ in range(size)])
+        created += size
+        if progress:
+            progress(created)
+    return created
+
+
+def sample_pks(count, rng):
+    """Up to ``count`` ids of existing todos, spread over the whole table."""
+    bounds = Todo.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    candidates = range(bounds['low'], bounds['high'] + 1)
+    candidates = rng.sample(candidates, min(len(candidates), count * 2))
+    pks = list(Todo.objects.filter(pk__in=candidates).values_list('pk', flat=True)[:count])
+    rng.shuffle(pks)
+    return pks
+
+
+def scratch_pks(count):
+    """Create ``count`` open scratch todos for write requests; returns their ids."""
+    pks = []
+    for start in range(0, count, SEED_BATCH):
+        todos = [Todo(title=f'{SCRATCH_TITLE}{i}') for i in range(start, min(start + SEED_BATCH, count))]
+        pks += [todo.pk for todo in Todo.objects.bulk_create(todos)]
+    return pks
+
+
+def cleanup():
+    """Delete every scratch todo; returns how many there were."""
+    return Todo.objects.filter(title__startswith=SCRATCH_TITLE).bulk_delete()
+
+
+class Scenario:
+    """
+    Requests for one view and method. ``build(count, sample)`` prepares the
+    data for ``count`` requests and returns ``request(i) -> (path, data)``,
+    where ``data`` is a form dict, a JSON-able list or None.
+    """
+
+    def __init__(self, view, method, build, share=1.0, skip=None):
+        self.view = view
+        self.method = method
+        self.build = build
+        # Fraction of --requests to send, for views that are costly per call.
+        self.share = share
+        self.skip = skip
+
+    @property
+    def label(self):
+        return f'{self.method} {self.view}'
+
+
+def _get(view, queries=('',)):
+    def build(count, sample):
+        paths = [reverse(view) + query for query in queries]
+        return lambda i: (paths[i % len(paths)], None)
+    return build
+
+
+def _sampled(view):
+    def build(count, sample):
+        return lambda i: (reverse(view, args=[sample[i % len(sample)]]), None)
+    return build
+
+
+def _scratch(view, data):
+    def build(count, sample):
+        pks = scratch_pks(count)
+        return lambda i: (reverse(view, args=[pks[i]]), data)
+    return build
+
+
+def _create(count, sample):
+    return lambda i: (reverse('todo_create'), {'title': f'{SCRATCH_TITLE}created', 'description': '', 'due_date': ''})
+
+
+def _changes(count, sample):
+    path = f'{reverse("api_todo_changes")}?since={max(0, last_change() - 500)}'
+    return lambda i: (path, None)
+
+
+def _bulk(view, item):
+    def build(count, sample):
+        pks = scratch_pks(count * BULK_ITEMS)
+        return lambda i: (
+            reverse(view),
+            [item(pk) for pk in pks[i * BULK_ITEMS:(i + 1) * BULK_ITEMS]],
+        )
+    return build
+
+
+def _batch(action):
+    def build(count, sample):
+        pks = scratch_pks(count * BULK_ITEMS)
+        return lambda i: (
+            reverse('todo_batch'),
+            {'action': action, 'ids': pks[i * BULK_ITEMS:(i + 1) * BULK_ITEMS]},
+        )
+    return build
+
+
+def _bulk_create(count, sample):
+    items = [{'title': f'{SCRATCH_TITLE}bulk'} for _ in range(BULK_ITEMS)]
+    return lambda i: (reverse('api_todo_bulk_create'), items)
+
+
+LIST_QUERIES = ('', '?status=open&sort=due', '?status=overdue', '?q=report')
+
+SCENARIOS = [
+    Scenario('todo_list', 'GET', _get('todo_list', LIST_QUERIES)),
+    Scenario('todo_archive', 'GET', _get('todo_archive')),
+    # Every request streams all overdue todos.
+    Scenario('todo_export', 'GET', _get('todo_export', ['?status=overdue']), share=0.01),
+    Scenario('todo_create', 'GET', _get('todo_create')),
+    Scenario('todo_create', 'POST', _create),
+    Scenario('todo_edit', 'GET', _sampled('todo_edit')),
+    # Each edit goes to a fresh todo, so the version it sends is current.
+    Scenario('todo_edit', 'POST', _scratch('todo_edit', {
+        'title': f'{SCRATCH_TITLE}edited', 'description': 'Edited', 'due_date': '', 'version': '1',
+    })),
+    Scenario('todo_delete', 'GET', _sampled('todo_delete')),
+    Scenario('todo_delete', 'POST', _scratch('todo_delete', {})),
+    Scenario('todo_toggle_resolved', 'POST', _scratch('todo_toggle_resolved', {})),
+    Scenario('todo_batch', 'POST', _batch('resolve')),
+    Scenario('todo_events', 'GET', None, skip='Streams until the client disconnects; there is no response time.'),
+    Scenario('api_todo_list', 'GET', _get('api_todo_list', LIST_QUERIES)),
+    Scenario('api_todo_stats', 'GET', _get('api_todo_stats')),
+    Scenario('api_todo_changes', 'GET', _changes),
+    Scenario('api_todo_bulk_create', 'POST', _bulk_create),
+    Scenario('api_todo_bulk_update', 'POST', _bulk('api_todo_bulk_update', lambda pk: {'id': pk, 'description': 'Bulk'})),
+    Scenario('api_todo_bulk_resolve', 'POST', _bulk('api_todo_bulk_resolve', lambda pk: pk)),
+    Scenario('api_todo_bulk_delete', 'POST', _bulk('api_todo_bulk_delete', lambda pk: pk)),
+]
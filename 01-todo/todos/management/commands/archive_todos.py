@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from todos import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move todos resolved longer than TODOS_ARCHIVE_AFTER_DAYS ago into the '
+        'archive in batched transactions, then purge archived todos older than '
+        'TODOS_ARCHIVE_RETENTION_DAYS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, help='Archive todos resolved more than N days ago.')
+        parser.add_argument('--purge-after', type=int, help='Purge todos archived more than N days ago.')
+        parser.add_argument('--no-purge', action='store_true', help='Only archive; keep every archived todo.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Todos moved or purged per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        now = timezone.now()
+
+        older_than = self.days(options['older_than'], archive.archive_after())
+        archived = self.run_batches(lambda: archive.archive_batch(now - older_than, batch_size, now), batch_size)
+        self.stdout.write(f'Archived {archived} todos resolved before {(now - older_than):%Y-%m-%d}.')
+
+        if options['no_purge']:
+            return
+        purge_after = self.days(options['purge_after'], archive.retention())
+        purged = self.run_batches(lambda: archive.purge_batch(now - purge_after, batch_size), batch_size)
+        self.stdout.write(f'Purged {purged} todos archived before {(now - purge_after):%Y-%m-%d}.')
+
+    def days(self, value, default):
+        return default if value is None else timezone.timedelta(days=value)
+
+    def run_batches(self, batch, batch_size):
+        total = 0
+        while True:
+            rows = batch()
+            total += rows
+            if rows < batch_size:
+                return total
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from todos import loadtest
+from todos.bench import BenchResult, asgi_request, form_body, run
+from todos.models import Todo
+from todos.stats import todo_stats
+
+# Requests sent one at a time after each timed run to count queries.
+QUERY_SAMPLES = 3
+LABEL_WIDTH = 28
+
+
+def count_queries(func):
+    """Run ``func()`` and return how many queries it sent, on any database."""
+    queries = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        func()
+    return queries
+
+
+def current_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed todos up to a given volume, then drive every view in todos.urls '
+        'with concurrent in-process ASGI clients and report throughput, '
+        'p50/p95/p99 latency and queries per request, optionally as JSON to '
+        'compare between commits. Runs against the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, help='Top the todo table up to N rows first (e.g. 10000 to 1000000).')
+        parser.add_argument('--resolved-ratio', type=float, default=0.6, help='Share of seeded todos that are resolved.')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed for generated todos and sampled ids.')
+        parser.add_argument('--seed-only', action='store_true', help='Seed, then exit without sending requests.')
+        parser.add_argument(
+            '--view', action='append', choices=sorted({scenario.view for scenario in loadtest.SCENARIOS}),
+            help='URL name to drive; repeat for several. Defaults to all.',
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Timed requests per view and method.')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests before each run.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--json', help='Write the results to this file, or "-" for stdout.')
+        parser.add_argument('--baseline', help='Results of an earlier run (--json) to compare against.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1 or options['warmup'] < 0:
+            raise CommandError('--requests and --concurrency must be positive, --warmup not negative.')
+        if not 0 <= options['resolved_ratio'] <= 1:
+            raise CommandError('--resolved-ratio must be between 0 and 1.')
+        baseline = self.load_baseline(options['baseline']) if options['baseline'] else None
+        rng = random.Random(options['random_seed'])
+
+        if options['rows']:
+            self.seed(options['rows'], options['resolved_ratio'], rng)
+        if options['seed_only']:
+            return
+
+        # Leftovers of an interrupted run would skew the data set.
+        loadtest.cleanup()
+        sample = loadtest.sample_pks(1000, rng)
+        if not sample:
+            raise CommandError('There are no todos to benchmark; seed some with --rows.')
+        scenarios = [
+            scenario for scenario in loadtest.SCENARIOS
+            if not options['view'] or scenario.view in options['view']
+        ]
+
+        quiet = options['json'] == '-'
+        if not quiet:
+            self.stdout.write(
+                f'{Todo.objects.count()} todos, {options["requests"]} requests per view, '
+                f'concurrency {options["concurrency"]}'
+            )
+            self.stdout.write(f'{BenchResult.header(LABEL_WIDTH)} {"queries":>8}')
+        self.app = get_asgi_application()
+        results = []
+        try:
+            with override_settings(ROOT_URLCONF='todos.urls'):
+                for scenario in scenarios:
+                    if scenario.skip:
+                        results.append({'view': scenario.view, 'method': scenario.method, 'skipped': scenario.skip})
+                        if not quiet:
+                            self.stdout.write(f'{scenario.label:<{LABEL_WIDTH}} skipped: {scenario.skip}')
+                        continue
+                    result, entry = self.run_scenario(scenario, sample, options)
+                    results.append(entry)
+                    if not quiet:
+                        self.stdout.write(f'{result.as_row(LABEL_WIDTH)} {entry["queries"]:>8}')
+                    if result.errors:
+                        self.stderr.write(f'{scenario.label}: {result.errors} requests failed or returned an error status.')
+        finally:
+            loadtest.cleanup()
+
+        report = self.report(results, options)
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['json']:
+            with open(options['json'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f'Wrote results to {options["json"]}.')
+        if baseline is not None and not quiet:
+            self.compare(baseline, results)
+
+    def seed(self, rows, resolved_ratio, rng):
+        missing = rows - Todo.objects.count()
+        if missing <= 0:
+            return
+        step = max(loadtest.SEED_BATCH, missing // 10)
+
+        def progress(created):
+            if created % step < loadtest.SEED_BATCH or created == missing:
+                self.stdout.write(f'Seeded {created}/{missing} todos.')
+
+        loadtest.seed(missing, resolved_ratio, rng, progress=progress)
+
+    def run_scenario(self, scenario, sample, options):
+        requests = max(1, round(options['requests'] * scenario.share))
+        warmup = round(options['warmup'] * scenario.share)
+        concurrency = options['concurrency']
+        request_for = scenario.build(warmup + requests + QUERY_SAMPLES, sample)
+        csrf_token = get_random_string(32)
+
+        def send(offset):
+            def make_request(i):
+                path, data = request_for(offset + i)
+                body, headers = self.encode(data, csrf_token)
+                return asgi_request(self.app, scenario.method, path, body, headers, host=options['host'])
+            return make_request
+
+        if warmup:
+            asyncio.run(run('warmup', warmup, concurrency, send(0)))
+        result = asyncio.run(run(scenario.label, requests, concurrency, send(warmup)))
+
+        client = Client(HTTP_HOST=options['host'])
+
+        def sample_request(i):
+            path, data = request_for(i)
+            body, headers = self.encode(data)
+            content_type = dict(headers).get(b'content-type', b'').decode() or 'application/octet-stream'
+            response = client.generic(scenario.method, path, body, content_type)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        queries = [
+            count_queries(lambda: sample_request(warmup + requests + i)) for i in range(QUERY_SAMPLES)
+        ]
+        entry = {
+            'view': scenario.view,
+            'method': scenario.method,
+            'path': request_for(0)[0],
+            **result.as_dict(),
+            'queries': statistics.median_low(queries),
+        }
+        return result, entry
+
+    def encode(self, data, csrf_token=None):
+        """Request body and headers for ``data``; with ``csrf_token``, also a CSRF cookie and token."""
+        if data is None:
+            return b'', []
+        if isinstance(data, list):
+            body, headers = json.dumps(data).encode(), [(b'content-type', b'application/json')]
+            if csrf_token is not None:
+                headers.append((b'x-csrftoken', csrf_token.encode()))
+        else:
+            body, headers = form_body(data if csrf_token is None else {**data, 'csrfmiddlewaretoken': csrf_token})
+        if csrf_token is not None:
+            headers.append((b'cookie', f'{settings.CSRF_COOKIE_NAME}={csrf_token}'.encode()))
+        return body, headers
+
+    def report(self, results, options):
+        counters = todo_stats()
+        return {
+            'commit': current_commit(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'todos': {key: counters[key] for key in ('total', 'resolved', 'overdue')},
+            'options': {key: options[key] for key in ('requests', 'concurrency', 'warmup', 'random_seed')},
+            'results': results,
+        }
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read baseline {path}: {exc}')
+
+    def compare(self, baseline, results):
+        previous = {
+            (entry['view'], entry['method']): entry
+            for entry in baseline.get('results', []) if 'skipped' not in entry
+        }
+        self.stdout.write(f'Compared with {baseline.get("commit") or "baseline"}:')
+        for entry in results:
+            old = previous.get((entry['view'], entry['method']))
+            if old is None or 'skipped' in entry:
+                continue
+            label = f'{entry["method"]} {entry["view"]}'
+            old_p95, new_p95 = old['latency_ms']['p95'], entry['latency_ms']['p95']
+            self.stdout.write(
+                f'{label:<{LABEL_WIDTH}} req/s {old["rps"]:.1f} -> {entry["rps"]:.1f} '
+                f'({_change(old["rps"], entry["rps"])}), p95 ms {old_p95 or 0:.2f} -> {new_p95 or 0:.2f} '
+                f'({_change(old_p95, new_p95)}), queries {old["queries"]} -> {entry["queries"]}'
+            )
+
+
+def _change(old, new):
+    if not old or new is None:
+        return 'n/a'
+    return f'{(new - old) / old * 100:+.1f}%'
@@ -0,0 +1,50 @@
+import asyncio
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from todos.bench import BenchResult, asgi_request, run
+
+URLCONFS = {
+    'sync': 'todos.urls',
+    'async': 'todos.async_urls',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/s and latency of the sync and async HTML views under '
+        'the ASGI handler, at a given concurrency. Requests are sent in-process '
+        'against the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='Path to GET; repeat to rotate. Defaults to /.')
+        parser.add_argument('--stack', action='append', choices=sorted(URLCONFS), help='Defaults to both.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=50, help='Untimed requests before each run.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive.')
+        paths = options['path'] or ['/']
+        stacks = options['stack'] or ['sync', 'async']
+        app = get_asgi_application()
+
+        def make_request(i):
+            return asgi_request(app, 'GET', paths[i % len(paths)], host=options['host'])
+
+        self.stdout.write(
+            f'{options["requests"]} requests, concurrency {options["concurrency"]}, paths {", ".join(paths)}'
+        )
+        self.stdout.write(BenchResult.header())
+        for stack in stacks:
+            with override_settings(ROOT_URLCONF=URLCONFS[stack]):
+                asyncio.run(run('warmup', options['warmup'], options['concurrency'], make_request))
+                result = asyncio.run(run(stack, options['requests'], options['concurrency'], make_request))
+            self.stdout.write(result.as_row())
+            if result.errors:
+                self.stderr.write(f'{stack}: {result.errors} requests failed or returned an error status.')
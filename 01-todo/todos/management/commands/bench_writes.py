@@ -0,0 +1,113 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from todos import loadtest
+from todos.bench import BenchResult
+from todos.models import Todo
+from todos.writer import WritePipeline
+
+MODES = ('direct', 'pipeline')
+
+
+def write_cycle(execute, result, n):
+    """Create, edit and delete one scratch todo, timing each write into ``result``."""
+    def timed(fn, *args, **kwargs):
+        began = time.perf_counter()
+        try:
+            value = execute(fn, *args, **kwargs)
+        except Exception:
+            result.errors += 1
+            raise
+        result.latencies.append(time.perf_counter() - began)
+        return value
+
+    todo = timed(Todo.objects.create, title=f'{loadtest.SCRATCH_TITLE}write {n}')
+    timed(Todo.objects.filter(pk=todo.pk).update_versioned, todo.version, title=f'{loadtest.SCRATCH_TITLE}edited {n}')
+    timed(todo.delete)
+
+
+def run_threads(label, execute, threads, cycles):
+    """Run ``cycles`` write cycles on each of ``threads`` threads started together."""
+    results = [BenchResult(label) for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(result, offset):
+        try:
+            barrier.wait()
+            for n in range(offset, offset + cycles):
+                try:
+                    write_cycle(execute, result, n)
+                except Exception:
+                    # Counted by write_cycle; the rest of this cycle is skipped.
+                    pass
+        finally:
+            connections.close_all()
+
+    workers = [
+        threading.Thread(target=worker, args=(result, i * cycles), daemon=True) for i, result in enumerate(results)
+    ]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    began = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    total = BenchResult(label)
+    total.elapsed = time.perf_counter() - began
+    for result in results:
+        total.latencies += result.latencies
+        total.errors += result.errors
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure write throughput and latency under lock contention: many '
+        'threads create, edit and delete scratch todos at once, writing '
+        'directly and through the single-writer pipeline (todos.writer). '
+        'Runs against the configured database and removes its todos afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent writing threads.')
+        parser.add_argument('--cycles', type=int, default=30, help='Create/edit/delete cycles per thread.')
+        parser.add_argument('--mode', action='append', choices=MODES, help='Defaults to both.')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Most writes per pipeline transaction. Defaults to TODOS_WRITE_BATCH_SIZE.',
+        )
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['cycles'] < 1:
+            raise CommandError('--threads and --cycles must be positive.')
+        batch_size = options['batch_size'] or getattr(settings, 'TODOS_WRITE_BATCH_SIZE', 100)
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        self.stdout.write(
+            f'{options["threads"]} threads x {options["cycles"]} cycles of create, edit and delete'
+        )
+        self.stdout.write(BenchResult.header())
+        for mode in options['mode'] or MODES:
+            if mode == 'pipeline':
+                pipeline = WritePipeline(batch_size=batch_size)
+                result = run_threads(
+                    mode, lambda fn, *a, **kw: pipeline.submit(fn, *a, **kw).result(),
+                    options['threads'], options['cycles'],
+                )
+                pipeline.stop()
+            else:
+                result = run_threads(mode, lambda fn, *a, **kw: fn(*a, **kw), options['threads'], options['cycles'])
+            loadtest.cleanup()
+            self.stdout.write(result.as_row())
+            if mode == 'pipeline' and pipeline.batches:
+                self.stdout.write(
+                    f'  {pipeline.writes} writes in {pipeline.batches} transactions '
+                    f'({pipeline.writes / pipeline.batches:.1f} per transaction)'
+                )
+            if result.errors:
+                self.stderr.write(f'{mode}: {result.errors} writes failed.')
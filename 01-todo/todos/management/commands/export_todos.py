@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from todos.export import DEFAULT_CHUNK_SIZE, FORMATS, export_queryset, iter_export
+from todos.filters import SORT_ORDERINGS, STATUS_CHOICES, TodoListParams
+
+
+class Command(BaseCommand):
+    help = 'Stream todos to a CSV or NDJSON file without loading the table into memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File to write; defaults to stdout.')
+        parser.add_argument('--status', choices=STATUS_CHOICES, default='all')
+        parser.add_argument('--due-after', help='Only todos due on or after this date/datetime.')
+        parser.add_argument('--due-before', help='Only todos due on or before this date/datetime.')
+        parser.add_argument('--sort', choices=sorted(SORT_ORDERINGS), default='created')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        params = TodoListParams({
+            'status': options['status'],
+            'sort': options['sort'],
+            'due_after': options['due_after'],
+            'due_before': options['due_before'],
+        })
+        chunks = iter_export(export_queryset(params), options['format'], options['chunk_size'])
+        header_lines = 1 if options['format'] == 'csv' else 0
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as out:
+                count = 0
+                for chunk in chunks:
+                    out.write(chunk)
+                    count += 1
+            self.stderr.write(f'Exported {count - header_lines} todos to {options["output"]}.')
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
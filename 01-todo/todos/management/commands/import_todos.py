@@ -0,0 +1,122 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from todos.api import clean_fields
+from todos.models import ImportCheckpoint, Todo
+
+TRUE_STRINGS = {'1', 'true', 't', 'yes', 'y'}
+FALSE_STRINGS = {'0', 'false', 'f', 'no', 'n', ''}
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        item = {key: value for key, value in row.items() if key in ('title', 'description', 'due_date')}
+        if item.get('description') == '':
+            item['description'] = None
+        resolved = (row.get('resolved') or '').strip().lower()
+        if resolved in TRUE_STRINGS:
+            item['resolved'] = True
+        elif resolved in FALSE_STRINGS:
+            item['resolved'] = False
+        else:
+            item['resolved'] = resolved
+        yield item
+
+
+def read_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream todos from a CSV or NDJSON file into the database using bulk '
+        'inserts and chunked transactions. Progress is checkpointed in the '
+        'same transaction as each chunk, so --resume continues exactly after '
+        'the last committed row.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(READERS), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT statement.')
+        parser.add_argument('--commit-every', type=int, default=20000, help='Rows per transaction.')
+        parser.add_argument('--resume', action='store_true', help='Skip rows committed by a previous run.')
+        parser.add_argument('--source', help='Checkpoint key; defaults to the absolute path.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError(f"Cannot infer the format of '{path}'; pass --format.")
+        if options['batch_size'] < 1 or options['commit_every'] < 1:
+            raise CommandError('--batch-size and --commit-every must be positive.')
+
+        source = options['source'] or os.path.abspath(path)
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+        if not options['resume'] and checkpoint.offset:
+            checkpoint.offset = 0
+            checkpoint.save(update_fields=['offset', 'updated_at'])
+        start = checkpoint.offset
+        if start:
+            self.stdout.write(f'Resuming {source} after row {start}.')
+
+        try:
+            stream = open(path, newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f"Cannot open '{path}': {exc}")
+
+        imported = skipped = 0
+        began = time.monotonic()
+        with stream:
+            items = islice(READERS[fmt](stream), start, None)
+            offset = start
+            while True:
+                chunk = list(islice(items, options['commit_every']))
+                if not chunk:
+                    break
+                todos = []
+                for number, item in enumerate(chunk, start=offset + 1):
+                    values, errors = clean_fields(item, partial=False)
+                    if errors:
+                        skipped += 1
+                        if skipped <= 10:
+                            self.stderr.write(f'Row {number} skipped: {errors}')
+                        continue
+                    todos.append(Todo(**values))
+                offset += len(chunk)
+
+                with transaction.atomic():
+                    Todo.objects.bulk_create(todos, batch_size=options['batch_size'])
+                    ImportCheckpoint.objects.filter(pk=checkpoint.pk).update(offset=offset, updated_at=timezone.now())
+                imported += len(todos)
+
+                elapsed = time.monotonic() - began
+                self.stdout.write(
+                    f'{offset} rows read, {imported} imported '
+                    f'({imported / elapsed if elapsed else 0:,.0f} rows/s)'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} todos, skipped {skipped} invalid rows '
+            f'in {time.monotonic() - began:.1f}s.'
+        ))
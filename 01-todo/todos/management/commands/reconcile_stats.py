@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todos import stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Reset the maintained todo counters to exact counts, once or every '
+        '--interval seconds, and report any drift that was corrected.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Keep reconciling every N seconds until interrupted.')
+
+    def handle(self, *args, **options):
+        while True:
+            before, after = stats.reconcile()
+            if before is None:
+                self.stdout.write(f"Seeded counters: {after['total']} total, {after['resolved']} resolved.")
+            elif before != after:
+                self.stdout.write(
+                    f"Corrected drift: total {before['total']} -> {after['total']}, "
+                    f"resolved {before['resolved']} -> {after['resolved']}."
+                )
+            else:
+                self.stdout.write(f"Counters match: {after['total']} total, {after['resolved']} resolved.")
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from todos import slowlog
+
+SORT_KEYS = {
+    'total': lambda group: group['total_ms'],
+    'count': lambda group: group['count'],
+    'max': lambda group: group['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarise the slow query log (TODOS_SLOW_QUERY_LOG and its rotated '
+        'files) by statement shape: how often each ran slow, the total and '
+        'worst time, the views that issued it and its latest query plan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Log file to read. Defaults to TODOS_SLOW_QUERY_LOG.')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='total', help='Order of the statements.')
+        parser.add_argument('--limit', type=int, default=20, help='Number of statements to show.')
+
+    def handle(self, *args, **options):
+        path = options['file'] or getattr(settings, 'TODOS_SLOW_QUERY_LOG', None)
+        if not path:
+            raise CommandError('No log file; pass --file or set TODOS_SLOW_QUERY_LOG.')
+        if options['limit'] < 1:
+            raise CommandError('--limit must be at least 1.')
+
+        groups = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': set()})
+        for entry in slowlog.read_entries(path):
+            group = groups[slowlog.shape(entry['sql'])]
+            duration = entry.get('duration_ms') or 0
+            group['count'] += 1
+            group['total_ms'] += duration
+            group['max_ms'] = max(group['max_ms'], duration)
+            group['views'].add(entry.get('view') or '(no request)')
+            # Entries are read oldest first, so this keeps the latest.
+            group['plan'] = entry.get('plan')
+            group['stack'] = entry.get('stack')
+
+        if not groups:
+            self.stdout.write(f'No slow queries logged in {path}.')
+            return
+        ranked = sorted(groups.items(), key=lambda item: SORT_KEYS[options['sort']](item[1]), reverse=True)
+        self.stdout.write(
+            f'{sum(group["count"] for group in groups.values())} slow queries, {len(groups)} statement shapes.'
+        )
+        for statement, group in ranked[:options['limit']]:
+            self.stdout.write('')
+            self.stdout.write(
+                f'{group["count"]} x, total {group["total_ms"]:.1f} ms, '
+                f'mean {group["total_ms"] / group["count"]:.1f} ms, max {group["max_ms"]:.1f} ms'
+            )
+            self.stdout.write(f'  views: {", ".join(sorted(group["views"]))}')
+            self.stdout.write(f'  sql:   {statement}')
+            for step in group['plan'] or ['(no plan)']:
+                self.stdout.write(f'  plan:  {step}')
+            if group['stack']:
+                self.stdout.write(f'  at:    {group["stack"][-1]}')
@@ -0,0 +1,46 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database into a replica alias with the online '
+        'backup API, once or every --interval seconds. Stand-in for real '
+        'replication when testing read routing locally.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='replica', help='Replica alias to refresh.')
+        parser.add_argument('--interval', type=float, help='Keep syncing every N seconds until interrupted.')
+        parser.add_argument('--pages', type=int, default=1024, help='Pages copied per backup step.')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections or alias == DEFAULT_DB_ALIAS:
+            raise CommandError(f"'{alias}' is not a replica alias.")
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite databases.')
+        if source.is_in_memory_db() or target.is_in_memory_db():
+            raise CommandError('Both databases must be files.')
+
+        while True:
+            began = time.monotonic()
+            self.sync(source.settings_dict['NAME'], target.settings_dict['NAME'], options['pages'])
+            self.stdout.write(f'Synced {alias} in {time.monotonic() - began:.2f}s.')
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, source_name, target_name, pages):
+        # Raw connections: the replica's own Django connections are query_only.
+        source = sqlite3.connect(source_name)
+        target = sqlite3.connect(target_name)
+        try:
+            source.backup(target, pages=pages)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,141 @@
+"""
+In-process request metrics, served in the Prometheus text format.
+
+``InstrumentationMiddleware`` (todos.middleware) feeds one set of
+histograms per process; there is no shared store, so with several worker
+processes every scrape sees the process that answered it. Observing a value
+is a bisect and an increment under a lock.
+"""
+import bisect
+import threading
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set."""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One count per bucket, one for +Inf, then the sum.
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0]
+            series[index] += 1
+            series[-1] += value
+
+    def get(self, **labels):
+        """``(count, sum)`` of the series for ``labels``."""
+        with self._lock:
+            series = self._series.get(tuple(sorted(labels.items())))
+            return (sum(series[:-1]), series[-1]) if series else (0, 0)
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), series):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(key, le=bound)} {cumulative}'
+            yield f'{self.name}_sum{_labels(key)} {series[-1]}'
+            yield f'{self.name}_count{_labels(key)} {cumulative}'
+
+
+class Counter:
+    """Monotonic counter with one series per label set."""
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self._lock:
+            return self._series.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            snapshot = dict(self._series)
+        for key, value in sorted(snapshot.items()):
+            yield f'{self.name}{_labels(key)} {value}'
+
+
+REQUEST_DURATION = Histogram(
+    'todos_request_duration_seconds', 'Time spent handling a request, by view.', LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram('todos_request_db_queries', 'Database queries per request, by view.', QUERY_BUCKETS)
+DB_DURATION = Histogram(
+    'todos_request_db_duration_seconds', 'Time spent in database queries per request, by view.', LATENCY_BUCKETS,
+)
+TEMPLATE_DURATION = Histogram(
+    'todos_request_template_duration_seconds',
+    'Time spent rendering templates per request, by view, excluding queries run while rendering.',
+    LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'todos_response_size_bytes', 'Size of non-streaming response bodies, by view.', SIZE_BUCKETS,
+)
+RESPONSES = Counter('todos_responses_total', 'Responses by view and status code.')
+
+METRICS = [REQUEST_DURATION, DB_QUERIES, DB_DURATION, TEMPLATE_DURATION, RESPONSE_SIZE, RESPONSES]
+
+
+def observe(view, status, timings, total, size=None):
+    """Record one request's measurements (a ``RequestTimings``) under ``view``."""
+    REQUEST_DURATION.observe(total, view=view)
+    DB_QUERIES.observe(timings.queries, view=view)
+    DB_DURATION.observe(timings.db, view=view)
+    TEMPLATE_DURATION.observe(timings.template, view=view)
+    if size is not None:
+        RESPONSE_SIZE.observe(size, view=view)
+    RESPONSES.inc(view=view, status=status)
+
+
+def render():
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+@require_GET
+def metrics_view(request):
+    """The metrics of this process, for a Prometheus scraper."""
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
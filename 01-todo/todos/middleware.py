@@ -0,0 +1,104 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+from .instrumentation import timing
+from .routers import read_replicas, routing
+
+PIN_COOKIE = 'todos_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaPinMiddleware:
+    """
+    Keep a client's reads on the primary database right after it writes.
+
+    Unsafe requests read from the primary throughout. When a request writes
+    a todo, a short-lived cookie pins that client's following requests (the
+    redirect back to the list) to the primary for
+    ``TODOS_REPLICA_PIN_SECONDS``, hiding replication lag from the writer.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routing(self.pinned(request)) as state:
+            response = self.get_response(request)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        with routing(self.pinned(request)) as state:
+            response = await self.get_response(request)
+        return self.process_response(state, response)
+
+    def pinned(self, request):
+        return request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+
+    def process_response(self, state, response):
+        if state.wrote and read_replicas():
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'TODOS_REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class InstrumentationMiddleware:
+    """
+    Measure every request: total time, database queries and their time,
+    template rendering and response size, per view (todos.instrumentation).
+
+    The measurements feed the histograms served at /metrics and, with
+    ``TODOS_SERVER_TIMING``, a ``Server-Timing`` header. Queries run while a
+    streaming response is consumed are not counted. Listed first in
+    MIDDLEWARE, so the total covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TODOS_METRICS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'TODOS_SERVER_TIMING', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with timing(request) as timings:
+            response = self.get_response(request)
+        return self.process_response(request, response, timings)
+
+    async def __acall__(self, request):
+        with timing(request) as timings:
+            response = await self.get_response(request)
+        return self.process_response(request, response, timings)
+
+    def process_response(self, request, response, timings):
+        total = timings.elapsed()
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        metrics.observe(view, response.status_code, timings, total, size)
+        if self.server_timing:
+            entries = [
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+                f'tpl;dur={timings.template * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+            ]
+            if response.has_header('Server-Timing'):
+                entries.insert(0, response.headers['Server-Timing'])
+            response.headers['Server-Timing'] = ', '.join(entries)
+        return response
@@ -0,0 +1,67 @@
+"""
+Full-text index over Todo.title and Todo.description.
+
+An external-content FTS5 table mirrors todos_todo; triggers keep it in sync
+for every write path, including bulk_create, QuerySet.update() and raw
+deletes. SQLite only; other backends fall back to LIKE searches.
+"""
+from django.db import migrations
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE todos_todo_fts USING fts5(
+        title, description,
+        content='todos_todo', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_todo_fts_insert AFTER INSERT ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todo_fts_delete AFTER DELETE ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todo_fts_update AFTER UPDATE OF title, description ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_todo_fts(todos_todo_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS todos_todo_fts_update',
+    'DROP TRIGGER IF EXISTS todos_todo_fts_delete',
+    'DROP TRIGGER IF EXISTS todos_todo_fts_insert',
+    'DROP TABLE IF EXISTS todos_todo_fts',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0003_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0004_todo_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('token', models.CharField(max_length=32)),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:02
+"""
+Add Todo.version for optimistic concurrency.
+
+On SQLite, adding the column rebuilds todos_todo, which drops the triggers
+that keep todos_todo_fts in sync (0004_todo_fts). They are re-created after
+the rebuild, and after the rebuild that removes the column on unapply.
+"""
+from django.db import migrations, models
+
+# Frozen copy of the trigger definitions from 0004_todo_fts.
+TRIGGER_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_insert AFTER INSERT ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_delete AFTER DELETE ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_update AFTER UPDATE OF title, description ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in TRIGGER_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0005_cache_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_triggers),
+        migrations.AddField(
+            model_name='todo',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(create_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:13
+"""
+Incrementally maintained Todo counters.
+
+The single TodoStats row is seeded from the current table; on SQLite,
+triggers on todos_todo keep it current for every write path, including
+bulk_create, QuerySet.update() and raw deletes.
+"""
+from django.db import migrations, models
+
+CREATE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER todos_todostats_insert AFTER INSERT ON todos_todo BEGIN
+        UPDATE todos_todostats SET total = total + 1, resolved = resolved + new.resolved WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todostats_delete AFTER DELETE ON todos_todo BEGIN
+        UPDATE todos_todostats SET total = total - 1, resolved = resolved - old.resolved WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todostats_update AFTER UPDATE OF resolved ON todos_todo
+    WHEN new.resolved != old.resolved BEGIN
+        UPDATE todos_todostats SET resolved = resolved + new.resolved - old.resolved WHERE id = 1;
+    END
+    """,
+]
+
+DROP_TRIGGERS_SQL = [
+    'DROP TRIGGER IF EXISTS todos_todostats_update',
+    'DROP TRIGGER IF EXISTS todos_todostats_delete',
+    'DROP TRIGGER IF EXISTS todos_todostats_insert',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def seed(apps, schema_editor):
+    Todo = apps.get_model('todos', 'Todo')
+    TodoStats = apps.get_model('todos', 'TodoStats')
+    todos = Todo.objects.using(schema_editor.connection.alias)
+    TodoStats.objects.using(schema_editor.connection.alias).create(
+        pk=1, total=todos.count(), resolved=todos.filter(resolved=True).count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0006_todo_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.BigIntegerField(default=0)),
+                ('resolved', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+        migrations.RunPython(_run(CREATE_TRIGGERS_SQL), _run(DROP_TRIGGERS_SQL)),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:16
+"""
+Change feed for delta sync: Todo.change_seq, ChangeSequence and
+TodoTombstone.
+
+Existing todos are numbered by id. On SQLite, triggers then number every
+insert, update and delete. Adding the column rebuilds todos_todo, which
+drops the FTS (0004_todo_fts) and counter (0007_todo_stats) triggers; they
+are re-created after the rebuild, and after the rebuild that removes the
+column on unapply.
+"""
+from django.db import migrations, models
+from django.db.models import F, Max
+
+# Frozen copies of the trigger definitions from 0004_todo_fts and
+# 0007_todo_stats.
+PREVIOUS_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_insert AFTER INSERT ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_delete AFTER DELETE ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todo_fts_update AFTER UPDATE OF title, description ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_todo_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todostats_insert AFTER INSERT ON todos_todo BEGIN
+        UPDATE todos_todostats SET total = total + 1, resolved = resolved + new.resolved WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todostats_delete AFTER DELETE ON todos_todo BEGIN
+        UPDATE todos_todostats SET total = total - 1, resolved = resolved - old.resolved WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS todos_todostats_update AFTER UPDATE OF resolved ON todos_todo
+    WHEN new.resolved != old.resolved BEGIN
+        UPDATE todos_todostats SET resolved = resolved + new.resolved - old.resolved WHERE id = 1;
+    END
+    """,
+]
+
+# The upsert recreates the sequence row if it was deleted (e.g. by flush).
+# The update trigger lists every column but change_seq, so the trigger's own
+# UPDATE does not fire it again; a migration adding a Todo column must add
+# the column to the list.
+CHANGE_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER todos_todo_changes_insert AFTER INSERT ON todos_todo BEGIN
+        INSERT INTO todos_changesequence (id, value) VALUES (1, 1)
+        ON CONFLICT (id) DO UPDATE SET value = value + 1;
+        UPDATE todos_todo SET change_seq = (SELECT value FROM todos_changesequence WHERE id = 1)
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todo_changes_update
+    AFTER UPDATE OF title, description, due_date, resolved, created_at, updated_at, version ON todos_todo BEGIN
+        INSERT INTO todos_changesequence (id, value) VALUES (1, 1)
+        ON CONFLICT (id) DO UPDATE SET value = value + 1;
+        UPDATE todos_todo SET change_seq = (SELECT value FROM todos_changesequence WHERE id = 1)
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todo_changes_delete AFTER DELETE ON todos_todo BEGIN
+        INSERT INTO todos_changesequence (id, value) VALUES (1, 1)
+        ON CONFLICT (id) DO UPDATE SET value = value + 1;
+        INSERT INTO todos_todotombstone (todo_id, change_seq, deleted_at)
+        SELECT old.id, value, strftime('%Y-%m-%d %H:%M:%f', 'now') FROM todos_changesequence WHERE id = 1;
+    END
+    """,
+]
+
+DROP_CHANGE_TRIGGERS_SQL = [
+    'DROP TRIGGER IF EXISTS todos_todo_changes_delete',
+    'DROP TRIGGER IF EXISTS todos_todo_changes_update',
+    'DROP TRIGGER IF EXISTS todos_todo_changes_insert',
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+def seed(apps, schema_editor):
+    Todo = apps.get_model('todos', 'Todo')
+    ChangeSequence = apps.get_model('todos', 'ChangeSequence')
+    todos = Todo.objects.using(schema_editor.connection.alias)
+    todos.update(change_seq=F('id'))
+    ChangeSequence.objects.using(schema_editor.connection.alias).create(
+        pk=1, value=todos.aggregate(last=Max('id'))['last'] or 0,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0007_todo_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TodoTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('todo_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField(unique=True)),
+                ('deleted_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(migrations.RunPython.noop, _run(PREVIOUS_TRIGGERS_SQL)),
+        migrations.AddField(
+            model_name='todo',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['change_seq'], name='todo_change_seq_idx'),
+        ),
+        migrations.RunPython(_run(PREVIOUS_TRIGGERS_SQL), migrations.RunPython.noop),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+        migrations.RunPython(_run(CHANGE_TRIGGERS_SQL), _run(DROP_CHANGE_TRIGGERS_SQL)),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0008_todo_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTodo',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['archived_at', 'id'], name='archived_todo_archived_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 01:14
+"""
+Add Todo.resolved_at, the time a todo was resolved, for archival.
+
+The column is nullable, so SQLite adds it in place and the triggers on
+todos_todo survive. Todos already resolved get their last write time, the
+best record there is of when they were resolved.
+"""
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    Todo = apps.get_model('todos', 'Todo')
+    Todo.objects.using(schema_editor.connection.alias).filter(resolved=True).update(resolved_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0009_archived_todo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='todo',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['resolved', 'resolved_at'], name='todo_resolved_at_idx'),
+        ),
+    ]
@@ -1,21 +1,297 @@
+from asgiref.sync import sync_to_async
 from django.db import models
+from django.db.models import BooleanField, Case, DateTimeField, F, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 
+from .search import FTS_TABLE, fts_match, like_filter, uses_fts
+from .signals import todos_changed
+
+
+def resolved_at(resolved, now):
+    """
+    The ``resolved_at`` to write along with ``resolved``: kept if the todo
+    was already resolved, ``now`` if this write resolves it, else null.
+    """
+    if not resolved:
+        return None
+    return Coalesce(F('resolved_at'), Value(now, output_field=DateTimeField()))
+
+
+class TodoQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        now = timezone.now()
+        objs = list(objs)
+        for obj in objs:
+            if obj.resolved and obj.resolved_at is None:
+                obj.resolved_at = now
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            todos_changed.send(sender=self.model, action='create', objs=objs)
+        return objs
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            todos_changed.send(sender=self.model, action='update')
+        return rows
+
+    def resolved(self, value=True):
+        # filter(resolved=True) compiles to a bare WHERE "resolved", which
+        # SQLite cannot match against an index; comparing with a bound
+        # parameter lets the (resolved, ...) composite indexes be used.
+        return self.filter(resolved=Value(value))
+
+    def unresolved(self):
+        return self.resolved(False)
+
+    def overdue(self, now=None):
+        """Unresolved todos whose due date has passed, via (resolved, due_date)."""
+        return self.unresolved().filter(due_date__lt=now or timezone.now())
+
+    def set_resolved(self, resolved, now=None):
+        """Resolve or reopen every matching todo with one UPDATE statement."""
+        now = now or timezone.now()
+        return self.update(
+            resolved=resolved, resolved_at=resolved_at(resolved, now), updated_at=now, version=F('version') + 1,
+        )
+
+    def toggle_resolved(self, now=None):
+        """Flip ``resolved`` of every matching todo in the database, with one UPDATE."""
+        now = now or timezone.now()
+        return self.update(
+            resolved=Case(When(resolved=True, then=Value(False)), default=Value(True)),
+            resolved_at=Case(When(resolved=False, then=Value(now)), default=None, output_field=DateTimeField()),
+            updated_at=now,
+            version=F('version') + 1,
+        )
+
+    def update_versioned(self, expected_version, now=None, **values):
+        """
+        Write ``values`` only where the row still has ``expected_version``.
+
+        Returns the number of rows written; 0 means the todo is gone or was
+        changed since ``expected_version`` was read.
+        """
+        now = now or timezone.now()
+        if 'resolved' in values:
+            values['resolved_at'] = resolved_at(values['resolved'], now)
+        return self.filter(version=expected_version).update(updated_at=now, version=F('version') + 1, **values)
+
+    async def aset_resolved(self, resolved, now=None):
+        return await sync_to_async(self.set_resolved)(resolved, now)
+
+    async def atoggle_resolved(self, now=None):
+        return await sync_to_async(self.toggle_resolved)(now)
+
+    async def aupdate_versioned(self, expected_version, now=None, **values):
+        return await sync_to_async(self.update_versioned)(expected_version, now, **values)
+
+    def bulk_delete(self):
+        """
+        Delete every matching todo with one DELETE ... WHERE statement.
+
+        QuerySet.delete() first selects the rows to run the deletion
+        collector; todos have no relations that need it.
+        """
+        rows = self._raw_delete(self.db)
+        if rows:
+            todos_changed.send(sender=self.model, action='delete')
+        return rows
+
+    def search(self, text):
+        """Todos whose title or description contain every word of ``text`` as a prefix."""
+        match = fts_match(text)
+        if not match:
+            return self.none()
+        if not uses_fts(self):
+            return self.filter(like_filter(text))
+        return self.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    def ranked_search(self, text):
+        """
+        Like search(), but joined to the FTS index and annotated with its bm25
+        ``search_rank`` (lower is more relevant) for ordering.
+        """
+        match = fts_match(text)
+        if not match:
+            return self.none()
+        if not uses_fts(self):
+            return self.filter(like_filter(text)).annotate(search_rank=Value(0.0))
+        return self.extra(
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = todos_todo.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        )
+
+    def with_overdue(self, now=None):
+        """
+        Annotate each row with ``overdue``, computed in SQL against a single
+        ``now`` so that a whole page agrees on what is overdue.
+        """
+        return self.annotate(overdue=Case(
+            When(resolved=False, due_date__lt=now or timezone.now(), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ))
+
+
 class Todo(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     due_date = models.DateTimeField(blank=True, null=True)
     resolved = models.BooleanField(default=False)
+    # When the todo was last resolved; null while it is open. Set by every
+    # write that changes ``resolved``, unlike ``updated_at``, which later
+    # edits move.
+    resolved_at = models.DateTimeField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Incremented by every write; edits that carry a stale version fail.
+    version = models.PositiveIntegerField(default=1)
+    # Position in the change feed, assigned by the database on every insert
+    # and update (see ChangeSequence); the in-memory value is not refreshed.
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    objects = TodoQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        # Back every status/sort combination offered by todos.filters. SQLite
+        # appends the rowid to each index, so (x, y) also serves ORDER BY
+        # x, y, id without a temporary sort.
+        indexes = [
+            models.Index(fields=['created_at'], name='todo_created_idx'),
+            models.Index(fields=['due_date'], name='todo_due_idx'),
+            models.Index(fields=['updated_at'], name='todo_updated_idx'),
+            models.Index(fields=['resolved', 'created_at'], name='todo_resolved_created_idx'),
+            models.Index(fields=['resolved', 'due_date'], name='todo_resolved_due_idx'),
+            models.Index(fields=['resolved', 'updated_at'], name='todo_resolved_updated_idx'),
+            models.Index(fields=['change_seq'], name='todo_change_seq_idx'),
+            # Archival picks resolved todos by age (todos.archive).
+            models.Index(fields=['resolved', 'resolved_at'], name='todo_resolved_at_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if not self.resolved:
+            self.resolved_at = None
+        elif self.resolved_at is None:
+            self.resolved_at = timezone.now()
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                extra = {'version', 'resolved_at'} if 'resolved' in update_fields else {'version'}
+                kwargs['update_fields'] = {*update_fields, *extra}
+        super().save(*args, **kwargs)
+
     def is_overdue(self):
+        if hasattr(self, 'overdue'):
+            return self.overdue
         if self.due_date and not self.resolved:
             return timezone.now() > self.due_date
         return False
+
+
+class ImportCheckpoint(models.Model):
+    """Input rows consumed by ``import_todos`` for one source, committed
+    in the same transaction as the rows themselves."""
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source} @ {self.offset}'
+
+
+class CacheVersion(models.Model):
+    """
+    Opaque token naming the current state of a cached data set.
+
+    The token is replaced with a fresh random value on every change, inside
+    the writing transaction, so it is shared by all worker processes and is
+    rolled back together with the data it describes.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    token = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f'{self.name}: {self.token}'
+
+
+class TodoStats(models.Model):
+    """
+    Row counts of Todo in a single row (pk=1). On SQLite, triggers update it
+    in the same transaction as every insert, delete and change of
+    ``resolved``, whichever code path writes; ``reconcile_stats`` corrects
+    drift. Overdue counts depend on the clock and are not stored.
+    """
+    total = models.BigIntegerField(default=0)
+    resolved = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.total} todos, {self.resolved} resolved'
+
+
+class ChangeSequence(models.Model):
+    """
+    Last change sequence number handed out, in a single row (pk=1).
+
+    On SQLite, triggers take the next number for every insert and update of
+    a Todo (stored in ``Todo.change_seq``) and every delete (stored in a
+    ``TodoTombstone``), in the writing transaction. Writes are serialized,
+    so numbers become visible in increasing order.
+    """
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class TodoTombstone(models.Model):
+    """Record of a deleted todo, so delta sync clients can drop it too."""
+    todo_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField(unique=True)
+    deleted_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.todo_id} deleted @ {self.change_seq}'
+
+
+class ArchivedTodo(models.Model):
+    """
+    A resolved todo moved out of the hot table by ``archive_todos``. Keeps
+    the todo's id; ``archived_at`` drives the retention purge.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    due_date = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['archived_at', 'id'], name='archived_todo_archived_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_todo(cls, todo, archived_at):
+        return cls(
+            id=todo.pk,
+            title=todo.title,
+            description=todo.description,
+            due_date=todo.due_date,
+            created_at=todo.created_at,
+            resolved_at=todo.resolved_at,
+            archived_at=archived_at,
+        )
@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of the last (or first) row shown rather
+than by a row offset, so fetching page N is a single index seek followed by
+a LIMIT, no matter how deep N is. Cursors are signed so that clients treat
+them as opaque tokens and cannot forge arbitrary seek positions.
+"""
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'todos.pagination.cursor'
+
+NEXT = 'n'
+PREV = 'p'
+
+
+class KeysetPage:
+    """One page of results plus the cursors of its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+def _split(ordering):
+    """Turn ('-created_at', 'id') into [('created_at', True), ('id', False)]."""
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+def _after(name, descending, value, nullable):
+    """Rows strictly after ``value`` on one column (SQL sorts NULL lowest)."""
+    if descending:
+        if value is None:
+            return Q(pk__in=[])
+        if nullable:
+            return Q(**{f'{name}__lt': value}) | Q(**{f'{name}__isnull': True})
+        return Q(**{f'{name}__lt': value})
+    if value is None:
+        return Q(**{f'{name}__isnull': False})
+    return Q(**{f'{name}__gt': value})
+
+
+def _equal(name, value):
+    if value is None:
+        return Q(**{f'{name}__isnull': True})
+    return Q(**{name: value})
+
+
+def seek(model, ordering, values):
+    """
+    Build the WHERE clause selecting rows that sort after ``values``.
+
+    For ordering (a, b) this expands to ``a >= x AND (a > x OR b > y)``. The
+    redundant leading bound gives SQLite a range to seek on an index over
+    (a, b); without it the OR is planned as a multi-index union and a sort.
+    """
+    columns = _split(ordering)
+    nullable = [model._meta.get_field(name).null for name, _ in columns]
+    condition = Q(pk__in=[])
+    for i, (name, descending) in enumerate(columns):
+        term = _after(name, descending, values[i], nullable[i])
+        for j, (prev_name, _) in enumerate(columns[:i]):
+            term &= _equal(prev_name, values[j])
+        condition |= term
+    name, descending = columns[0]
+    if values[0] is not None and not (descending and nullable[0]):
+        condition &= Q(**{f'{name}__lte' if descending else f'{name}__gte': values[0]})
+    return condition
+
+
+def encode_cursor(model, ordering, direction, obj):
+    values = []
+    for name, _ in _split(ordering):
+        field = model._meta.get_field(name)
+        value = getattr(obj, field.attname)
+        values.append(None if value is None else field.value_to_string(obj))
+    return signing.dumps({'o': list(ordering), 'd': direction, 'k': values}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(model, ordering, cursor):
+    """
+    Return ``(direction, values)`` for a cursor, or ``(None, None)`` when the
+    cursor is missing, tampered with, or was issued for a different ordering.
+    """
+    if not cursor:
+        return None, None
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None, None
+    if payload.get('o') != list(ordering) or payload.get('d') not in (NEXT, PREV):
+        return None, None
+    values = []
+    for (name, _), raw in zip(_split(ordering), payload.get('k', [])):
+        field = model._meta.get_field(name)
+        values.append(None if raw is None else field.to_python(raw))
+    if len(values) != len(ordering):
+        return None, None
+    return payload['d'], values
+
+
+def _page_query(queryset, ordering, cursor, per_page):
+    model = queryset.model
+    direction, values = decode_cursor(model, ordering, cursor)
+
+    if direction == PREV:
+        queryset = queryset.filter(seek(model, _reverse(ordering), values)).order_by(*_reverse(ordering))
+    elif direction == NEXT:
+        queryset = queryset.filter(seek(model, ordering, values)).order_by(*ordering)
+    else:
+        queryset = queryset.order_by(*ordering)
+    return direction, queryset[:per_page + 1]
+
+
+def _make_page(model, ordering, direction, rows, per_page):
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == PREV:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, direction is not None
+
+    next_cursor = encode_cursor(model, ordering, NEXT, rows[-1]) if rows and has_next else None
+    prev_cursor = encode_cursor(model, ordering, PREV, rows[0]) if rows and has_prev else None
+    return KeysetPage(rows, next_cursor, prev_cursor)
+
+
+def paginate(queryset, ordering, cursor=None, per_page=50):
+    """
+    Return a ``KeysetPage`` of ``queryset`` sorted by ``ordering``.
+
+    ``ordering`` must end in a unique column (normally ``id``) so that every
+    row has a distinct position and no row is skipped or repeated between
+    pages.
+    """
+    direction, query = _page_query(queryset, ordering, cursor, per_page)
+    return _make_page(queryset.model, ordering, direction, list(query), per_page)
+
+
+async def apaginate(queryset, ordering, cursor=None, per_page=50):
+    """Async version of ``paginate()``."""
+    direction, query = _page_query(queryset, ordering, cursor, per_page)
+    rows = [row async for row in query]
+    return _make_page(queryset.model, ordering, direction, rows, per_page)
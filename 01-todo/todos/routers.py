@@ -0,0 +1,96 @@
+"""
+Primary/replica routing for the todos app.
+
+Inside a ``routing()`` scope (one per request, opened by
+``ReplicaPinMiddleware``), reads of replicated models go to one alias from
+``settings.TODOS_READ_REPLICAS``, picked at random on the scope's first read
+and kept for the rest of it; writes always go to ``default``.
+Reads stay on the primary when:
+
+* the request is pinned (unsafe methods, and requests from a client that
+  wrote in the last few seconds),
+* the current request has already written a todo, or
+* they happen outside any request (shell, commands, background work),
+  where nothing bounds how stale a replica read may be.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ArchivedTodo, CacheVersion, ChangeSequence, Todo, TodoStats, TodoTombstone
+from .signals import todos_changed
+
+# The cache version, counters and change feed must come from the same
+# database as the rows they describe, hence one replica per scope.
+REPLICATED_MODELS = (Todo, CacheVersion, TodoStats, ChangeSequence, TodoTombstone, ArchivedTodo)
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+_state = ContextVar('todos_routing_state', default=None)
+
+
+@contextmanager
+def routing(pinned=False):
+    """Scope of one request: yields the ``RoutingState`` the router consults."""
+    state = RoutingState(pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def read_replicas():
+    return getattr(settings, 'TODOS_READ_REPLICAS', [])
+
+
+def use_primary():
+    state = _state.get()
+    return state is None or state.pinned or state.wrote
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not issubclass(model, REPLICATED_MODELS):
+            return None
+        replicas = read_replicas()
+        if not replicas or use_primary():
+            return DEFAULT_DB_ALIAS
+        state = _state.get()
+        if state.replica not in replicas:
+            state.replica = random.choice(replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        if issubclass(model, REPLICATED_MODELS):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, schema included.
+        if db in read_replicas():
+            return False
+        return None
+
+
+@receiver(post_save, sender=Todo, dispatch_uid='todos.routers.post_save')
+@receiver(post_delete, sender=Todo, dispatch_uid='todos.routers.post_delete')
+@receiver(todos_changed, sender=Todo, dispatch_uid='todos.routers.todos_changed')
+def record_write(sender, **kwargs):
+    state = _state.get()
+    if state is not None:
+        state.wrote = True
@@ -0,0 +1,117 @@
+"""
+Full-text search over todos, backed by the ``todos_todo_fts`` FTS5 table.
+
+Two entry points share one query builder:
+
+* ``TodoQuerySet.search()`` keeps only matching rows (``id IN (SELECT rowid
+  ...)``) and composes with any filter, sort and keyset pagination;
+* ``TodoQuerySet.ranked_search()`` joins the FTS table and orders by its
+  bm25 ``rank``, for "most relevant first" listings.
+
+Every search word is matched as a prefix, so ``rep`` finds "report".
+"""
+import re
+
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+
+from .pagination import NEXT, PREV, KeysetPage, apaginate, paginate
+
+FTS_TABLE = 'todos_todo_fts'
+CURSOR_SALT = 'todos.search.cursor'
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_match(text):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+    Returns '' when the text contains no searchable words.
+    """
+    return ' '.join(f'"{word}"*' for word in _WORD_RE.findall(text or ''))
+
+
+def uses_fts(queryset):
+    return connections[queryset.db].vendor == 'sqlite'
+
+
+def like_filter(text):
+    """Fallback for databases without FTS5: every word in title or description."""
+    condition = Q()
+    for word in _WORD_RE.findall(text or ''):
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return condition
+
+
+def encode_cursor(text, direction, rank, pk):
+    return signing.dumps({'q': text, 'd': direction, 'k': [rank, pk]}, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(text, cursor):
+    if not cursor:
+        return None, None
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None, None
+    if payload.get('q') != text or payload.get('d') not in (NEXT, PREV):
+        return None, None
+    rank, pk = payload.get('k', (None, None))
+    if not isinstance(rank, (int, float)) or not isinstance(pk, int):
+        return None, None
+    return payload['d'], (rank, pk)
+
+
+def _ranked_query(queryset, text, cursor, per_page):
+    direction, key = decode_cursor(text, cursor)
+    queryset = queryset.ranked_search(text)
+    if direction is None:
+        queryset = queryset.order_by('search_rank', 'id')
+    else:
+        rank, pk = key
+        op = '>' if direction == NEXT else '<'
+        queryset = queryset.extra(
+            where=[
+                f'({FTS_TABLE}.rank {op} %s OR ({FTS_TABLE}.rank = %s AND todos_todo.id {op} %s))',
+            ],
+            params=[rank, rank, pk],
+        )
+        queryset = queryset.order_by(*(('search_rank', 'id') if direction == NEXT else ('-search_rank', '-id')))
+    return direction, queryset[:per_page + 1]
+
+
+def _make_ranked_page(text, direction, rows, per_page):
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if direction == PREV:
+        rows.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, direction is not None
+
+    next_cursor = encode_cursor(text, NEXT, rows[-1].search_rank, rows[-1].pk) if rows and has_next else None
+    prev_cursor = encode_cursor(text, PREV, rows[0].search_rank, rows[0].pk) if rows and has_prev else None
+    return KeysetPage(rows, next_cursor, prev_cursor)
+
+
+def paginate_ranked(queryset, text, cursor=None, per_page=50):
+    """
+    Keyset-paginate a search by relevance, best match first.
+
+    ``queryset`` may carry any filters; pages seek on (rank, id) inside the
+    FTS join instead of using OFFSET.
+    """
+    if not uses_fts(queryset):
+        # Without FTS there is no rank; fall back to newest first.
+        return paginate(queryset.ranked_search(text), ('-created_at', '-id'), cursor=cursor, per_page=per_page)
+    direction, query = _ranked_query(queryset, text, cursor, per_page)
+    return _make_ranked_page(text, direction, list(query), per_page)
+
+
+async def apaginate_ranked(queryset, text, cursor=None, per_page=50):
+    """Async version of ``paginate_ranked()``."""
+    if not uses_fts(queryset):
+        return await apaginate(queryset.ranked_search(text), ('-created_at', '-id'), cursor=cursor, per_page=per_page)
+    direction, query = _ranked_query(queryset, text, cursor, per_page)
+    return _make_ranked_page(text, direction, [row async for row in query], per_page)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after set-based writes that bypass post_save/post_delete: bulk_create,
+# QuerySet.update() (and so bulk_update) and raw deletes. ``action`` is one of
+# 'create', 'update' or 'delete'; ``objs`` carries the created instances.
+todos_changed = Signal()
@@ -0,0 +1,130 @@
+"""
+Slow query log.
+
+The query timer in todos.instrumentation hands every statement that takes
+at least ``TODOS_SLOW_QUERY_MS`` to ``record``, which writes one JSON line
+to the ``todos.slow_queries`` logger (a rotating file, see LOGGING in the
+settings) with:
+
+- the SQL, with placeholders rather than parameter values;
+- SQLite's ``EXPLAIN QUERY PLAN`` for it;
+- the view, method and path of the request that issued it, if any;
+- the innermost frames of the call stack above the database layer.
+
+``manage.py slow_queries`` reads the file back and groups entries by
+statement shape.
+"""
+import json
+import logging
+import os
+import re
+import traceback
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger('todos.slow_queries')
+
+STACK_FRAMES = 6
+_IGNORED_FILES = (__file__, str(Path(__file__).with_name('instrumentation.py')))
+_DB_LAYER = f'{os.sep}django{os.sep}db{os.sep}'
+
+_IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def threshold():
+    """The slow query threshold in seconds, or None when the log is off."""
+    value = getattr(settings, 'TODOS_SLOW_QUERY_MS', None)
+    return None if value is None else value / 1000
+
+
+def shape(sql):
+    """``sql`` with literals and IN lists collapsed, to group similar statements."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql.replace('%s', '?'))
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def explain(connection, sql, params, many):
+    """SQLite's query plan for ``sql`` as a list of steps, or None."""
+    if connection.vendor != 'sqlite':
+        return None
+    if many:
+        params = next(iter(params or []), None)
+    # A bare backend cursor: no execute wrappers, so the EXPLAIN is neither
+    # timed nor logged itself.
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+    except (DatabaseError, ValueError, TypeError):
+        return None
+    finally:
+        cursor.close()
+
+
+def _short_path(filename):
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    _, sep, package_path = filename.rpartition(f'site-packages{os.sep}')
+    return package_path if sep else filename
+
+
+def stack_excerpt():
+    """The innermost frames that led to the query, above Django's database layer."""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename not in _IGNORED_FILES and _DB_LAYER not in frame.filename
+    ]
+    return [f'{_short_path(frame.filename)}:{frame.lineno} in {frame.name}' for frame in frames[-STACK_FRAMES:]]
+
+
+def record(connection, sql, params, many, duration, request=None):
+    entry = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'database': connection.alias,
+        'sql': sql,
+        'plan': explain(connection, sql, params, many),
+        'view': None,
+        'method': None,
+        'path': None,
+        'stack': stack_excerpt(),
+    }
+    if request is not None:
+        match = getattr(request, 'resolver_match', None)
+        entry.update(
+            view=match.view_name if match else None, method=request.method, path=request.get_full_path(),
+        )
+    logger.warning(json.dumps(entry))
+
+
+def log_files(path):
+    """``path`` and its rotated copies (``path.1``, ...), oldest first."""
+    path = Path(path)
+    rotated = sorted(
+        (candidate for candidate in path.parent.glob(f'{path.name}.*') if candidate.suffix[1:].isdigit()),
+        key=lambda candidate: int(candidate.suffix[1:]),
+        reverse=True,
+    )
+    return [*rotated, *([path] if path.exists() else [])]
+
+
+def read_entries(path):
+    """Parsed entries from the log at ``path`` and its rotations; bad lines are skipped."""
+    for file in log_files(path):
+        with open(file) as lines:
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and 'sql' in entry:
+                    yield entry
@@ -0,0 +1,45 @@
+"""
+SQLite performance profile, applied to every new connection.
+
+Connection-level pragmas are not stored in the database file (except
+``journal_mode``), so they are set from a ``connection_created`` receiver
+using ``settings.TODOS_SQLITE_PRAGMAS``, e.g.::
+
+    TODOS_SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',     # readers never wait for the writer
+        'synchronous': 'normal',   # safe with WAL; no fsync per commit
+        'busy_timeout': 5000,      # ms a writer waits for the write lock
+        'cache_size': -20000,      # KiB of page cache per connection
+        'mmap_size': 268435456,    # bytes of the file memory-mapped
+        'temp_store': 'memory',
+    }
+
+In-memory databases (the test database) cannot use WAL and keep their
+journal mode.
+"""
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_NAME_RE = re.compile(r'^[a-z_]+$')
+_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(connection, pragmas):
+    for name, value in pragmas.items():
+        if not _NAME_RE.match(name) or not _VALUE_RE.match(str(value)):
+            raise ValueError(f'Invalid SQLite pragma {name!r} = {value!r}.')
+        if name == 'journal_mode' and connection.is_in_memory_db():
+            continue
+        yield f'PRAGMA {name} = {value}'
+
+
+@receiver(connection_created, dispatch_uid='todos.sqlite.apply_pragmas')
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get('PRAGMAS', getattr(settings, 'TODOS_SQLITE_PRAGMAS', {}))
+    for sql in pragma_statements(connection, pragmas):
+        connection.connection.execute(sql)
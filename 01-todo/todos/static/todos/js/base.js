@@ -0,0 +1,9 @@
+// Auto-dismiss messages after 60 seconds
+document.addEventListener('DOMContentLoaded', function() {
+    const messages = document.querySelectorAll('.message');
+    messages.forEach(function(message) {
+        setTimeout(function() {
+            message.remove();
+        }, 60000); // 60 seconds
+    });
+});
@@ -0,0 +1,24 @@
+// Convert all UTC times to user's local timezone
+function localizeTimes(root) {
+    const timeElements = root.querySelectorAll('.local-time');
+
+    timeElements.forEach(function(element) {
+        const utcTime = element.getAttribute('data-utc');
+        if (utcTime) {
+            const date = new Date(utcTime);
+
+            // Format: YYYY-MM-DD HH:MM
+            const year = date.getFullYear();
+            const month = String(date.getMonth() + 1).padStart(2, '0');
+            const day = String(date.getDate()).padStart(2, '0');
+            const hours = String(date.getHours()).padStart(2, '0');
+            const minutes = String(date.getMinutes()).padStart(2, '0');
+
+            element.textContent = `${year}-${month}-${day} ${hours}:${minutes}`;
+        }
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    localizeTimes(document);
+});
@@ -0,0 +1,33 @@
+// Convert UTC time to local timezone for the datetime input
+document.addEventListener('DOMContentLoaded', function() {
+    const dueDateDisplay = document.getElementById('due_date_display');
+    const dueDateHidden = document.getElementById('due_date');
+    const utcTime = dueDateDisplay.getAttribute('data-utc');
+
+    if (utcTime) {
+        const date = new Date(utcTime);
+
+        // Format for datetime-local input: YYYY-MM-DDTHH:MM
+        const year = date.getFullYear();
+        const month = String(date.getMonth() + 1).padStart(2, '0');
+        const day = String(date.getDate()).padStart(2, '0');
+        const hours = String(date.getHours()).padStart(2, '0');
+        const minutes = String(date.getMinutes()).padStart(2, '0');
+
+        dueDateDisplay.value = `${year}-${month}-${day}T${hours}:${minutes}`;
+    }
+
+    // Convert local time to UTC ISO format before submitting
+    const form = dueDateDisplay.closest('form');
+    form.addEventListener('submit', function(e) {
+        const localDateTime = dueDateDisplay.value;
+
+        if (localDateTime) {
+            // Parse the local datetime and convert to UTC ISO string
+            const localDate = new Date(localDateTime);
+            dueDateHidden.value = localDate.toISOString();
+        } else {
+            dueDateHidden.value = '';
+        }
+    });
+});
@@ -0,0 +1,87 @@
+// Batch actions: ticking "Select all" ticks every todo on the page, and
+// deleting asks first.
+(function() {
+    const batch = document.getElementById('todo-batch');
+    if (!batch) {
+        return;
+    }
+    document.getElementById('todo-select-all').addEventListener('change', function(event) {
+        document.querySelectorAll('.todo-select').forEach(function(box) {
+            box.checked = event.target.checked;
+        });
+    });
+    batch.addEventListener('submit', function(event) {
+        const message = event.submitter && event.submitter.dataset.confirm;
+        if (message && !window.confirm(message)) {
+            event.preventDefault();
+        }
+    });
+})();
+
+// Patch the list in place as todos change elsewhere (todos.events). New
+// todos are only added to the unfiltered first page, newest first.
+if (window.EventSource) {
+    const items = document.getElementById('todo-items');
+    const csrf = document.getElementById('todo-csrf');
+    const source = new EventSource(items.dataset.eventsUrl);
+
+    // Items are rendered once for every browser, with a placeholder
+    // comment where this page's CSRF token goes.
+    function render(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        const walker = document.createTreeWalker(template.content, NodeFilter.SHOW_COMMENT);
+        const placeholders = [];
+        while (walker.nextNode()) {
+            if (walker.currentNode.data === 'todos:csrf') {
+                placeholders.push(walker.currentNode);
+            }
+        }
+        placeholders.forEach(function(node) {
+            node.replaceWith(csrf.content.cloneNode(true));
+        });
+        localizeTimes(template.content);
+        return template.content.firstElementChild;
+    }
+
+    // A todo created and edited between two polls arrives as an update, so
+    // an update for an id newer than the top item is inserted too.
+    function insert(data) {
+        const list = items.querySelector('.todo-list');
+        if (!items.hasAttribute('data-live-create') || document.getElementById('todo-' + data.id)) {
+            return;
+        }
+        if (list) {
+            list.prepend(render(data.html));
+        } else {
+            location.reload();
+        }
+    }
+
+    function isNewer(id) {
+        const top = items.querySelector('.todo-list > [id^="todo-"]');
+        return !top || id > parseInt(top.id.slice('todo-'.length), 10);
+    }
+
+    source.addEventListener('create', function(event) {
+        insert(JSON.parse(event.data));
+    });
+    source.addEventListener('update', function(event) {
+        const data = JSON.parse(event.data);
+        const item = document.getElementById('todo-' + data.id);
+        if (item) {
+            item.replaceWith(render(data.html));
+        } else if (isNewer(data.id)) {
+            insert(data);
+        }
+    });
+    source.addEventListener('delete', function(event) {
+        const item = document.getElementById('todo-' + JSON.parse(event.data).id);
+        if (item) {
+            item.remove();
+        }
+    });
+    source.addEventListener('reload', function() {
+        location.reload();
+    });
+}
@@ -0,0 +1,73 @@
+"""
+Todo counts by status for the list header and ``/api/todos/stats/``.
+
+``total`` and ``resolved`` come from the trigger-maintained ``TodoStats``
+row. Without it (other databases, or a flushed table) they are counted.
+``overdue`` depends on the clock, so it is always counted, as a range scan
+of the (resolved, due_date) index.
+"""
+from django.db import connections, transaction
+from django.db.models import Count, Q
+
+from .models import Todo, TodoStats
+
+STATS_ID = 1
+
+
+def counters_maintained(queryset):
+    return connections[queryset.db].vendor == 'sqlite'
+
+
+def _exact_counts():
+    return {'total': Count('pk'), 'resolved': Count('pk', filter=Q(resolved=True))}
+
+
+def counted():
+    """Exact counts from the todos table (a full scan)."""
+    return Todo.objects.aggregate(**_exact_counts())
+
+
+def _counters_queryset():
+    queryset = TodoStats.objects.filter(pk=STATS_ID).values('total', 'resolved')
+    return queryset if counters_maintained(queryset) else None
+
+
+def _as_dict(counters, overdue):
+    return {
+        'total': counters['total'],
+        'open': counters['total'] - counters['resolved'],
+        'resolved': counters['resolved'],
+        'overdue': overdue,
+    }
+
+
+def counters():
+    """``total`` and ``resolved``, from the maintained row when there is one."""
+    queryset = _counters_queryset()
+    counters = queryset.first() if queryset is not None else None
+    return counters or counted()
+
+
+def todo_stats(now=None):
+    return _as_dict(counters(), Todo.objects.overdue(now).count())
+
+
+async def atodo_stats(now=None):
+    queryset = _counters_queryset()
+    counters = await queryset.afirst() if queryset is not None else None
+    if counters is None:
+        counters = await Todo.objects.aaggregate(**_exact_counts())
+    return _as_dict(counters, await Todo.objects.overdue(now).acount())
+
+
+def reconcile():
+    """
+    Reset the counters to exact counts. Returns ``(before, after)``;
+    ``before`` is None when the row was missing.
+    """
+    # One write transaction, so no todo is written between count and reset.
+    with transaction.atomic():
+        after = counted()
+        before = TodoStats.objects.filter(pk=STATS_ID).values('total', 'resolved').first()
+        TodoStats.objects.update_or_create(pk=STATS_ID, defaults=after)
+    return before, after
@@ -1,8 +1,41 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+from django.conf import settings
+from django.contrib.admin.models import CHANGE, DELETION, LogEntry
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, connections, router, transaction
+from django.db.utils import ConnectionHandler
+from django.middleware.csrf import _unmask_cipher_token
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from django.utils import timezone
+from django.utils.crypto import get_random_string
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from datetime import timedelta
-from .models import Todo
+from io import StringIO
+from itertools import product
+from unittest import mock
+import asyncio
+import csv
+import gzip
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from . import cache as todo_cache
+from . import archive, assets, export, instrumentation, loadtest, metrics, slowlog, stats, writer
+from .bench import percentile
+from .filters import TodoListParams, STATUS_CHOICES, SORT_ORDERINGS
+from .middleware import PIN_COOKIE
+from .models import ArchivedTodo, ChangeSequence, ImportCheckpoint, Todo, TodoStats, TodoTombstone
+from .pagination import seek
+from .routers import routing
 
 
 class TodoModelTests(TestCase):
@@ -119,6 +152,297 @@ class TodoModelTests(TestCase):
         self.assertIsNone(todo.due_date)
 
 
+class TodoOverdueAnnotationTests(TestCase):
+    """Test cases for computing overdue in SQL"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.late = Todo.objects.create(title="Late", due_date=self.now - timedelta(hours=1))
+        self.future = Todo.objects.create(title="Future", due_date=self.now + timedelta(hours=1))
+        self.done = Todo.objects.create(title="Done", resolved=True, due_date=self.now - timedelta(hours=1))
+        self.undated = Todo.objects.create(title="Undated")
+
+    def test_with_overdue_annotates_each_row(self):
+        """Test the overdue annotation matches is_overdue semantics"""
+        flags = dict(Todo.objects.with_overdue(self.now).values_list('title', 'overdue'))
+        self.assertEqual(flags, {"Late": True, "Future": False, "Done": False, "Undated": False})
+
+    def test_with_overdue_uses_the_given_now(self):
+        """Test all rows are judged against the same instant"""
+        later = self.now + timedelta(hours=2)
+        overdue = Todo.objects.with_overdue(later).filter(overdue=True)
+        self.assertEqual({todo.title for todo in overdue}, {"Late", "Future"})
+
+    def test_is_overdue_prefers_annotation(self):
+        """Test is_overdue returns the SQL value without recomputing"""
+        todo = Todo.objects.with_overdue(self.now + timedelta(hours=2)).get(pk=self.future.pk)
+        self.assertTrue(todo.is_overdue())
+        self.assertFalse(Todo.objects.get(pk=self.future.pk).is_overdue())
+
+    def test_overdue_count_is_a_single_indexed_query(self):
+        """Test counting overdue todos is one query on the (resolved, due_date) index"""
+        with self.assertNumQueries(1):
+            self.assertEqual(Todo.objects.overdue(self.now).count(), 1)
+        if connection.vendor == 'sqlite':
+            sql, params = Todo.objects.overdue(self.now).values('pk').query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+            self.assertIn('todo_resolved_due_idx', plan)
+
+    def test_list_view_renders_from_annotation(self):
+        """Test the list view annotates overdue and renders the badge"""
+        response = self.client.get(reverse('todo_list'))
+        todos = {todo.title: todo.overdue for todo in response.context['todos']}
+        self.assertTrue(todos["Late"])
+        self.assertFalse(todos["Future"])
+        self.assertContains(response, 'status-badge overdue', count=1)
+
+    def test_admin_changelist_shows_overdue_column(self):
+        """Test the admin changelist annotates overdue"""
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        response = self.client.get(reverse('admin:todos_todo_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'column-overdue')
+        late = next(todo for todo in response.context['cl'].result_list if todo.pk == self.late.pk)
+        self.assertTrue(late.overdue)
+
+
+class FullTextSearchTests(TestCase):
+    """Test cases for FTS5-backed search"""
+
+    def setUp(self):
+        self.report = Todo.objects.create(title="Quarterly report", description="Send to finance")
+        self.review = Todo.objects.create(title="Code review", description="Review the report draft")
+        self.groceries = Todo.objects.create(title="Groceries", description="Milk and eggs")
+
+    def titles(self, queryset):
+        return sorted(todo.title for todo in queryset)
+
+    def test_prefix_matching(self):
+        """Test every word matches as a prefix in title or description"""
+        self.assertEqual(self.titles(Todo.objects.search('rep')), ["Code review", "Quarterly report"])
+        self.assertEqual(self.titles(Todo.objects.search('report fin')), ["Quarterly report"])
+        self.assertEqual(list(Todo.objects.search('   ')), [])
+
+    def test_quotes_and_operators_are_literal(self):
+        """Test FTS syntax in user input cannot break the query"""
+        self.assertEqual(list(Todo.objects.search('"OR NEAR( report*')), [])
+        self.assertEqual(self.titles(Todo.objects.search('report"')), ["Code review", "Quarterly report"])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test triggers keep the FTS index in sync with every write path"""
+        self.groceries.title = "Buy bread"
+        self.groceries.save()
+        self.assertEqual(self.titles(Todo.objects.search('bread')), ["Buy bread"])
+        self.assertEqual(list(Todo.objects.search('groceries')), [])
+        Todo.objects.filter(pk=self.report.pk).update(description="Send to legal")
+        self.assertEqual(list(Todo.objects.search('finance')), [])
+        Todo.objects.filter(pk=self.review.pk).bulk_delete()
+        self.assertEqual(self.titles(Todo.objects.search('report')), ["Quarterly report"])
+        Todo.objects.bulk_create([Todo(title="Report archive")])
+        self.assertEqual(len(Todo.objects.search('archive')), 1)
+
+    def test_ranked_search_orders_by_relevance(self):
+        """Test a title hit outranks a single description hit"""
+        ranked = list(Todo.objects.ranked_search('report').order_by('search_rank'))
+        self.assertEqual(ranked[0], self.report)
+
+    def test_search_does_not_scan_todos(self):
+        """Test search is answered from the FTS index, not LIKE over todos_todo"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('FTS5 is SQLite specific')
+        sql, params = Todo.objects.search('report').query.sql_with_params()
+        self.assertNotIn('LIKE', sql)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertIn('VIRTUAL TABLE INDEX', ' '.join(plan))
+
+    def test_list_view_search_box(self):
+        """Test q filters the list and defaults to relevance order"""
+        response = self.client.get(reverse('todo_list'), {'q': 'report'})
+        self.assertEqual([todo.title for todo in response.context['todos']], ["Quarterly report", "Code review"])
+        self.assertContains(response, 'value="relevance" selected')
+
+    def test_list_view_search_combines_with_filters_and_sort(self):
+        """Test search composes with status filters and column sorts"""
+        Todo.objects.filter(pk=self.review.pk).update(resolved=True)
+        response = self.client.get(reverse('todo_list'), {'q': 'report', 'status': 'open'})
+        self.assertEqual([todo.title for todo in response.context['todos']], ["Quarterly report"])
+        response = self.client.get(reverse('todo_list'), {'q': 'report', 'sort': 'created'})
+        self.assertEqual([todo.title for todo in response.context['todos']], ["Code review", "Quarterly report"])
+
+    @override_settings(TODOS_PAGE_SIZE=2)
+    def test_relevance_pages(self):
+        """Test relevance-ordered results page by keyset in both directions"""
+        Todo.objects.bulk_create(Todo(title=f"report {i}") for i in range(3))
+        url = reverse('todo_list')
+        first = self.client.get(url, {'q': 'report'}).context['page']
+        visited, page = [], first
+        while True:
+            visited.extend(todo.pk for todo in page)
+            if not page.has_next:
+                break
+            page = self.client.get(url, {'q': 'report', 'cursor': page.next_cursor}).context['page']
+        self.assertEqual(len(visited), 5)
+        self.assertEqual(len(set(visited)), 5)
+        second = self.client.get(url, {'q': 'report', 'cursor': first.next_cursor}).context['page']
+        back = self.client.get(url, {'q': 'report', 'cursor': second.prev_cursor}).context['page']
+        self.assertEqual(list(back), list(first))
+
+    def test_admin_search_uses_fts(self):
+        """Test the admin changelist searches through the FTS index"""
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:todos_todo_changelist'), {'q': 'report'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.report, self.review])
+        self.assertFalse(any('LIKE' in q['sql'] and 'todos_todo' in q['sql'] for q in ctx.captured_queries))
+
+
+class TodoAdminTests(TestCase):
+    """Test cases for the admin changelist on large tables"""
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        self.url = reverse('admin:todos_todo_changelist')
+        self.todos = [Todo.objects.create(title=f"Todo {i}") for i in range(5)]
+
+    def changelist(self, params=None):
+        response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, response.context['cl']
+
+    def test_unfiltered_count_reads_counters(self):
+        """Test the unfiltered changelist takes its count from TodoStats"""
+        with CaptureQueriesContext(connection) as ctx:
+            response, cl = self.changelist()
+        self.assertEqual(cl.result_count, 5)
+        self.assertContains(response, '5 todos')
+        self.assertFalse(any('COUNT(' in q['sql'] and 'todos_todo' in q['sql'] for q in ctx.captured_queries))
+
+    @override_settings(TODOS_ADMIN_COUNT_LIMIT=3)
+    def test_filtered_count_is_capped(self):
+        """Test a filtered count stops at TODOS_ADMIN_COUNT_LIMIT"""
+        response, cl = self.changelist({'resolved__exact': '0'})
+        self.assertEqual(cl.result_count, 3)
+        self.assertContains(response, 'More than 3 todos')
+        _, cl = self.changelist({'resolved__exact': '1'})
+        self.assertEqual(cl.result_count, 0)
+
+    @mock.patch('todos.admin.TodoAdmin.list_per_page', 2)
+    def test_pages_by_keyset(self):
+        """Test the changelist pages with cursor links instead of page numbers"""
+        newest_first = [todo.pk for todo in reversed(self.todos)]
+        response, cl = self.changelist()
+        self.assertEqual([todo.pk for todo in cl.result_list], newest_first[:2])
+        self.assertIsNone(cl.previous_url)
+        self.assertContains(response, cl.next_url.replace('&', '&amp;'))
+        self.assertNotContains(response, '?p=')
+        with CaptureQueriesContext(connection) as ctx:
+            _, cl = self.changelist({'cursor': cl.keyset_page.next_cursor})
+        self.assertEqual([todo.pk for todo in cl.result_list], newest_first[2:4])
+        self.assertFalse(any('OFFSET' in q['sql'] for q in ctx.captured_queries))
+        _, cl = self.changelist({'cursor': cl.keyset_page.next_cursor})
+        self.assertEqual([todo.pk for todo in cl.result_list], newest_first[4:])
+        self.assertIsNone(cl.next_url)
+        _, cl = self.changelist({'cursor': cl.keyset_page.prev_cursor})
+        self.assertEqual([todo.pk for todo in cl.result_list], newest_first[2:4])
+
+    def test_filter_links_drop_the_cursor(self):
+        """Test filter and sort links start again from the first page"""
+        _, cl = self.changelist({'cursor': 'anything'})
+        self.assertNotIn('cursor', cl.get_query_string({'resolved__exact': '1'}))
+        self.assertNotIn('cursor', cl.params)
+
+    def test_search_falls_back_to_offset_pages(self):
+        """Test search results, ranked by the FTS index, keep page numbers"""
+        _, cl = self.changelist({'q': 'todo'})
+        self.assertIsNone(cl.keyset_page)
+        self.assertEqual(cl.result_count, 5)
+
+    def test_date_filter_drills_down_by_year_and_month(self):
+        """Test the date filter lists years from the data and months of the chosen year"""
+        Todo.objects.filter(pk=self.todos[0].pk).update(created_at=timezone.now().replace(year=2019))
+        response, _ = self.changelist()
+        this_year = timezone.localtime().year
+        self.assertContains(response, '>2019</a>')
+        self.assertContains(response, f'>{this_year}</a>')
+        self.assertNotContains(response, 'March 2019')
+
+        response, cl = self.changelist({
+            'created_at__gte': '2019-01-01 00:00:00+00:00', 'created_at__lt': '2020-01-01 00:00:00+00:00',
+        })
+        self.assertContains(response, 'March 2019')
+        self.assertEqual([todo.pk for todo in cl.result_list], [self.todos[0].pk])
+
+    def post_action(self, action, pks=(), **extra):
+        return self.client.post(self.url, {
+            'action': action, '_selected_action': [str(pk) for pk in pks], **extra,
+        })
+
+    def test_resolve_actions_run_one_update(self):
+        """Test the resolve and unresolve actions are single UPDATE statements"""
+        selected = [todo.pk for todo in self.todos[:3]]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post_action('resolve_selected', selected)
+        self.assertEqual(response.status_code, 302)
+        writes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "todos_todo"')]
+        self.assertEqual(len(writes), 1)
+        # No todo is loaded: neither the selection nor a changelist page.
+        self.assertFalse(any('"todos_todo"."title"' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(set(Todo.objects.resolved().values_list('pk', flat=True)), set(selected))
+
+        self.post_action('unresolve_selected', [self.todos[0].pk], select_across='1')
+        self.assertFalse(Todo.objects.resolved().exists())
+
+    def test_delete_action_confirms_with_a_count_then_deletes_in_one_statement(self):
+        """Test the delete action deletes the selection with one DELETE"""
+        selected = [todo.pk for todo in self.todos[:2]]
+        response = self.post_action('delete_selected', selected)
+        self.assertContains(response, 'delete 2 todos?')
+        self.assertEqual(Todo.objects.count(), 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post_action('delete_selected', selected, post='yes')
+        self.assertEqual(response.status_code, 302)
+        deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('DELETE FROM "todos_todo"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(set(Todo.objects.values_list('pk', flat=True)), {todo.pk for todo in self.todos[2:]})
+
+    def test_delete_action_across_filtered_selection(self):
+        """Test "select all" deletes every todo matching the filters"""
+        Todo.objects.filter(pk=self.todos[0].pk).set_resolved(True)
+        response = self.client.post(f'{self.url}?resolved__exact=0', {
+            'action': 'delete_selected', '_selected_action': [str(self.todos[1].pk)],
+            'select_across': '1', 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(Todo.objects.values_list('pk', flat=True)), [self.todos[0].pk])
+
+
+    def test_bulk_actions_write_one_log_entry_each(self):
+        """Test each bulk action records one admin log entry with its row count"""
+        selected = [todo.pk for todo in self.todos[:3]]
+        self.post_action('resolve_selected', selected)
+        self.post_action('unresolve_selected', selected[:1])
+        self.post_action('delete_selected', selected[:2], post='yes')
+        entries = LogEntry.objects.order_by('pk')
+        self.assertEqual(
+            [(entry.action_flag, entry.object_repr, entry.get_change_message()) for entry in entries],
+            [
+                (CHANGE, '3 todos', 'Marked 3 todos as resolved.'),
+                (CHANGE, '1 todos', 'Marked 1 todos as unresolved.'),
+                (DELETION, '2 todos', 'Deleted 2 todos.'),
+            ],
+        )
+        self.assertEqual({entry.user.username for entry in entries}, {'admin'})
+
+
 class TodoListViewTests(TestCase):
     """Test cases for the todo_list view"""
 
@@ -176,6 +500,1061 @@ class TodoListViewTests(TestCase):
         self.assertContains(response, "Resolved")
 
 
+@override_settings(TODOS_PAGE_SIZE=3)
+class TodoListPaginationTests(TestCase):
+    """Test cases for keyset pagination of the todo_list view"""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('todo_list')
+        self.todos = [Todo.objects.create(title=f"Todo {i}") for i in range(8)]
+
+    def walk_forward(self):
+        """Follow next cursors from the first page and collect each page"""
+        pages = []
+        response = self.client.get(self.url)
+        while True:
+            page = response.context['page']
+            pages.append([todo.pk for todo in page])
+            if not page.has_next:
+                return pages
+            response = self.client.get(self.url, {'cursor': page.next_cursor})
+
+    def test_first_page_is_limited_to_page_size(self):
+        """Test the first page holds at most TODOS_PAGE_SIZE todos"""
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['todos']), 3)
+        self.assertTrue(response.context['page'].has_next)
+        self.assertFalse(response.context['page'].has_previous)
+
+    def test_pages_cover_every_todo_once_in_order(self):
+        """Test walking next cursors visits all todos newest first"""
+        pages = self.walk_forward()
+        self.assertEqual([len(p) for p in pages], [3, 3, 2])
+        visited = [pk for p in pages for pk in p]
+        self.assertEqual(visited, [todo.pk for todo in reversed(self.todos)])
+
+    def test_identical_created_at_is_broken_by_id(self):
+        """Test todos sharing created_at are neither skipped nor repeated"""
+        Todo.objects.update(created_at=timezone.now())
+        visited = [pk for p in self.walk_forward() for pk in p]
+        self.assertEqual(sorted(visited), sorted(todo.pk for todo in self.todos))
+        self.assertEqual(len(visited), len(set(visited)))
+
+    def test_prev_cursor_returns_to_previous_page(self):
+        """Test the prev cursor of page 2 yields page 1"""
+        first = self.client.get(self.url).context['page']
+        second = self.client.get(self.url, {'cursor': first.next_cursor}).context['page']
+        back = self.client.get(self.url, {'cursor': second.prev_cursor}).context['page']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        """Test a tampered cursor is ignored"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['todos'][0], self.todos[-1])
+
+    def test_deep_pages_do_not_use_offset(self):
+        """Test page queries seek by key instead of OFFSET"""
+        first = self.client.get(self.url).context['page']
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'cursor': first.next_cursor})
+        selects = [q['sql'] for q in ctx.captured_queries if 'todos_todo' in q['sql']]
+        self.assertTrue(selects)
+        for sql in selects:
+            self.assertNotIn('OFFSET', sql.upper())
+
+    def test_pagination_links_rendered(self):
+        """Test next link is rendered with an opaque cursor"""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Older')
+        self.assertContains(response, '?cursor=')
+        self.assertNotContains(response, 'Newer')
+
+
+class TodoListFilterTests(TestCase):
+    """Test cases for status, due-date and sort parameters of todo_list"""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('todo_list')
+        now = timezone.now()
+        self.open = Todo.objects.create(title="Open", due_date=now + timedelta(days=3))
+        self.done = Todo.objects.create(title="Done", resolved=True, due_date=now - timedelta(days=2))
+        self.late = Todo.objects.create(title="Late", due_date=now - timedelta(days=1))
+        self.undated = Todo.objects.create(title="Undated")
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        return [todo.title for todo in response.context['todos']]
+
+    def test_status_open(self):
+        """Test status=open lists unresolved todos only"""
+        self.assertEqual(self.titles(status='open'), ["Undated", "Late", "Open"])
+
+    def test_status_resolved(self):
+        """Test status=resolved lists resolved todos only"""
+        self.assertEqual(self.titles(status='resolved'), ["Done"])
+
+    def test_status_overdue(self):
+        """Test status=overdue lists unresolved todos past their due date"""
+        self.assertEqual(self.titles(status='overdue'), ["Late"])
+
+    def test_unknown_status_lists_everything(self):
+        """Test an unknown status falls back to all todos"""
+        self.assertEqual(len(self.titles(status='bogus')), 4)
+
+    def test_due_date_range(self):
+        """Test due_after/due_before select todos due within the range"""
+        today = timezone.localdate()
+        titles = self.titles(
+            due_after=(today - timedelta(days=2)).isoformat(),
+            due_before=(today - timedelta(days=1)).isoformat(),
+        )
+        self.assertEqual(titles, ["Late", "Done"])
+
+    def test_sort_by_due_date(self):
+        """Test sort=due orders by due date, undated todos first"""
+        self.assertEqual(self.titles(sort='due'), ["Undated", "Done", "Late", "Open"])
+
+    def test_sort_by_updated_at(self):
+        """Test sort=updated shows the most recently updated first"""
+        self.open.title = "Open (edited)"
+        self.open.save()
+        self.assertEqual(self.titles(sort='updated')[0], "Open (edited)")
+
+    @override_settings(TODOS_PAGE_SIZE=1)
+    def test_pagination_keeps_filters(self):
+        """Test next links carry the filter and sort parameters"""
+        response = self.client.get(self.url, {'status': 'open', 'sort': 'due'})
+        self.assertContains(response, 'status=open')
+        self.assertContains(response, 'sort=due')
+        visited = []
+        while True:
+            page = response.context['page']
+            visited.extend(todo.title for todo in page)
+            if not page.has_next:
+                break
+            response = self.client.get(self.url, {'status': 'open', 'sort': 'due', 'cursor': page.next_cursor})
+        self.assertEqual(visited, ["Undated", "Late", "Open"])
+
+    def test_cursor_from_another_sort_is_ignored(self):
+        """Test a cursor issued for one sort restarts another sort"""
+        Todo.objects.bulk_create(Todo(title=f"Extra {i}") for i in range(60))
+        cursor = self.client.get(self.url).context['page'].next_cursor
+        response = self.client.get(self.url, {'sort': 'due', 'cursor': cursor})
+        self.assertFalse(response.context['page'].has_previous)
+
+    def test_filtered_empty_state(self):
+        """Test a filter with no matches shows its own empty state"""
+        Todo.objects.all().delete()
+        response = self.client.get(self.url, {'status': 'resolved'})
+        self.assertContains(response, "No todos match these filters")
+
+
+class TodoListQueryPlanTests(TestCase):
+    """Test every list filter/sort combination is answered from an index"""
+
+    RANGES = [
+        {},
+        {'due_after': '2025-01-01'},
+        {'due_before': '2025-02-01'},
+        {'due_after': '2025-01-01', 'due_before': '2025-02-01'},
+    ]
+
+    def query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_no_full_scan_or_temp_sort(self):
+        """Test EXPLAIN QUERY PLAN for each combination, with and without a cursor"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN QUERY PLAN is SQLite specific')
+        now = timezone.now()
+        for status, sort, due_range, with_cursor in product(STATUS_CHOICES, SORT_ORDERINGS, self.RANGES, (False, True)):
+            params = TodoListParams({'status': status, 'sort': sort, **due_range})
+            queryset = params.apply(Todo.objects.all(), now)
+            if with_cursor:
+                queryset = queryset.filter(seek(Todo, params.ordering, [now, 1]))
+            plan = self.query_plan(queryset.order_by(*params.ordering)[:51])
+            with self.subTest(status=status, sort=sort, due_range=due_range, cursor=with_cursor, plan=plan):
+                for step in plan:
+                    self.assertNotEqual(step.strip(), 'SCAN todos_todo')
+                    self.assertNotIn('TEMP B-TREE', step)
+
+
+class TodoStatsTests(TestCase):
+    """Test cases for the incrementally maintained todo counters"""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('The counters are maintained by SQLite triggers')
+        stats.reconcile()
+        self.now = timezone.now()
+
+    def counters(self):
+        return TodoStats.objects.values('total', 'resolved').get(pk=stats.STATS_ID)
+
+    def assertCountersExact(self):
+        self.assertEqual(self.counters(), stats.counted())
+
+    def test_counters_follow_every_write_path(self):
+        """Test create, save, toggle, bulk operations and delete keep the counters exact"""
+        todo = Todo.objects.create(title="One")
+        Todo.objects.bulk_create([Todo(title="Two", resolved=True), Todo(title="Three")])
+        self.assertEqual(self.counters(), {'total': 3, 'resolved': 1})
+
+        todo.resolved = True
+        todo.save()
+        Todo.objects.filter(pk=todo.pk).toggle_resolved()
+        Todo.objects.all().set_resolved(True)
+        self.assertEqual(self.counters(), {'total': 3, 'resolved': 3})
+
+        Todo.objects.filter(title="Two").bulk_delete()
+        todo.delete()
+        self.assertEqual(self.counters(), {'total': 1, 'resolved': 1})
+        self.assertCountersExact()
+
+    def test_stats_read_counters_and_count_overdue(self):
+        """Test todo_stats reports open, resolved and overdue todos"""
+        Todo.objects.create(title="Late", due_date=self.now - timedelta(days=1))
+        Todo.objects.create(title="Late but done", due_date=self.now - timedelta(days=1), resolved=True)
+        Todo.objects.create(title="Upcoming", due_date=self.now + timedelta(days=1))
+        with self.assertNumQueries(2):
+            result = stats.todo_stats(self.now)
+        self.assertEqual(result, {'total': 3, 'open': 2, 'resolved': 1, 'overdue': 1})
+
+    def test_stats_fall_back_to_counting_without_counters(self):
+        """Test a missing counters row is replaced by an exact count"""
+        Todo.objects.create(title="Done", resolved=True)
+        TodoStats.objects.all().delete()
+        self.assertEqual(stats.todo_stats(self.now), {'total': 1, 'open': 0, 'resolved': 1, 'overdue': 0})
+
+    def test_overdue_count_uses_index(self):
+        """Test the overdue count is a search of the (resolved, due_date) index"""
+        sql, params = Todo.objects.overdue(self.now).values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('todo_resolved_due_idx', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_reconcile_command_corrects_drift(self):
+        """Test reconcile_stats resets drifted counters and reports the change"""
+        Todo.objects.create(title="One", resolved=True)
+        TodoStats.objects.filter(pk=stats.STATS_ID).update(total=10, resolved=0)
+        out = StringIO()
+        call_command('reconcile_stats', stdout=out)
+        self.assertIn('total 10 -> 1, resolved 0 -> 1', out.getvalue())
+        self.assertCountersExact()
+
+        out = StringIO()
+        call_command('reconcile_stats', stdout=out)
+        self.assertIn('Counters match', out.getvalue())
+
+    def test_list_header_and_api_show_stats(self):
+        """Test the list header and the stats endpoint report the counts"""
+        Todo.objects.create(title="Late", due_date=self.now - timedelta(days=1))
+        Todo.objects.create(title="Done", resolved=True)
+        response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, '1 open &middot; 1 resolved &middot; 1 overdue')
+
+        response = self.client.get(reverse('api_todo_stats'))
+        self.assertEqual(response.json(), {'total': 2, 'open': 1, 'resolved': 1, 'overdue': 1})
+        self.assertEqual(self.client.post(reverse('api_todo_stats')).status_code, 405)
+
+
+class ChangeFeedTests(TestCase):
+    """Test cases for the delta sync change feed"""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Change numbers are assigned by SQLite triggers')
+        self.url = reverse('api_todo_changes')
+
+    def sync(self, since, limit=2):
+        """Follow the feed from ``since`` until ``more`` is false"""
+        todos, deleted = {}, []
+        while True:
+            data = self.client.get(self.url, {'since': since, 'limit': limit}).json()
+            todos.update((todo['id'], todo) for todo in data['results'])
+            deleted += data['deleted']
+            since = data['cursor']
+            if not data['more']:
+                return todos, deleted, since
+
+    def test_every_write_takes_a_new_number(self):
+        """Test inserts, updates and deletes are numbered in order"""
+        todo = Todo.objects.create(title="One")
+        other, = Todo.objects.bulk_create([Todo(title="Two")])
+        seqs = dict(Todo.objects.values_list('pk', 'change_seq'))
+        self.assertLess(seqs[todo.pk], seqs[other.pk])
+
+        todo.refresh_from_db()
+        todo.title = "One, edited"
+        todo.save()
+        Todo.objects.filter(pk=other.pk).toggle_resolved()
+        self.assertGreater(Todo.objects.get(pk=todo.pk).change_seq, seqs[other.pk])
+        self.assertGreater(Todo.objects.get(pk=other.pk).change_seq, Todo.objects.get(pk=todo.pk).change_seq)
+
+        self.client.post(reverse('todo_delete', args=[todo.pk]))
+        tombstone = TodoTombstone.objects.get(todo_id=todo.pk)
+        self.assertGreater(tombstone.change_seq, Todo.objects.get(pk=other.pk).change_seq)
+        self.assertEqual(tombstone.change_seq, ChangeSequence.objects.get().value)
+
+    def test_sync_transfers_only_the_delta(self):
+        """Test a full sync in batches, then an incremental one"""
+        todos = Todo.objects.bulk_create([Todo(title=f"Todo {i}") for i in range(5)])
+        synced, deleted, cursor = self.sync(0)
+        self.assertEqual(set(synced), {todo.pk for todo in todos})
+        self.assertEqual(deleted, [])
+
+        Todo.objects.filter(pk=todos[1].pk).set_resolved(True)
+        Todo.objects.filter(pk=todos[3].pk).bulk_delete()
+        synced, deleted, cursor = self.sync(cursor)
+        self.assertEqual(list(synced), [todos[1].pk])
+        self.assertTrue(synced[todos[1].pk]['resolved'])
+        self.assertEqual(deleted, [todos[3].pk])
+
+        self.assertEqual(self.sync(cursor), ({}, [], cursor))
+
+    def test_batch_is_bounded(self):
+        """Test one request reads the sequence plus one bounded page of each source"""
+        Todo.objects.bulk_create([Todo(title=f"Todo {i}") for i in range(10)])
+        Todo.objects.filter(title="Todo 0").delete()
+        with self.assertNumQueries(3):
+            data = self.client.get(self.url, {'limit': 4}).json()
+        self.assertEqual(len(data['results']), 4)
+        self.assertTrue(data['more'])
+
+    def test_invalid_requests(self):
+        """Test malformed and future cursors and bad limits are rejected"""
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 100000}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 10 ** 9}).status_code, 410)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+        for value in ('\u00b2', '-1', str(2 ** 63)):
+            self.assertEqual(self.client.get(self.url, {'since': value}).status_code, 400, value)
+            self.assertEqual(self.client.get(self.url, {'limit': value}).status_code, 400, value)
+
+
+@override_settings(TODOS_EVENTS_POLL_SECONDS=0.05)
+class LiveEventsTests(TestCase):
+    """Test cases for the Server-Sent Events stream of todo changes"""
+
+    def setUp(self):
+        self.streams = []
+
+    async def open_stream(self, **headers):
+        response = await self.async_client.get(reverse('todo_events'), headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry: '))
+        self.streams.append(stream)
+        return stream
+
+    async def close_streams(self):
+        for stream in self.streams:
+            await stream.aclose()
+
+    async def next_event(self, stream):
+        return await asyncio.wait_for(anext(stream), timeout=5)
+
+    async def test_stream_pushes_create_update_and_delete(self):
+        """Test each kind of write reaches a connected client"""
+        try:
+            stream = await self.open_stream()
+            todo = await Todo.objects.acreate(title="Live")
+            message = (await self.next_event(stream)).decode()
+            self.assertIn('event: create', message)
+            self.assertIn(f'id="todo-{todo.pk}"', json.loads(message.split('data: ', 1)[1])['html'])
+
+            await Todo.objects.filter(pk=todo.pk).atoggle_resolved()
+            message = await self.next_event(stream)
+            self.assertIn(b'event: update', message)
+            self.assertIn(b'Mark Unresolved', message)
+
+            pk = todo.pk
+            await todo.adelete()
+            message = await self.next_event(stream)
+            self.assertIn(b'event: delete', message)
+            self.assertIn(f'{{"id": {pk}}}'.encode(), message)
+        finally:
+            await self.close_streams()
+
+    async def test_each_event_is_published_once(self):
+        """Test all subscribers receive the same encoded message"""
+        try:
+            first, second = await self.open_stream(), await self.open_stream()
+            await Todo.objects.acreate(title="Shared")
+            self.assertIs(await self.next_event(first), await self.next_event(second))
+        finally:
+            await self.close_streams()
+
+    async def test_reconnect_resumes_or_reloads(self):
+        """Test Last-Event-ID replays missed events, or asks for a reload when too old"""
+        try:
+            stream = await self.open_stream()
+            await Todo.objects.acreate(title="Before")
+            seen = await self.next_event(stream)
+            last_id = re.search(rb'id: (\d+)', seen).group(1).decode()
+            await Todo.objects.acreate(title="Missed")
+            await self.next_event(stream)
+
+            resumed = await self.open_stream(last_event_id=last_id)
+            self.assertIn(b'Missed', await self.next_event(resumed))
+            ahead = await self.open_stream(last_event_id='999999')
+            self.assertIn(b'event: reload', await self.next_event(ahead))
+        finally:
+            await self.close_streams()
+
+    async def test_malformed_last_event_id_starts_from_the_end(self):
+        """Test a Last-Event-ID that is not a number is ignored instead of failing"""
+        try:
+            stream = await self.open_stream(last_event_id='\u00b2')
+            await Todo.objects.acreate(title="After")
+            message = await self.next_event(stream)
+            self.assertIn(b'event: create', message)
+        finally:
+            await self.close_streams()
+
+    @override_settings(TODOS_EVENTS_BACKLOG=2)
+    async def test_subscriber_left_behind_is_told_to_reload(self):
+        """Test a connected client is told to reload once the log overflows past it"""
+        try:
+            stream = await self.open_stream()
+            await Todo.objects.acreate(title="Seen")
+            self.assertIn(b'Seen', await self.next_event(stream))
+            # One poll each, so the log overflows one change at a time.
+            for i in range(3):
+                await Todo.objects.acreate(title=f"Overflow {i}")
+                await asyncio.sleep(0.25)
+            self.assertIn(b'event: reload', await self.next_event(stream))
+        finally:
+            await self.close_streams()
+
+    @override_settings(TODOS_EVENTS_BACKLOG=2)
+    async def test_more_changes_than_the_backlog_send_one_reload(self):
+        """Test a burst larger than the log is not rendered but answered with a reload"""
+        try:
+            stream = await self.open_stream()
+            with mock.patch('todos.events.render_to_string') as render:
+                await Todo.objects.abulk_create([Todo(title=f"Imported {i}") for i in range(5)])
+                message = await self.next_event(stream)
+            self.assertIn(b'event: reload', message)
+            render.assert_not_called()
+        finally:
+            await self.close_streams()
+
+    def test_wsgi_request_is_told_not_to_reconnect(self):
+        """Test the stream is refused outside ASGI"""
+        self.assertEqual(self.client.get(reverse('todo_events')).status_code, 204)
+
+
+class ArchiveTests(TestCase):
+    """Test cases for archiving resolved todos and purging the archive"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.old = Todo.objects.bulk_create([Todo(title=f"Old {i}", resolved=True) for i in range(5)])
+        self.recent = Todo.objects.create(title="Recently resolved", resolved=True)
+        self.open = Todo.objects.create(title="Old but open")
+        Todo.objects.exclude(pk=self.recent.pk).update(updated_at=self.now - timedelta(days=40))
+        Todo.objects.resolved().exclude(pk=self.recent.pk).update(resolved_at=self.now - timedelta(days=40))
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_todos', *args, stdout=out)
+        return out.getvalue()
+
+    def test_moves_only_old_resolved_todos_in_batches(self):
+        """Test resolved todos past the age move to the archive, batch by batch"""
+        with mock.patch('todos.archive.archive_batch', wraps=archive.archive_batch) as batch:
+            output = self.archive('--batch-size', '2', '--no-purge')
+        self.assertIn('Archived 5 todos', output)
+        self.assertEqual(batch.call_count, 3)
+        self.assertEqual(set(ArchivedTodo.objects.values_list('pk', flat=True)), {todo.pk for todo in self.old})
+        self.assertEqual(set(Todo.objects.values_list('pk', flat=True)), {self.recent.pk, self.open.pk})
+        archived = ArchivedTodo.objects.get(pk=self.old[0].pk)
+        self.assertEqual(archived.title, "Old 0")
+        self.assertEqual(archived.resolved_at, self.now - timedelta(days=40))
+
+    def test_edits_after_resolving_do_not_delay_archival(self):
+        """Test archival goes by when a todo was resolved, not by its last edit"""
+        edited = self.old[0]
+        edited.refresh_from_db()
+        edited.title = "Old, edited today"
+        edited.save()
+        self.archive('--no-purge')
+        archived = ArchivedTodo.objects.get(pk=edited.pk)
+        self.assertEqual(archived.title, "Old, edited today")
+        self.assertEqual(archived.resolved_at, self.now - timedelta(days=40))
+
+    def test_resolved_at_follows_every_resolve_path(self):
+        """Test resolving sets resolved_at once, and reopening clears it"""
+        todo = Todo.objects.create(title="Path")
+        self.assertIsNone(todo.resolved_at)
+        todos = Todo.objects.filter(pk=todo.pk)
+        todos.set_resolved(True, now=self.now - timedelta(days=3))
+        todos.set_resolved(True, now=self.now)
+        self.assertEqual(todos.get().resolved_at, self.now - timedelta(days=3))
+        todos.toggle_resolved(now=self.now)
+        self.assertIsNone(todos.get().resolved_at)
+        todos.toggle_resolved(now=self.now)
+        self.assertEqual(todos.get().resolved_at, self.now)
+        todos.set_resolved(False)
+        self.assertIsNone(todos.get().resolved_at)
+        self.assertIsNotNone(Todo.objects.bulk_create([Todo(title="Imported", resolved=True)])[0].resolved_at)
+
+    def test_archived_todos_leave_counters_and_feed(self):
+        """Test archiving updates the counters and leaves tombstones"""
+        self.archive('--no-purge')
+        if connection.vendor == 'sqlite':
+            self.assertEqual(stats.todo_stats(self.now)['total'], 2)
+            self.assertEqual(TodoTombstone.objects.count(), 5)
+
+    def test_purges_after_retention(self):
+        """Test archived todos older than the retention period are deleted"""
+        self.archive('--no-purge')
+        ArchivedTodo.objects.filter(pk=self.old[0].pk).update(archived_at=self.now - timedelta(days=400))
+        output = self.archive('--purge-after', '365')
+        self.assertIn('Purged 1 todos', output)
+        self.assertEqual(ArchivedTodo.objects.count(), 4)
+
+    def test_list_reads_the_archive_only_when_asked(self):
+        """Test the list never queries the archive table and the archive page does"""
+        self.archive('--no-purge')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('todo_list'))
+        self.assertNotContains(response, "Old 0")
+        self.assertFalse(any('todos_archivedtodo' in query['sql'] for query in queries.captured_queries))
+
+        response = self.client.get(reverse('todo_archive'))
+        self.assertContains(response, "Old 0")
+        self.assertNotContains(response, "Recently resolved")
+
+
+class StaticAssetTests(TestCase):
+    """Test cases for the hashed, precompressed static asset pipeline"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.static_root.cleanup)
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.static_root.name))
+        fake_brotli = mock.Mock(compress=lambda data, quality: zlib.compress(data, 9))
+        with mock.patch.object(assets, 'brotli', fake_brotli):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_pages_link_hashed_assets_instead_of_inline_code(self):
+        """Test pages reference hashed static files and embed no CSS or JS"""
+        response = self.client.get(reverse('todo_list'))
+        self.assertNotContains(response, '<style')
+        self.assertNotRegex(response.content.decode(), r'<script>')
+        self.assertRegex(response.content.decode(), r'href="/static/todos/css/todos\.[0-9a-f]{12}\.css"')
+        self.assertRegex(response.content.decode(), r'src="/static/todos/js/todo-list\.[0-9a-f]{12}\.js"')
+
+    def test_serves_best_accepted_encoding_with_far_future_caching(self):
+        """Test hashed files are served brotli, gzip or plain, cached for a year"""
+        url = staticfiles_storage.url('todos/css/todos.css')
+        plain = b''.join(self.client.get(url).streaming_content)
+
+        response = self.client.get(url, headers={'accept-encoding': 'gzip, deflate, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(zlib.decompress(b''.join(response.streaming_content)), plain)
+
+        response = self.client.get(url, headers={'accept-encoding': 'gzip, br;q=0'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_wildcard_accept_encoding(self):
+        """Test '*' accepts the precompressed codings the header does not refuse"""
+        url = staticfiles_storage.url('todos/css/todos.css')
+        self.assertEqual(self.client.get(url, headers={'accept-encoding': '*'})['Content-Encoding'], 'br')
+        response = self.client.get(url, headers={'accept-encoding': '*;q=0.5, br;q=0'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get(url, headers={'accept-encoding': 'identity, *;q=0'})
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compressed_siblings_are_not_served_directly(self):
+        """Test a request for a .gz or .br file is a 404, not mislabelled CSS"""
+        url = staticfiles_storage.url('todos/css/todos.css')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        for suffix in ('.gz', '.br'):
+            self.assertEqual(self.client.get(url + suffix).status_code, 404)
+
+    def test_unhashed_names_are_revalidated(self):
+        """Test plain names are served with no-cache and traversal is refused"""
+        response = self.client.get('/static/todos/css/todos.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+
+
+class TodoListCacheTests(TestCase):
+    """Test cases for the versioned fragment cache of the todo list"""
+
+    def setUp(self):
+        self.client = Client()
+        Todo.objects.create(title="Cached Todo")
+        todo_cache.reset_cache_stats()
+
+    def test_second_request_is_a_hit(self):
+        """Test an unchanged list is served from cache without list queries"""
+        self.client.get(reverse('todo_list'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, "Cached Todo")
+        self.assertEqual(todo_cache.cache_stats(), {'hits': 1, 'misses': 1})
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('SELECT "todos_todo"."id"')])
+        self.assertEqual(len(response.context['todos']), 1)
+
+    def test_query_string_is_part_of_the_key(self):
+        """Test different filters are cached separately"""
+        self.client.get(reverse('todo_list'))
+        response = self.client.get(reverse('todo_list'), {'status': 'resolved'})
+        self.assertNotContains(response, "Cached Todo")
+        self.assertEqual(todo_cache.cache_stats(), {'hits': 0, 'misses': 2})
+
+    def test_save_and_delete_invalidate(self):
+        """Test post_save and post_delete bump the version"""
+        self.client.get(reverse('todo_list'))
+        todo = Todo.objects.create(title="Fresh Todo")
+        self.assertContains(self.client.get(reverse('todo_list')), "Fresh Todo")
+        todo.delete()
+        self.assertNotContains(self.client.get(reverse('todo_list')), "Fresh Todo")
+        self.assertEqual(todo_cache.cache_stats()['hits'], 0)
+
+    def test_bulk_operations_invalidate(self):
+        """Test bulk_create, update and bulk_delete bump the version"""
+        versions = [todo_cache.current_version()]
+        Todo.objects.bulk_create([Todo(title="Bulk")])
+        versions.append(todo_cache.current_version())
+        Todo.objects.filter(title="Bulk").set_resolved(True)
+        versions.append(todo_cache.current_version())
+        Todo.objects.filter(title="Bulk").bulk_delete()
+        versions.append(todo_cache.current_version())
+        self.assertEqual(len(set(versions)), 4)
+
+    def test_csrf_token_is_not_shared(self):
+        """Test cached fragments get the requesting client's CSRF token"""
+        first = Client(enforce_csrf_checks=True).get(reverse('todo_list'))
+        second = Client(enforce_csrf_checks=True).get(reverse('todo_list'))
+        self.assertEqual(todo_cache.cache_stats()['hits'], 1)
+        self.assertNotContains(second, '<!--todos:csrf-->')
+        for response in (first, second):
+            token = re.search(rb'name="csrfmiddlewaretoken" value="(\w+)"', response.content).group(1)
+            self.assertEqual(_unmask_cipher_token(token.decode()), response.cookies['csrftoken'].value)
+        self.assertNotEqual(first.cookies['csrftoken'].value, second.cookies['csrftoken'].value)
+
+    def test_cache_backend_is_bounded(self):
+        """Test the configured fragment cache evicts old entries"""
+        backend = todo_cache.get_cache()
+        self.assertGreater(backend._max_entries, 0)
+        self.assertEqual(backend, todo_cache.get_cache())
+
+
+class ConditionalGetTests(TestCase):
+    """Test cases for ETag/Last-Modified handling of the HTML pages"""
+
+    def setUp(self):
+        self.client = Client()
+        self.todo = Todo.objects.create(title="Polled Todo")
+
+    def revalidate(self, url, response, data=None):
+        return self.client.get(url, data, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_list_not_modified(self):
+        """Test an unchanged list answers 304 without rendering"""
+        url = reverse('todo_list')
+        response = self.client.get(url)
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        with self.assertTemplateNotUsed('todos/todo_list.html'):
+            again = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 304)
+
+    def test_list_changes_invalidate_etag(self):
+        """Test edits, deletions and filters change the list ETag"""
+        url = reverse('todo_list')
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response, {'status': 'open'}).status_code, 200)
+
+        Todo.objects.create(title="Another")
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+        response = self.client.get(url)
+        Todo.objects.filter(title="Another").bulk_delete()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_list_etag_changes_when_todo_becomes_overdue(self):
+        """Test the overdue badge is not hidden by a stale 304"""
+        due = timezone.now() + timedelta(hours=1)
+        Todo.objects.filter(pk=self.todo.pk).update(due_date=due)
+        url = reverse('todo_list')
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+        with mock.patch('django.utils.timezone.now', return_value=due + timedelta(minutes=1)):
+            again = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 200)
+
+    def test_pending_messages_are_rendered(self):
+        """Test a 304 never swallows a flash message"""
+        url = reverse('todo_list')
+        response = self.client.get(url)
+        self.client.post(reverse('todo_toggle_resolved', args=[self.todo.pk]))
+        self.client.post(reverse('todo_toggle_resolved', args=[self.todo.pk]))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_and_delete_pages(self):
+        """Test single-todo pages validate against the row's updated_at"""
+        for name in ('todo_edit', 'todo_delete'):
+            url = reverse(name, args=[self.todo.pk])
+            response = self.client.get(url)
+            self.assertEqual(self.revalidate(url, response).status_code, 304)
+            modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(modified.status_code, 304)
+
+        response = self.client.get(reverse('todo_edit', args=[self.todo.pk]))
+        self.todo.title = "Renamed"
+        self.todo.save()
+        again = self.revalidate(reverse('todo_edit', args=[self.todo.pk]), response)
+        self.assertContains(again, "Renamed")
+
+    def test_missing_todo_still_404(self):
+        """Test conditional handling does not mask missing todos"""
+        response = self.client.get(reverse('todo_edit', args=[9999]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+
+
+class InstrumentationTests(TestCase):
+    """Test cases for the instrumentation middleware and /metrics"""
+
+    def test_server_timing_header(self):
+        """Test responses report the queries they ran, template and total time"""
+        Todo.objects.create(title="Timed")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('todo_list'))
+        timing = dict(
+            (entry.split(';')[0], entry) for entry in response['Server-Timing'].split(', ')
+        )
+        self.assertEqual(set(timing), {'db', 'tpl', 'total'})
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+        self.assertGreater(float(timing['tpl'].split('dur=')[1]), 0)
+
+    def test_histograms_per_view(self):
+        """Test each request is observed under its view name"""
+        todo = Todo.objects.create(title="Measured")
+        before = metrics.REQUEST_DURATION.get(view='todo_edit')
+        responses = metrics.RESPONSES.get(view='todo_edit', status=200)
+        self.client.get(reverse('todo_edit', args=[todo.pk]))
+        self.client.get(reverse('todo_edit', args=[todo.pk]))
+        self.assertEqual(metrics.REQUEST_DURATION.get(view='todo_edit')[0], before[0] + 2)
+        self.assertEqual(metrics.RESPONSES.get(view='todo_edit', status=200), responses + 2)
+        self.assertGreater(metrics.DB_QUERIES.get(view='todo_edit')[1], 0)
+        self.assertGreater(metrics.RESPONSE_SIZE.get(view='todo_edit')[1], 0)
+
+    def test_metrics_endpoint(self):
+        """Test /metrics serves the histograms in the Prometheus text format"""
+        self.client.get(reverse('todo_list'))
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        body = response.content.decode()
+        self.assertIn('# TYPE todos_request_duration_seconds histogram', body)
+        self.assertIn('todos_request_duration_seconds_bucket{view="todo_list",le="+Inf"}', body)
+        self.assertRegex(body, r'todos_responses_total\{status="200",view="todo_list"\} \d+')
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts include every smaller bucket"""
+        histogram = metrics.Histogram('test_seconds', 'Test.', (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, view='a"b')
+        self.assertEqual(list(histogram.samples()), [
+            'test_seconds_bucket{view="a\\"b",le="0.1"} 2',
+            'test_seconds_bucket{view="a\\"b",le="1"} 3',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 4',
+            'test_seconds_sum{view="a\\"b"} 3.65',
+            'test_seconds_count{view="a\\"b"} 4',
+        ])
+
+    async def test_async_views_are_measured(self):
+        """Test queries made through the async ORM in worker threads are counted"""
+        await Todo.objects.acreate(title="Async timed")
+        with override_settings(ROOT_URLCONF='todos.async_urls'):
+            response = await self.async_client.get(reverse('todo_list'))
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    @override_settings(TODOS_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        """Test the header is left out when TODOS_SERVER_TIMING is off"""
+        response = self.client.get(reverse('todo_list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class SlowQueryLogTests(TestCase):
+    """Test cases for the slow query log and the slow_queries command"""
+
+    def test_logs_plan_view_and_stack(self):
+        """Test slow statements are logged with their query plan, view and caller"""
+        Todo.objects.create(title="Slow")
+        with override_settings(TODOS_SLOW_QUERY_MS=0), self.assertLogs('todos.slow_queries') as logs:
+            self.client.get(reverse('todo_list') + '?status=open')
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        listing = [entry for entry in entries if 'FROM "todos_todo"' in entry['sql'] and 'LIMIT' in entry['sql']]
+        self.assertTrue(listing)
+        entry = listing[0]
+        self.assertEqual((entry['view'], entry['method'], entry['path']), ('todo_list', 'GET', '/?status=open'))
+        self.assertTrue(any('todos_todo' in step for step in entry['plan']))
+        self.assertTrue(any(frame.startswith('todos/') for frame in entry['stack']))
+        self.assertNotIn('Slow', json.dumps(entries))
+
+    def test_fast_queries_are_not_logged(self):
+        """Test nothing is logged below the threshold or with the log off"""
+        for threshold in (60_000, None):
+            with override_settings(TODOS_SLOW_QUERY_MS=threshold), self.assertNoLogs('todos.slow_queries'):
+                self.client.get(reverse('todo_list'))
+
+    def test_statement_shape(self):
+        """Test literals and IN lists are collapsed"""
+        self.assertEqual(
+            slowlog.shape('SELECT "id" FROM "todos_todo" WHERE "id" IN (%s, %s,\n %s) AND x = \'a\' LIMIT 21'),
+            'SELECT "id" FROM "todos_todo" WHERE "id" IN (...) AND x = ? LIMIT ?',
+        )
+
+    def test_command_groups_by_shape(self):
+        """Test slow_queries merges rotated files and ranks statement shapes"""
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'slow.log')
+
+        def entry(sql, duration, view):
+            return json.dumps({'sql': sql, 'duration_ms': duration, 'view': view, 'plan': ['SCAN todos_todo'], 'stack': []})
+
+        with open(path + '.1', 'w') as file:
+            file.write(entry('DELETE FROM "todos_todo" WHERE "id" IN (%s, %s)', 300, 'api_todo_bulk_delete') + '\n')
+        with open(path, 'w') as file:
+            file.write(entry('DELETE FROM "todos_todo" WHERE "id" IN (%s)', 500, 'todo_delete') + '\n')
+            file.write('not json\n')
+            file.write(entry('SELECT COUNT(*) FROM "todos_todo"', 600, None) + '\n')
+
+        out = StringIO()
+        call_command('slow_queries', file=path, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], '3 slow queries, 2 statement shapes.')
+        self.assertIn('2 x, total 800.0 ms', lines[2])
+        self.assertEqual(lines[3], '  views: api_todo_bulk_delete, todo_delete')
+        self.assertEqual(lines[4], '  sql:   DELETE FROM "todos_todo" WHERE "id" IN (...)')
+        self.assertIn('(no request)', out.getvalue())
+
+        out = StringIO()
+        call_command('slow_queries', file=path, sort='max', limit=1, stdout=out)
+        self.assertIn('SELECT COUNT(*)', out.getvalue())
+        self.assertNotIn('DELETE', out.getvalue())
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    """Test cases for the SQLite pragmas applied on connect"""
+
+    def open(self, path, **pragmas):
+        handler = ConnectionHandler({'default': {}, 'profile': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'PRAGMAS': {'busy_timeout': 200, **pragmas},
+        }})
+        conn = handler['profile']
+        conn.ensure_connection()
+        self.addCleanup(conn.close)
+        return conn
+
+    def pragma(self, conn, name):
+        return conn.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_profile_applied_on_connect(self):
+        """Test every configured pragma is set on a new connection"""
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'db.sqlite3')
+        conn = self.open(path, **settings.TODOS_SQLITE_PRAGMAS)
+        self.assertEqual(self.pragma(conn, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(conn, 'synchronous'), 1)
+        self.assertEqual(self.pragma(conn, 'temp_store'), 2)
+        self.assertEqual(self.pragma(conn, 'cache_size'), settings.TODOS_SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma(conn, 'busy_timeout'), settings.TODOS_SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_invalid_pragma_rejected(self):
+        """Test pragma values are not interpolated blindly into SQL"""
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'db.sqlite3')
+        with self.assertRaises(ValueError):
+            self.open(path, synchronous='off; DROP TABLE x')
+
+    def reads_during_write(self, journal_mode):
+        """Count rows from a second connection while another holds the write lock."""
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'db.sqlite3')
+        writer = self.open(path, journal_mode=journal_mode)
+        writer.connection.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        writer.connection.execute('INSERT INTO item DEFAULT VALUES')
+        writer.connection.commit()
+        reader = self.open(path, journal_mode=journal_mode)
+
+        writer.connection.execute('BEGIN EXCLUSIVE')
+        writer.connection.execute('INSERT INTO item DEFAULT VALUES')
+        try:
+            began = time.monotonic()
+            count = reader.connection.execute('SELECT COUNT(*) FROM item').fetchone()[0]
+            return count, time.monotonic() - began
+        finally:
+            writer.connection.rollback()
+
+    def test_readers_do_not_wait_for_writers_in_wal(self):
+        """Test a reader sees the last commit at once while a write is in progress"""
+        count, elapsed = self.reads_during_write('wal')
+        self.assertEqual(count, 1)
+        self.assertLess(elapsed, 0.1)
+
+    def test_readers_stall_without_wal(self):
+        """Test the rollback journal blocks readers until busy_timeout expires"""
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            self.reads_during_write('delete')
+
+
+@override_settings(TODOS_READ_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """Test cases for the primary/replica router"""
+    databases = {'default', 'replica'}
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        """Test unpinned reads in a request use a replica alias"""
+        with routing():
+            self.assertEqual(Todo.objects.all().db, 'replica')
+            self.assertEqual(router.db_for_write(Todo), 'default')
+            self.assertEqual(ImportCheckpoint.objects.all().db, 'default')
+
+    @override_settings(TODOS_READ_REPLICAS=['replica', 'other'])
+    def test_one_replica_per_scope(self):
+        """Test every read in a scope uses the same replica, so feeds match their rows"""
+        models = (Todo, TodoStats, ChangeSequence, TodoTombstone)
+        with routing():
+            aliases = {model.objects.all().db for model in models for _ in range(20)}
+        self.assertEqual(len(aliases), 1)
+
+    def test_reads_stay_on_primary_when_pinned_or_after_a_write(self):
+        """Test pinned requests, writes and code outside requests read the primary"""
+        self.assertEqual(Todo.objects.all().db, 'default')
+        with routing(pinned=True):
+            self.assertEqual(Todo.objects.all().db, 'default')
+        with routing() as state:
+            Todo.objects.create(title="Written")
+            self.assertTrue(state.wrote)
+            self.assertEqual(Todo.objects.all().db, 'default')
+
+
+@override_settings(TODOS_READ_REPLICAS=['replica'])
+class ReplicaPinMiddlewareTests(TransactionTestCase):
+    """Test cases for the replica pin middleware (committed rows, so the mirror sees them)"""
+    databases = {'default', 'replica'}
+
+    def test_write_sets_pin_cookie(self):
+        """Test a client that wrote reads its own changes from the primary"""
+        response = self.client.post(reverse('todo_create'), {'title': 'Pinned'})
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.TODOS_REPLICA_PIN_SECONDS)
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, 'Pinned')
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_unpinned_page_reads_replica(self):
+        """Test unpinned page views read through the replica alias"""
+        Todo.objects.create(title="Mirrored")
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = self.client.get(reverse('todo_list'))
+        self.assertContains(response, 'Mirrored')
+        self.assertTrue(replica.captured_queries)
+
+    def test_reads_without_writes_set_no_cookie(self):
+        """Test plain page views are not pinned"""
+        response = self.client.get(reverse('todo_list'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(TODOS_READ_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        """Test everything reads the primary and no cookie is set"""
+        with routing():
+            self.assertEqual(Todo.objects.all().db, 'default')
+        response = self.client.post(reverse('todo_create'), {'title': 'Primary only'})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class SessionProfileTests(TestCase):
+    """Test cases for the query cost of mutating views under the 'cookie' session profile"""
+
+    def setUp(self):
+        self.todo = Todo.objects.create(title="Test Todo")
+
+    def assertMutation(self, queries, url, data):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(ctx.captured_queries), queries, [q['sql'] for q in ctx.captured_queries])
+        self.assertFalse(any('django_session' in q['sql'] for q in ctx.captured_queries))
+        return response
+
+    def test_profile_settings(self):
+        """Test the default profile keeps messages in a cookie and sessions in a shared cache"""
+        self.assertEqual(settings.TODOS_SESSION_PROFILE, 'cookie')
+        self.assertEqual(settings.MESSAGE_STORAGE, 'django.contrib.messages.storage.cookie.CookieStorage')
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.cached_db')
+        # A per-process cache would keep a session alive in other processes after logout.
+        sessions = settings.CACHES[settings.SESSION_CACHE_ALIAS]
+        self.assertNotIn('locmem', sessions['BACKEND'])
+        # The test runner keeps the suite's sessions out of the project directory.
+        self.assertTrue(os.path.realpath(sessions['LOCATION']).startswith(os.path.realpath(tempfile.gettempdir())))
+
+    def test_create_queries(self):
+        """Test creating a todo runs only its own writes"""
+        response = self.assertMutation(2, reverse('todo_create'), {'title': 'New'})
+        self.assertIn('messages', response.cookies)
+
+    def test_edit_queries(self):
+        """Test editing a todo runs only its own writes"""
+        self.assertMutation(2, reverse('todo_edit', args=[self.todo.pk]), {
+            'title': 'Edited', 'version': str(self.todo.version),
+        })
+
+    def test_toggle_queries(self):
+        """Test toggling a todo runs only its own writes"""
+        self.assertMutation(2, reverse('todo_toggle_resolved', args=[self.todo.pk]), {'resolved': '1'})
+
+    def test_delete_queries(self):
+        """Test deleting a todo runs only its own writes"""
+        self.assertMutation(3, reverse('todo_delete', args=[self.todo.pk]), {})
+
+    def test_signed_in_requests_read_session_from_cache(self):
+        """Test a signed-in user's session is loaded from the cache, not the session table"""
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('django_session' in q['sql'] for q in ctx.captured_queries))
+        self.assertMutation(2, reverse('todo_create'), {'title': 'New'})
+
+    def test_message_survives_the_redirect(self):
+        """Test the flash message is read back from the cookie"""
+        response = self.client.post(reverse('todo_create'), {'title': 'New'}, follow=True)
+        self.assertContains(response, 'Todo created successfully!')
+
+
 class TodoCreateViewTests(TestCase):
     """Test cases for the todo_create view"""
 
@@ -355,6 +1734,277 @@ class TodoEditViewTests(TestCase):
         self.assertEqual(self.todo.created_at, original_created)
 
 
+class TodoOptimisticConcurrencyTests(TestCase):
+    """Test cases for versioned edits"""
+
+    def setUp(self):
+        self.client = Client()
+        self.todo = Todo.objects.create(title="Original")
+        self.url = reverse('todo_edit', args=[self.todo.pk])
+
+    def test_form_carries_version(self):
+        """Test the edit form posts back the version it was rendered from"""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="version" value="1"')
+
+    def test_edit_with_current_version(self):
+        """Test an edit with the current version is one conditional UPDATE"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {'title': 'Edited', 'version': '1'})
+        todo_queries = [q['sql'] for q in ctx.captured_queries if '"todos_todo"' in q['sql']]
+        self.assertRedirects(response, reverse('todo_list'))
+        self.assertEqual(len(todo_queries), 1)
+        self.assertIn('"version" = 1', todo_queries[0])
+        self.todo.refresh_from_db()
+        self.assertEqual((self.todo.title, self.todo.version), ('Edited', 2))
+
+    def test_stale_edit_is_rejected(self):
+        """Test an edit with an outdated version fails without overwriting"""
+        self.client.post(self.url, {'title': 'First', 'version': '1'})
+        response = self.client.post(self.url, {'title': 'Second', 'version': '1'})
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'changed by someone else', status_code=409)
+        self.assertContains(response, 'name="version" value="2"', status_code=409)
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.title, 'First')
+
+    def test_malformed_version_is_a_bad_request(self):
+        """Test an unparsable or out-of-range version is a 400, not a conflict"""
+        for version in ('', 'abc', '\u00b2', '-1', '0', str(2 ** 63)):
+            response = self.client.post(self.url, {'title': 'Edited', 'version': version})
+            self.assertContains(response, 'not sent correctly', status_code=400, msg_prefix=version)
+        self.todo.refresh_from_db()
+        self.assertEqual((self.todo.title, self.todo.version), ('Original', 1))
+
+    def test_every_write_path_bumps_version(self):
+        """Test save, set_resolved, toggle and the bulk API increment the version"""
+        self.todo.save()
+        Todo.objects.filter(pk=self.todo.pk).set_resolved(True)
+        Todo.objects.filter(pk=self.todo.pk).toggle_resolved()
+        self.client.post(
+            reverse('api_todo_bulk_update'),
+            json.dumps([{'id': self.todo.pk, 'title': 'API'}]),
+            content_type='application/json',
+        )
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.version, 5)
+        self.assertFalse(self.todo.resolved)
+
+    def test_search_index_follows_versioned_update(self):
+        """Test the FTS triggers survived the migration that added version"""
+        self.client.post(self.url, {'title': 'Quarterly budget', 'version': '1'})
+        self.assertEqual(list(Todo.objects.search('budget')), [self.todo])
+
+
+@override_settings(ROOT_URLCONF='todos.async_urls')
+class AsyncViewTests(TestCase):
+    """Test cases for the async HTML views"""
+
+    async def test_views_are_async(self):
+        """Test the async URLconf routes the pages to coroutine views"""
+        for name in ('todo_list', 'todo_create'):
+            match = resolve(reverse(name))
+            self.assertTrue(iscoroutinefunction(match.func), name)
+
+    async def test_list_and_conditional_get(self):
+        """Test the async list renders and answers 304 when unchanged"""
+        await Todo.objects.acreate(title="Async Todo")
+        response = await self.async_client.get(reverse('todo_list'))
+        self.assertContains(response, "Async Todo")
+        again = await self.async_client.get(reverse('todo_list'), headers={'if-none-match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_create_edit_toggle_delete(self):
+        """Test every async write path with its flash message"""
+        response = await self.async_client.post(reverse('todo_create'), {'title': 'Made async'})
+        self.assertRedirects(response, reverse('todo_list'), fetch_redirect_response=False)
+        todo = await Todo.objects.aget(title='Made async')
+
+        url = reverse('todo_edit', args=[todo.pk])
+        await self.async_client.post(url, {'title': 'Edited async', 'version': '1'})
+        response = await self.async_client.post(url, {'title': 'Stale', 'version': '1'})
+        self.assertEqual(response.status_code, 409)
+        response = await self.async_client.post(url, {'title': 'Malformed', 'version': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+        await self.async_client.post(reverse('todo_toggle_resolved', args=[todo.pk]))
+        todo = await Todo.objects.aget(pk=todo.pk)
+        self.assertEqual((todo.title, todo.resolved, todo.version), ('Edited async', True, 3))
+
+        response = await self.async_client.post(reverse('todo_delete', args=[todo.pk]))
+        self.assertFalse(await Todo.objects.filter(pk=todo.pk).aexists())
+        response = await self.async_client.get(response['Location'])
+        self.assertContains(response, 'Todo deleted successfully!')
+
+    async def test_missing_todo_returns_404(self):
+        """Test async views raise 404 for unknown todos"""
+        for name in ('todo_edit', 'todo_delete', 'todo_toggle_resolved'):
+            response = await self.async_client.post(reverse(name, args=[9999]), {'title': 'x'})
+            self.assertEqual(response.status_code, 404, name)
+
+
+class BenchViewsCommandTests(TransactionTestCase):
+    """Test cases for the bench_views command"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 99)), (50, 99))
+        self.assertIsNone(percentile([], 99))
+
+    def test_compares_both_stacks(self):
+        """Test the command reports a row per stack without errors"""
+        Todo.objects.create(title="Benchmarked")
+        out, err = StringIO(), StringIO()
+        call_command('bench_views', requests=10, concurrency=3, warmup=0, host='testserver', stdout=out, stderr=err)
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:]}
+        self.assertEqual(set(rows), {'sync', 'async'})
+        self.assertEqual([rows[stack][1:3] for stack in ('sync', 'async')], [['10', '0'], ['10', '0']])
+        self.assertEqual(err.getvalue(), '')
+
+
+class BenchTodosCommandTests(TransactionTestCase):
+    """Test cases for the bench_todos command"""
+
+    def test_seeds_realistic_rows(self):
+        """Test seeding tops the table up with mostly resolved, partly overdue todos"""
+        Todo.objects.create(title="Existing")
+        call_command('bench_todos', rows=2000, resolved_ratio=0.5, seed_only=True, stdout=StringIO())
+        self.assertEqual(Todo.objects.count(), 2000)
+        self.assertAlmostEqual(Todo.objects.resolved().count() / 2000, 0.5, delta=0.05)
+        self.assertTrue(Todo.objects.overdue().exists())
+        self.assertTrue(Todo.objects.unresolved().filter(due_date__gt=timezone.now()).exists())
+        self.assertTrue(Todo.objects.filter(due_date=None).exists())
+
+    def test_reports_views_as_json(self):
+        """Test each selected view and method is measured, then scratch todos are removed"""
+        loadtest.seed(50)
+        path = os.path.join(self.enterContext(tempfile.TemporaryDirectory()), 'results.json')
+        out, err = StringIO(), StringIO()
+        # One request at a time: the in-memory test database locks whole
+        # tables between connections.
+        call_command(
+            'bench_todos', view=['todo_list', 'todo_delete', 'todo_events', 'api_todo_bulk_resolve'],
+            requests=6, concurrency=1, warmup=1, host='testserver', json=path, stdout=out, stderr=err,
+        )
+        with open(path) as file:
+            report = json.load(file)
+        results = {(entry['view'], entry['method']): entry for entry in report['results']}
+        self.assertEqual(set(results), {
+            ('todo_list', 'GET'), ('todo_delete', 'GET'), ('todo_delete', 'POST'),
+            ('todo_events', 'GET'), ('api_todo_bulk_resolve', 'POST'),
+        })
+        self.assertIn('skipped', results['todo_events', 'GET'])
+        for key, entry in results.items():
+            if key != ('todo_events', 'GET'):
+                self.assertEqual((entry['requests'], entry['errors']), (6, 0))
+                self.assertEqual(set(entry['latency_ms']), {'p50', 'p95', 'p99', 'mean', 'max'})
+                self.assertGreater(entry['queries'], 0)
+        self.assertEqual(report['todos']['total'], 50)
+        self.assertEqual(err.getvalue(), '')
+        self.assertEqual(Todo.objects.count(), 50)
+        self.assertFalse(Todo.objects.resolved().filter(title__startswith=loadtest.SCRATCH_TITLE).exists())
+
+        call_command('bench_todos', view=['todo_list'], requests=2, host='testserver', baseline=path, stdout=out)
+        self.assertIn('GET todo_list', out.getvalue().split('Compared with')[1])
+
+    def test_requires_todos(self):
+        """Test the command refuses to run against an empty table"""
+        with self.assertRaises(CommandError):
+            call_command('bench_todos', requests=1, stdout=StringIO())
+
+
+class WritePipelineTests(TransactionTestCase):
+    """Test cases for the single-writer pipeline"""
+
+    def setUp(self):
+        self.pipeline = writer.WritePipeline(batch_size=10)
+        self.addCleanup(self.pipeline.stop)
+
+    def test_batches_queued_writes_into_one_transaction(self):
+        """Test writes queued behind a commit share the next transaction, each failing alone"""
+        release = threading.Event()
+        first = self.pipeline.submit(release.wait)
+        # Queued while the writer is busy with the first batch.
+        created = [self.pipeline.submit(Todo.objects.create, title=f"Todo {i}") for i in range(3)]
+        failing = self.pipeline.submit(Todo.objects.create, title=None)
+        last = self.pipeline.submit(Todo.objects.create, title="Last")
+        release.set()
+        self.assertTrue(first.result(timeout=5))
+        self.assertEqual([future.result(timeout=5).title for future in created], ["Todo 0", "Todo 1", "Todo 2"])
+        with self.assertRaises(IntegrityError):
+            failing.result(timeout=5)
+        self.assertEqual(last.result(timeout=5).title, "Last")
+        self.assertEqual((self.pipeline.batches, self.pipeline.writes), (2, 6))
+        self.assertEqual(Todo.objects.count(), 4)
+
+    def test_runs_in_the_callers_context(self):
+        """Test queries in the writer thread are attributed to the caller's request timings"""
+        with instrumentation.timing() as timings:
+            self.pipeline.submit(Todo.objects.create, title="Timed").result(timeout=5)
+        self.assertGreaterEqual(timings.queries, 1)
+
+    def test_failure_outside_the_commit_fails_the_batch_not_the_writer(self):
+        """Test an error before the transaction resolves the batch's futures and the writer goes on"""
+        # Patched on the class: the writer thread has its own connection object.
+        wrapper = type(connections['default'])
+        with mock.patch.object(wrapper, 'close_if_unusable_or_obsolete', side_effect=[RuntimeError('boom'), None]):
+            failed = self.pipeline.submit(Todo.objects.create, title="Lost")
+            with self.assertRaisesMessage(RuntimeError, 'boom'):
+                failed.result(timeout=5)
+            self.assertEqual(self.pipeline.submit(Todo.objects.create, title="Next").result(timeout=5).title, "Next")
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ["Next"])
+
+    @override_settings(TODOS_WRITE_PIPELINE=True, TODOS_WRITE_TIMEOUT_SECONDS=0.1)
+    def test_write_gives_up_after_the_timeout(self):
+        """Test a caller stops waiting on a stuck writer and its queued write is dropped"""
+        self.addCleanup(writer.pipeline().stop)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        writer.pipeline().submit(release.wait)
+        with self.assertRaises(TimeoutError):
+            writer.write(Todo.objects.create, title="Timed out")
+        release.set()
+        writer.pipeline().submit(lambda: None).result(timeout=5)
+        self.assertFalse(Todo.objects.exists())
+
+    @override_settings(TODOS_WRITE_PIPELINE=True)
+    def test_views_write_through_the_pipeline(self):
+        """Test the HTML views hand their writes to the writer thread"""
+        self.addCleanup(writer.pipeline().stop)
+        writes = writer.pipeline().writes
+        response = self.client.post(reverse('todo_create'), {'title': 'Queued'})
+        self.assertEqual(response.status_code, 302)
+        todo = Todo.objects.get(title='Queued')
+        self.client.post(reverse('todo_toggle_resolved', args=[todo.pk]), {'resolved': '1'})
+        self.client.post(reverse('todo_delete', args=[todo.pk]))
+        self.assertEqual(writer.pipeline().writes - writes, 3)
+        self.assertFalse(Todo.objects.exists())
+
+    @override_settings(TODOS_WRITE_PIPELINE=True)
+    def test_writes_inline_inside_a_transaction(self):
+        """Test a caller holding a transaction writes on its own connection"""
+        with transaction.atomic():
+            todo = writer.write(Todo.objects.create, title="Inline")
+            self.assertTrue(Todo.objects.filter(pk=todo.pk).exists())
+        self.assertIsNone(writer._pipeline and writer._pipeline._thread)
+
+    def test_stress_direct_and_pipelined_writes(self):
+        """Test bench_writes measures throughput and p99 with the pipeline off and on"""
+        out, err = StringIO(), StringIO()
+        call_command('bench_writes', threads=8, cycles=5, stdout=out, stderr=err)
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[2:] if line.split()}
+        # The in-memory test database fails a locked write at once rather
+        # than waiting, and a failed write ends its cycle early.
+        self.assertLessEqual(int(rows['direct'][1]), 120)
+        self.assertEqual(rows['pipeline'][1:3], ['120', '0'])
+        self.assertGreater(float(rows['pipeline'][3]), 0)
+        self.assertGreater(float(rows['pipeline'][6]), 0)
+        self.assertIn('120 writes in', out.getvalue())
+        self.assertNotIn('pipeline:', err.getvalue())
+        self.assertFalse(Todo.objects.exists())
+
+
 class TodoDeleteViewTests(TestCase):
     """Test cases for the todo_delete view"""
 
@@ -441,6 +2091,25 @@ class TodoToggleResolvedViewTests(TestCase):
         self.assertEqual(len(messages), 1)
         self.assertIn('marked as', str(messages[0]))
 
+    def test_toggle_is_one_update(self):
+        """Test toggling writes resolved with a single UPDATE and no SELECT"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.url, {'resolved': '1'})
+        todo_queries = [q['sql'] for q in ctx.captured_queries if '"todos_todo"' in q['sql']]
+        self.assertEqual(len(todo_queries), 1)
+        self.assertTrue(todo_queries[0].startswith('UPDATE'))
+        self.todo.refresh_from_db()
+        self.assertTrue(self.todo.resolved)
+        self.assertEqual(self.todo.version, 2)
+
+    def test_toggle_target_is_idempotent(self):
+        """Test a repeated toggle with the same target does not flip back"""
+        self.client.post(self.url, {'resolved': '1'})
+        response = self.client.post(self.url, {'resolved': '1'}, follow=True)
+        self.todo.refresh_from_db()
+        self.assertTrue(self.todo.resolved)
+        self.assertIn('marked as resolved', str(list(response.context['messages'])[0]))
+
     def test_toggle_with_invalid_pk_returns_404(self):
         """Test POST with invalid pk returns 404"""
         url = reverse('todo_toggle_resolved', args=[9999])
@@ -448,6 +2117,420 @@ class TodoToggleResolvedViewTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TodoBatchViewTests(TestCase):
+    """Test cases for the multi-select batch actions of the list"""
+
+    def setUp(self):
+        self.todos = [Todo.objects.create(title=f"Todo {i}") for i in range(4)]
+        self.url = reverse('todo_batch')
+
+    def post(self, action, todos, url=None):
+        return self.client.post(url or self.url, {'action': action, 'ids': [todo.pk for todo in todos]})
+
+    def test_list_renders_checkboxes_for_the_batch_form(self):
+        """Test every item has a checkbox tied to the batch form"""
+        response = self.client.get(reverse('todo_list'), {'status': 'open'})
+        self.assertContains(response, 'id="todo-batch"')
+        self.assertContains(response, f'action="{self.url}?status=open"')
+        self.assertContains(response, 'form="todo-batch"', count=4)
+        self.assertContains(response, f'name="ids" value="{self.todos[0].pk}"')
+
+    def test_resolve_is_one_update_and_one_redirect(self):
+        """Test resolving the selection runs one UPDATE ... WHERE id IN (...)"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post('resolve', self.todos[:3])
+        self.assertRedirects(response, reverse('todo_list'), fetch_redirect_response=False)
+        todo_queries = [q['sql'] for q in ctx.captured_queries if '"todos_todo"' in q['sql']]
+        self.assertEqual(len(todo_queries), 1)
+        self.assertTrue(todo_queries[0].startswith('UPDATE "todos_todo"'))
+        self.assertIn(' IN (', todo_queries[0])
+        self.assertEqual(Todo.objects.resolved().count(), 3)
+
+        self.post('unresolve', self.todos[:2])
+        self.assertEqual(list(Todo.objects.resolved()), [self.todos[2]])
+
+    def test_delete_is_one_statement(self):
+        """Test deleting the selection runs one DELETE"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post('delete', self.todos[1:3])
+        self.assertEqual(response.status_code, 302)
+        todo_queries = [q['sql'] for q in ctx.captured_queries if '"todos_todo"' in q['sql']]
+        self.assertEqual(len(todo_queries), 1)
+        self.assertTrue(todo_queries[0].startswith('DELETE FROM "todos_todo"'))
+        self.assertEqual(list(Todo.objects.order_by('pk')), [self.todos[0], self.todos[3]])
+
+    def test_redirects_back_to_the_filtered_page(self):
+        """Test the redirect keeps the filters the form was sent from"""
+        response = self.post('resolve', self.todos[:1], url=f'{self.url}?status=open&sort=due')
+        self.assertRedirects(response, f"{reverse('todo_list')}?status=open&sort=due", fetch_redirect_response=False)
+
+    def test_reports_count_in_message(self):
+        """Test the message counts the todos changed"""
+        response = self.client.post(self.url, {'action': 'delete', 'ids': [self.todos[0].pk]}, follow=True)
+        self.assertEqual([str(m) for m in response.context['messages']], ['1 todo deleted.'])
+
+    def test_empty_selection(self):
+        """Test submitting with nothing ticked changes nothing"""
+        response = self.client.post(self.url, {'action': 'delete'}, follow=True)
+        self.assertEqual([str(m) for m in response.context['messages']], ['Select at least one todo.'])
+        self.assertEqual(Todo.objects.count(), 4)
+
+    def test_rejects_unknown_action_and_get(self):
+        """Test an unknown action is a 400 and GET is not allowed"""
+        self.assertEqual(self.post('archive', self.todos).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertFalse(Todo.objects.resolved().exists())
+
+    def test_rejects_invalid_ids(self):
+        """Test ids that are not integers, or are out of SQLite's range, are a 400"""
+        for bad in ('x', '²', '-1', '0', str(2 ** 63), '99999999999999999999999'):
+            response = self.client.post(self.url, {'action': 'delete', 'ids': [self.todos[0].pk, bad]})
+            self.assertEqual(response.status_code, 400, bad)
+        self.assertEqual(Todo.objects.count(), 4)
+
+    @override_settings(TODOS_API_MAX_BATCH=2)
+    def test_rejects_oversized_selection(self):
+        """Test a selection above TODOS_API_MAX_BATCH is refused"""
+        self.assertEqual(self.post('resolve', self.todos[:3]).status_code, 400)
+        self.assertFalse(Todo.objects.resolved().exists())
+
+
+class BulkApiTests(TestCase):
+    """Test cases for the JSON bulk API"""
+
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.csrf_token = get_random_string(32)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = self.csrf_token
+
+    def post(self, name, payload, content_type='application/json'):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return self.client.post(reverse(name), body, content_type=content_type, HTTP_X_CSRFTOKEN=self.csrf_token)
+
+    def test_bulk_create(self):
+        """Test bulk create inserts valid items and reports each item"""
+        response = self.post('api_todo_bulk_create', [
+            {'title': 'One'},
+            {'title': ''},
+            {'title': 'Two', 'description': 'desc', 'due_date': '2030-01-01T09:00:00Z', 'resolved': True},
+            {'title': 'Bad date', 'due_date': 'tomorrow'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'created', 'error'])
+        self.assertIn('title', results[1]['errors'])
+        self.assertIn('due_date', results[3]['errors'])
+        two = Todo.objects.get(pk=results[2]['id'])
+        self.assertEqual(two.title, 'Two')
+        self.assertTrue(two.resolved)
+        self.assertEqual(two.due_date.year, 2030)
+        self.assertEqual(Todo.objects.count(), 2)
+
+    def test_bulk_create_uses_batched_inserts(self):
+        """Test thousands of items are inserted with multi-row statements"""
+        items = [{'title': f'Todo {i}'} for i in range(2000)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post('api_todo_bulk_create', items)
+        self.assertEqual(Todo.objects.count(), 2000)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertLessEqual(len(inserts), 20)
+        self.assertEqual(len(response.json()['results']), 2000)
+
+    def test_bulk_update_is_partial(self):
+        """Test bulk update only changes the fields given per item"""
+        a = Todo.objects.create(title='A', description='keep')
+        b = Todo.objects.create(title='B', description='old')
+        response = self.post('api_todo_bulk_update', [
+            {'id': a.pk, 'title': 'A2'},
+            {'id': b.pk, 'description': 'new', 'resolved': True},
+            {'id': 9999, 'title': 'Missing'},
+            {'id': a.pk},
+        ])
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['updated', 'updated', 'error', 'error'])
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.title, a.description), ('A2', 'keep'))
+        self.assertEqual((b.title, b.description, b.resolved), ('B', 'new', True))
+        self.assertGreater(a.updated_at, a.created_at)
+
+    def test_bulk_update_merges_repeated_ids(self):
+        """Test items naming the same todo are merged in order, the last value winning"""
+        todo = Todo.objects.create(title='Original')
+        response = self.post('api_todo_bulk_update', [
+            {'id': todo.pk, 'title': 'first'},
+            {'id': todo.pk, 'title': 'second', 'description': 'added'},
+            {'id': todo.pk, 'resolved': True},
+        ])
+        self.assertEqual([r['status'] for r in response.json()['results']], ['updated'] * 3)
+        todo.refresh_from_db()
+        self.assertEqual((todo.title, todo.description, todo.resolved), ('second', 'added', True))
+        self.assertEqual(todo.version, 2)
+        self.assertIsNotNone(todo.resolved_at)
+
+    def test_bulk_resolve_is_one_update(self):
+        """Test bulk resolve runs a single UPDATE ... WHERE id IN"""
+        todos = Todo.objects.bulk_create(Todo(title=f'T{i}') for i in range(50))
+        ids = [todo.pk for todo in todos] + [9999]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post('api_todo_bulk_resolve', ids)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "todos_todo"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Todo.objects.filter(resolved=True).count(), 50)
+        self.assertEqual(response.json()['results'][-1]['status'], 'error')
+
+    def test_bulk_delete_is_one_delete(self):
+        """Test bulk delete runs a single DELETE ... WHERE id IN"""
+        todos = Todo.objects.bulk_create(Todo(title=f'T{i}') for i in range(50))
+        keep = Todo.objects.create(title='Keep')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post('api_todo_bulk_delete', [todo.pk for todo in todos])
+        deletes = [q for q in ctx.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(list(Todo.objects.all()), [keep])
+        self.assertTrue(all(r['status'] == 'deleted' for r in response.json()['results']))
+
+    def test_invalid_ids_reported(self):
+        """Test malformed ids are reported per item"""
+        response = self.post('api_todo_bulk_delete', ['x', -1, True])
+        self.assertTrue(all(r['status'] == 'error' for r in response.json()['results']))
+
+    @override_settings(TODOS_API_MAX_BATCH=3)
+    def test_batch_size_limit(self):
+        """Test batches above TODOS_API_MAX_BATCH are rejected"""
+        response = self.post('api_todo_bulk_create', [{'title': 'x'}] * 4)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Todo.objects.count(), 0)
+
+    def test_body_must_be_json_array(self):
+        """Test malformed bodies are rejected"""
+        self.assertEqual(self.post('api_todo_bulk_create', {'title': 'x'}).status_code, 400)
+        self.assertEqual(self.post('api_todo_bulk_create', 'not json').status_code, 400)
+
+    def test_bulk_endpoints_require_csrf_token(self):
+        """Test a cross-site POST without the CSRF token is refused"""
+        Todo.objects.create(title='Keep')
+        response = self.client.post(
+            reverse('api_todo_bulk_delete'), json.dumps([Todo.objects.get().pk]), content_type='text/plain',
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(Todo.objects.exists())
+
+    def test_bulk_endpoints_require_json_content_type(self):
+        """Test bodies not sent as application/json are refused"""
+        todo = Todo.objects.create(title='Keep')
+        for content_type in ('text/plain', 'application/x-www-form-urlencoded'):
+            response = self.post('api_todo_bulk_delete', [todo.pk], content_type=content_type)
+            self.assertEqual(response.status_code, 415)
+        self.assertTrue(Todo.objects.exists())
+
+    def test_impossible_due_date_is_an_item_error(self):
+        """Test a well-formed but impossible date is reported for its item only"""
+        response = self.post('api_todo_bulk_create', [
+            {'title': 'x', 'due_date': '2025-13-45T00:00:00'}, {'title': 'y'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'created'])
+        self.assertIn('due_date', results[0]['errors'])
+
+    def test_out_of_range_ids_are_item_errors(self):
+        """Test ids beyond SQLite's integer range are reported per item"""
+        todo = Todo.objects.create(title='T')
+        for name in ('api_todo_bulk_delete', 'api_todo_bulk_resolve'):
+            response = self.post(name, [99999999999999999999999, 2 ** 63, todo.pk])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([r['status'] for r in response.json()['results']][:2], ['error', 'error'])
+        response = self.post('api_todo_bulk_update', [{'id': 2 ** 63, 'title': 'x'}])
+        self.assertEqual(response.json()['results'][0]['status'], 'error')
+
+    def test_bulk_endpoints_require_post(self):
+        """Test GET is not allowed on bulk endpoints"""
+        self.assertEqual(self.client.get(reverse('api_todo_bulk_create')).status_code, 405)
+
+    def test_list_endpoint(self):
+        """Test the JSON list uses the list filters and overdue annotation"""
+        Todo.objects.create(title='Late', due_date=timezone.now() - timedelta(days=1))
+        Todo.objects.create(title='Done', resolved=True)
+        response = self.client.get(reverse('api_todo_list'), {'status': 'open'})
+        results = response.json()['results']
+        self.assertEqual([r['title'] for r in results], ['Late'])
+        self.assertTrue(results[0]['overdue'])
+
+
+class ExportTests(TestCase):
+    """Test cases for the streaming CSV/NDJSON export"""
+
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('todo_export')
+        self.late = Todo.objects.create(title="Late, with comma", due_date=timezone.now() - timedelta(days=1))
+        self.done = Todo.objects.create(title="Done", resolved=True, description="Line\nbreak")
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_all_rows(self):
+        """Test the CSV export is streamed with a header row"""
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual([row['title'] for row in rows], ["Done", "Late, with comma"])
+        self.assertEqual(rows[0]['description'], "Line\nbreak")
+        self.assertEqual(rows[1]['overdue'], 'True')
+
+    def test_ndjson_export(self):
+        """Test the NDJSON export emits one JSON object per line"""
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['id'], self.late.pk)
+        self.assertTrue(rows[1]['overdue'])
+        self.assertIsNone(rows[0]['due_date'])
+
+    def test_export_applies_list_filters(self):
+        """Test the export honours status and date filters"""
+        response = self.client.get(self.url, {'format': 'ndjson', 'status': 'overdue'})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['title'] for row in rows], ["Late, with comma"])
+
+    def test_unknown_format_is_rejected(self):
+        """Test an unknown format returns 400"""
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+
+    async def test_asgi_export_streams_asynchronously(self):
+        """Test an ASGI export is an async iterator, not a buffered sync one"""
+        response = await self.async_client.get(self.url)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([row['title'] for row in rows], ["Done", "Late, with comma"])
+
+    def test_async_export_yields_chunks(self):
+        """Test aiter_export sends the export in chunks of lines"""
+        async def collect():
+            queryset = export.export_queryset(TodoListParams({'format': 'ndjson'}))
+            return [chunk async for chunk in export.aiter_export(queryset, 'ndjson', chunk_size=1)]
+        chunks = async_to_sync(collect)()
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(json.loads(chunks[1])['id'], self.late.pk)
+
+    def test_export_command_writes_file(self):
+        """Test the export_todos command streams to a file"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'todos.ndjson')
+            call_command('export_todos', format='ndjson', output=path, status='resolved', stderr=StringIO())
+            with open(path, encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([row['title'] for row in rows], ["Done"])
+
+    def test_export_command_writes_stdout(self):
+        """Test the export_todos command defaults to CSV on stdout"""
+        out = StringIO()
+        call_command('export_todos', chunk_size=1, stdout=out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 2)
+
+
+class ImportCommandTests(TestCase):
+    """Test cases for the import_todos management command"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('import_todos', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        """Test CSV rows are imported with type conversion"""
+        path = self.write('todos.csv', (
+            'title,description,due_date,resolved\n'
+            'First,,2030-01-01T10:00:00+00:00,false\n'
+            'Second,Some text,,true\n'
+        ))
+        out, _ = self.run_import(path)
+        self.assertIn('Imported 2 todos', out)
+        first = Todo.objects.get(title='First')
+        self.assertIsNone(first.description)
+        self.assertEqual(first.due_date.year, 2030)
+        self.assertTrue(Todo.objects.get(title='Second').resolved)
+
+    def test_import_ndjson_skips_invalid_rows(self):
+        """Test invalid NDJSON rows are reported and skipped"""
+        path = self.write('todos.ndjson', (
+            '{"title": "Good"}\n'
+            'not json\n'
+            '{"title": ""}\n'
+            '{"title": "Also good", "resolved": true}\n'
+        ))
+        out, err = self.run_import(path)
+        self.assertEqual(Todo.objects.count(), 2)
+        self.assertIn('skipped 2 invalid rows', out)
+        self.assertIn('Row 2 skipped', err)
+
+    def test_import_skips_impossible_dates(self):
+        """Test a row with an impossible due date is skipped, not fatal"""
+        path = self.write('todos.csv', (
+            'title,description,due_date,resolved\n'
+            'Bad,,2025-13-45T00:00:00,false\n'
+            'Good,,2030-01-01T10:00:00+00:00,false\n'
+        ))
+        out, err = self.run_import(path)
+        self.assertEqual(list(Todo.objects.values_list('title', flat=True)), ['Good'])
+        self.assertIn('skipped 1 invalid row', out)
+        self.assertIn('due_date', err)
+
+    def test_commits_in_chunks_and_reports_rate(self):
+        """Test each chunk is committed and progress is printed"""
+        path = self.write('todos.ndjson', ''.join(f'{{"title": "T{i}"}}\n' for i in range(25)))
+        out, _ = self.run_import(path, commit_every=10, batch_size=4)
+        self.assertEqual(Todo.objects.count(), 25)
+        self.assertEqual(out.count('rows/s'), 3)
+        self.assertEqual(ImportCheckpoint.objects.get().offset, 25)
+
+    def test_resume_skips_committed_rows(self):
+        """Test --resume continues after the checkpointed offset"""
+        path = self.write('todos.ndjson', ''.join(f'{{"title": "T{i}"}}\n' for i in range(10)))
+        ImportCheckpoint.objects.create(source=os.path.abspath(path), offset=6)
+        self.run_import(path, resume=True)
+        self.assertEqual(sorted(Todo.objects.values_list('title', flat=True)), ['T6', 'T7', 'T8', 'T9'])
+
+    def test_without_resume_starts_over(self):
+        """Test the checkpoint is reset when --resume is not given"""
+        path = self.write('todos.ndjson', '{"title": "Only"}\n')
+        ImportCheckpoint.objects.create(source=os.path.abspath(path), offset=1)
+        self.run_import(path)
+        self.assertEqual(Todo.objects.count(), 1)
+
+    def test_round_trip_with_export(self):
+        """Test an export can be imported again"""
+        Todo.objects.create(title="Exported", description="x", resolved=True)
+        path = os.path.join(self.tmp.name, 'export.csv')
+        call_command('export_todos', output=path, stderr=StringIO())
+        Todo.objects.all().delete()
+        self.run_import(path)
+        todo = Todo.objects.get()
+        self.assertEqual((todo.title, todo.description, todo.resolved), ("Exported", "x", True))
+
+    def test_unknown_format(self):
+        """Test a file without a known extension needs --format"""
+        path = self.write('todos.txt', '')
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+
+
 class URLTests(TestCase):
     """Test cases for URL patterns and reversing"""
 
@@ -1,10 +1,21 @@
 from django.urls import path
-from . import views
+from . import api, async_views, views
 
 urlpatterns = [
     path('', views.todo_list, name='todo_list'),
+    path('archive/', views.todo_archive, name='todo_archive'),
+    path('export/', views.todo_export, name='todo_export'),
     path('create/', views.todo_create, name='todo_create'),
     path('edit/<int:pk>/', views.todo_edit, name='todo_edit'),
     path('delete/<int:pk>/', views.todo_delete, name='todo_delete'),
     path('toggle/<int:pk>/', views.todo_toggle_resolved, name='todo_toggle_resolved'),
+    path('batch/', views.todo_batch, name='todo_batch'),
+    path('events/', async_views.todo_events, name='todo_events'),
+    path('api/todos/', api.todo_list, name='api_todo_list'),
+    path('api/todos/stats/', api.todo_stats, name='api_todo_stats'),
+    path('api/todos/changes/', api.todo_changes, name='api_todo_changes'),
+    path('api/todos/bulk/create/', api.bulk_create, name='api_todo_bulk_create'),
+    path('api/todos/bulk/update/', api.bulk_update, name='api_todo_bulk_update'),
+    path('api/todos/bulk/resolve/', api.bulk_resolve, name='api_todo_bulk_resolve'),
+    path('api/todos/bulk/delete/', api.bulk_delete, name='api_todo_bulk_delete'),
 ]
@@ -1,11 +1,80 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.defaultfilters import pluralize
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
-from .models import Todo
-
+from django.views.decorators.http import require_POST
+from .api import MAX_ID, max_batch_size
+from .cache import CSRF_PLACEHOLDER, cached_list
+from .conditional import conditional, list_etag, todo_etag, todo_last_modified
+from .export import FORMATS, aiter_export, export_queryset, iter_export
+from .filters import TodoListParams, STATUS_CHOICES
+from .models import ArchivedTodo, Todo
+from .pagination import paginate
+from .stats import todo_stats
+from .writer import write
+
+@conditional(etag_func=list_etag)
 def todo_list(request):
-    todos = Todo.objects.all()
-    return render(request, 'todos/todo_list.html', {'todos': todos})
+    now = timezone.now()
+    params = TodoListParams(request.GET)
+
+    def build():
+        page = params.paginate(
+            Todo.objects.with_overdue(now),
+            cursor=request.GET.get('cursor'),
+            per_page=getattr(settings, 'TODOS_PAGE_SIZE', 50),
+            now=now,
+        )
+        return page, render_items(request, page, params)
+
+    page, items_html = cached_list(request, build)
+    return render(request, 'todos/todo_list.html', list_context(page, params, items_html, todo_stats(now)))
+
+def render_items(request, page, params):
+    """Render the cacheable part of the list, with a CSRF placeholder."""
+    return render_to_string('todos/todo_items.html', {
+        'todos': page.object_list,
+        'page': page,
+        'params': params,
+        'csrf_placeholder': CSRF_PLACEHOLDER,
+    }, request=request)
+
+def list_context(page, params, items_html, stats):
+    return {
+        'todos': page.object_list,
+        'page': page,
+        'params': params,
+        'status_choices': STATUS_CHOICES,
+        'items_html': items_html,
+        'stats': stats,
+    }
+
+def todo_archive(request):
+    """Archived todos, most recently archived first; the only page reading the archive."""
+    page = paginate(
+        ArchivedTodo.objects.all(),
+        ('-archived_at', '-id'),
+        cursor=request.GET.get('cursor'),
+        per_page=getattr(settings, 'TODOS_PAGE_SIZE', 50),
+    )
+    return render(request, 'todos/todo_archive.html', {'todos': page.object_list, 'page': page})
+
+def todo_export(request):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest(f"Unknown export format '{fmt}'.")
+    queryset = export_queryset(TodoListParams(request.GET))
+    lines = aiter_export(queryset, fmt) if isinstance(request, ASGIRequest) else iter_export(queryset, fmt)
+    response = StreamingHttpResponse(lines, content_type=FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="todos.{fmt}"'
+    return response
 
 def todo_create(request):
     if request.method == 'POST':
@@ -18,7 +87,8 @@ def todo_create(request):
             if due_date_str:
                 due_date = parse_datetime(due_date_str)
 
-            todo = Todo.objects.create(
+            todo = write(
+                Todo.objects.create,
                 title=title,
                 description=description,
                 due_date=due_date
@@ -30,46 +100,119 @@ def todo_create(request):
 
     return render(request, 'todos/todo_form.html')
 
+def expected_version(request):
+    """The version an edit form was rendered from, or None if it is malformed."""
+    expected = request.POST.get('version')
+    if expected is None:
+        # Forms rendered before versioning: last write wins.
+        return F('version')
+    try:
+        expected = int(expected)
+    except ValueError:
+        return None
+    return expected if 1 <= expected <= MAX_ID else None
+
+@conditional(etag_func=todo_etag, last_modified_func=todo_last_modified)
 def todo_edit(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
-
     if request.method == 'POST':
         title = request.POST.get('title')
         description = request.POST.get('description')
         due_date_str = request.POST.get('due_date')
 
         if title:
-            todo.title = title
-            todo.description = description
-
-            if due_date_str:
-                todo.due_date = parse_datetime(due_date_str)
-            else:
-                todo.due_date = None
-
-            todo.save()
-            messages.success(request, 'Todo updated successfully!')
-            return redirect('todo_list')
+            values = {
+                'title': title,
+                'description': description,
+                'due_date': parse_datetime(due_date_str) if due_date_str else None,
+            }
+            expected = expected_version(request)
+            if expected is None:
+                todo = get_object_or_404(Todo, pk=pk)
+                messages.error(request, 'The form was not sent correctly. Review the todo and try again.')
+                return render(request, 'todos/todo_form.html', {'todo': todo}, status=400)
+
+            if write(Todo.objects.filter(pk=pk).update_versioned, expected, **values):
+                messages.success(request, 'Todo updated successfully!')
+                return redirect('todo_list')
+            todo = get_object_or_404(Todo, pk=pk)
+            messages.error(request, 'This todo was changed by someone else. Review the current version and try again.')
+            return render(request, 'todos/todo_form.html', {'todo': todo}, status=409)
         else:
             messages.error(request, 'Title is required!')
 
+    todo = get_object_or_404(Todo, pk=pk)
     return render(request, 'todos/todo_form.html', {'todo': todo})
 
+@conditional(etag_func=todo_etag, last_modified_func=todo_last_modified)
 def todo_delete(request, pk):
     todo = get_object_or_404(Todo, pk=pk)
 
     if request.method == 'POST':
-        todo.delete()
+        write(todo.delete)
         messages.success(request, 'Todo deleted successfully!')
         return redirect('todo_list')
 
     return render(request, 'todos/todo_confirm_delete.html', {'todo': todo})
 
 def todo_toggle_resolved(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
-    todo.resolved = not todo.resolved
-    todo.save()
-
-    status = 'resolved' if todo.resolved else 'unresolved'
+    todos = Todo.objects.filter(pk=pk)
+    target = request.POST.get('resolved')
+    if target in ('0', '1'):
+        resolved = target == '1'
+        updated = write(todos.set_resolved, resolved)
+    else:
+        updated = write(todos.toggle_resolved)
+        resolved = updated and todos.values_list('resolved', flat=True).first()
+    if not updated:
+        raise Http404('No Todo matches the given query.')
+
+    status = 'resolved' if resolved else 'unresolved'
     messages.success(request, f'Todo marked as {status}!')
     return redirect('todo_list')
+
+BATCH_ACTIONS = {
+    'resolve': 'marked as resolved',
+    'unresolve': 'marked as unresolved',
+    'delete': 'deleted',
+}
+
+def parse_ids(values):
+    """The todo ids in form ``values``, or None if any of them is not one."""
+    ids = set()
+    for value in values:
+        try:
+            pk = int(value)
+        except ValueError:
+            return None
+        if not 1 <= pk <= MAX_ID:
+            return None
+        ids.add(pk)
+    return ids
+
+@require_POST
+def todo_batch(request):
+    """
+    Resolve, reopen or delete the todos ticked in the list with one UPDATE or
+    DELETE, then return to the list page (and filters) the form was sent from.
+    """
+    action = request.POST.get('action')
+    if action not in BATCH_ACTIONS:
+        return HttpResponseBadRequest(f"Unknown action '{action}'.")
+    ids = parse_ids(request.POST.getlist('ids'))
+    if ids is None:
+        return HttpResponseBadRequest('Invalid todo id.')
+    if len(ids) > max_batch_size():
+        return HttpResponseBadRequest(f'At most {max_batch_size()} todos can be changed at once.')
+
+    if ids:
+        todos = Todo.objects.filter(pk__in=ids)
+        if action == 'delete':
+            count = write(todos.bulk_delete)
+        else:
+            count = write(todos.set_resolved, action == 'resolve')
+        messages.success(request, f'{count} todo{pluralize(count)} {BATCH_ACTIONS[action]}.')
+    else:
+        messages.error(request, 'Select at least one todo.')
+
+    query = request.GET.urlencode()
+    return redirect(f"{reverse('todo_list')}?{query}" if query else reverse('todo_list'))
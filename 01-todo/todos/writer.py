@@ -0,0 +1,173 @@
+"""
+Single-writer pipeline for todo writes.
+
+SQLite has one write lock per database. When many request threads write at
+once, each one waits on busy_timeout for the lock, or fails with "database
+is locked" when the wait runs out, and every statement pays for its own
+commit. With ``TODOS_WRITE_PIPELINE`` on, the views pass their writes to
+``write()``/``awrite()`` instead.
+
+One writer thread takes the queued writes off in micro-batches of at most
+``TODOS_WRITE_BATCH_SIZE``: whatever arrived while the previous batch was
+committing. Each batch runs in one transaction, with every write in its own
+savepoint so that a failing write is rolled back alone. Each caller's future
+is resolved once the batch has committed, so a caller that redirects after
+its write reads its own rows.
+
+A caller already inside a transaction writes inline, because the writer's
+connection could not see that transaction's uncommitted rows. A caller
+waits at most ``TODOS_WRITE_TIMEOUT_SECONDS``; a write the writer has not
+started by then is dropped, one already running still commits.
+"""
+import asyncio
+import atexit
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_STOP = object()
+
+
+class WritePipeline:
+    """A writer thread committing submitted callables in batched transactions."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=100):
+        self.using = using
+        self.batch_size = batch_size
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='todos-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Commit the writes queued so far, then end the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)``; returns a future of its result."""
+        future = Future()
+        # Run in the caller's context, so the queries count towards its
+        # request in todos.instrumentation and the slow query log.
+        self._queue.put((future, contextvars.copy_context(), fn, args, kwargs))
+        self.start()
+        return future
+
+    def _next_batch(self):
+        batch = []
+        item = self._queue.get()
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch, item is _STOP
+
+    def _run(self):
+        connection = connections[self.using]
+        try:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    connection.close_if_unusable_or_obsolete()
+                    self._commit(batch)
+                except Exception as exc:
+                    # Fail this batch rather than the thread: its callers
+                    # would otherwise wait forever.
+                    for future, *_ in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+        finally:
+            connection.close()
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic(using=self.using):
+                for future, context, fn, args, kwargs in batch:
+                    if not future.set_running_or_notify_cancel():
+                        outcomes.append(None)
+                        continue
+                    try:
+                        with transaction.atomic(using=self.using):
+                            outcomes.append((True, context.run(fn, *args, **kwargs)))
+                    except Exception as exc:
+                        outcomes.append((False, exc))
+        except Exception as exc:
+            # The commit failed, so none of the batch was written.
+            for future, *_ in batch:
+                if future.running():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.writes += len(batch)
+        for (future, *_), outcome in zip(batch, outcomes):
+            if outcome is not None:
+                ok, value = outcome
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def enabled():
+    return getattr(settings, 'TODOS_WRITE_PIPELINE', False)
+
+
+def pipeline():
+    """The process-wide pipeline, created on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = WritePipeline(batch_size=getattr(settings, 'TODOS_WRITE_BATCH_SIZE', 100))
+            atexit.register(_pipeline.stop)
+        return _pipeline
+
+
+def timeout():
+    return getattr(settings, 'TODOS_WRITE_TIMEOUT_SECONDS', 30)
+
+
+def write(fn, *args, **kwargs):
+    """Run the write ``fn(*args, **kwargs)`` and return its result once committed."""
+    if not enabled() or transaction.get_connection().in_atomic_block:
+        return fn(*args, **kwargs)
+    future = pipeline().submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout())
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+async def awrite(fn, *args, **kwargs):
+    """Async version of ``write()``; ``fn`` is synchronous."""
+    if not enabled():
+        return await sync_to_async(fn)(*args, **kwargs)
+    # Cancelling the wrapper on timeout cancels the queued write too.
+    return await asyncio.wait_for(asyncio.wrap_future(pipeline().submit(fn, *args, **kwargs)), timeout())